@@ -0,0 +1,4 @@
+"""Benchmarks for the X scheduler.
+
+Run a benchmark as a module, e.g. ``python -m scheduler.benchmarks.bench_due_index``.
+"""
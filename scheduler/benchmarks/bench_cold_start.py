@@ -0,0 +1,97 @@
+"""Benchmark scheduler cold start with ``python -X importtime``.
+
+Measures the import cost of the entry point and the wall time of a cron
+run with nothing due. Exits non-zero if the import time exceeds
+--max-import-ms, so it can guard against import regressions.
+
+Usage:
+    python -m scheduler.benchmarks.bench_cold_start [--max-import-ms 100]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+HEAVY_MODULES = ("tweepy", "pydantic", "aiohttp")
+
+
+def import_times(module: str) -> dict[str, int]:
+    """Get cumulative import time in microseconds for every imported module."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+def idle_run_seconds(posts: int) -> float:
+    """Time a cron run whose data file has nothing due."""
+    later = (datetime.now(timezone.utc) + timedelta(days=1)).isoformat()
+    with tempfile.TemporaryDirectory() as tmp:
+        data_path = Path(tmp) / "posts.json"
+        data_path.write_text(json.dumps({
+            # Whether or not the minute aligns, the run exits after the pre-check
+            "config": {"timezone": "UTC", "interval_minutes": 5},
+            "posts": [
+                {"id": str(i), "type": "tweet", "text": "x", "scheduled_at": later}
+                for i in range(posts)
+            ],
+            "history": [],
+            "stats": {"daily_reset_at": later, "monthly_reset_at": later},
+        }), encoding="utf-8")
+
+        env = dict(os.environ, DATA_PATH=str(data_path))
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, "-m", "scheduler.main"],
+            cwd=PROJECT_ROOT,
+            env=env,
+            capture_output=True,
+            check=True,
+        )
+        return time.perf_counter() - start
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--max-import-ms", type=float, default=None)
+    parser.add_argument("--posts", type=int, default=10_000)
+    args = parser.parse_args()
+
+    times = import_times("scheduler.main")
+    total_ms = times["scheduler.main"] / 1000
+    print(f"import scheduler.main: {total_ms:.1f} ms")
+
+    heavy = [name for name in HEAVY_MODULES if name in times]
+    print(f"heavy modules imported: {', '.join(heavy) or 'none'}")
+
+    print("slowest imports:")
+    for name, micros in sorted(times.items(), key=lambda kv: -kv[1])[1:6]:
+        print(f"  {micros / 1000:8.1f} ms  {name}")
+
+    print(f"idle cron run with {args.posts} future posts: {idle_run_seconds(args.posts) * 1000:.0f} ms")
+
+    if args.max_import_ms is not None and total_ms > args.max_import_ms:
+        print(f"FAIL: import time {total_ms:.1f} ms exceeds {args.max_import_ms} ms")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
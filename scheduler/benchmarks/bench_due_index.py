@@ -0,0 +1,65 @@
+"""Benchmark due-post lookup against the number of stored posts.
+
+Usage:
+    python -m scheduler.benchmarks.bench_due_index [--sizes 1000 10000 ...]
+"""
+import argparse
+import time
+from datetime import datetime, timedelta, timezone
+
+from ..models import Post, PostStatus, PostType
+from ..services.post_service import PostService
+from ..storage.due_index import DueIndex
+
+PENDING_RATIO = 0.05
+DUE_PER_TICK = 20
+
+
+def make_posts(count: int) -> list[Post]:
+    """Generate posts where most are finished and a few are pending."""
+    now = datetime.now(timezone.utc)
+    pending_every = int(1 / PENDING_RATIO)
+    posts = []
+    for i in range(count):
+        pending = i % pending_every == 0
+        posts.append(Post.model_construct(
+            id=f"post-{i}",
+            type=PostType.TWEET,
+            status=PostStatus.PENDING if pending else PostStatus.POSTED,
+            # A handful of pending posts are due, the rest are in the future
+            scheduled_at=now + timedelta(minutes=(i // pending_every) - DUE_PER_TICK),
+            text="benchmark",
+        ))
+    return posts
+
+
+def time_lookup(service: PostService, posts: list[Post], repeat: int) -> float:
+    """Get the mean lookup time in microseconds."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        service.get_due_posts(posts)
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'posts':>10} {'scan (us)':>12} {'index (us)':>12} {'due':>5}")
+    for size in args.sizes:
+        posts = make_posts(size)
+        scan = PostService(None, None, None, timezone="UTC")
+        indexed = PostService(None, None, None, timezone="UTC", due_index=DueIndex.build(posts, "UTC"))
+
+        due = len(indexed.get_due_posts(posts))
+        assert due == len(scan.get_due_posts(posts))
+        print(
+            f"{size:>10} {time_lookup(scan, posts, max(1, args.repeat // 10)):>12.1f} "
+            f"{time_lookup(indexed, posts, args.repeat):>12.1f} {due:>5}"
+        )
+
+
+if __name__ == "__main__":
+    main()
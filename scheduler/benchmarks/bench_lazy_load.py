@@ -0,0 +1,80 @@
+"""Benchmark full vs lazy loading of posts.json.
+
+Usage:
+    python -m scheduler.benchmarks.bench_lazy_load [--sizes 10000 100000 ...]
+"""
+import argparse
+import json
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from ..storage.json_storage import JsonStorage
+
+PENDING_RATIO = 0.05
+
+
+def write_posts_json(path: Path, count: int) -> None:
+    """Write a posts.json with count posts and count history entries."""
+    now = datetime.now(timezone.utc)
+    pending_every = int(1 / PENDING_RATIO)
+    posts = []
+    history = []
+    for i in range(count):
+        pending = i % pending_every == 0
+        posts.append({
+            "id": f"post-{i}",
+            "type": "tweet",
+            "status": "pending" if pending else "posted",
+            "scheduled_at": (now + timedelta(minutes=i)).isoformat(),
+            "created_at": now.isoformat(),
+            "updated_at": now.isoformat(),
+            "text": f"benchmark post {i}",
+            "media": [{"type": "image", "path": "media/image.png", "media_id": None}],
+            "posted_tweet_id": None if pending else str(10**18 + i),
+        })
+        history.append({
+            "id": f"history-{i}",
+            "post_id": f"post-{i}",
+            "action": "posted",
+            "executed_at": now.isoformat(),
+            "tweet_id": str(10**18 + i),
+        })
+
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({
+            "config": {"timezone": "UTC", "history_retention": 0},
+            "posts": posts,
+            "history": history,
+            "stats": {"daily_reset_at": now.isoformat(), "monthly_reset_at": now.isoformat()},
+        }, f, indent=2)
+
+
+def time_round_trip(path: Path, lazy: bool) -> tuple[float, float]:
+    """Get load and save times in seconds."""
+    storage = JsonStorage(path, lazy=lazy)
+    start = time.perf_counter()
+    data = storage.load()
+    loaded = time.perf_counter()
+    storage.save(data)
+    return loaded - start, time.perf_counter() - loaded
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    print(f"{'records':>10} {'full load':>10} {'full save':>10} {'lazy load':>10} {'lazy save':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "posts.json"
+        for size in args.sizes:
+            write_posts_json(path, size)
+            full_load, full_save = time_round_trip(path, lazy=False)
+            lazy_load, lazy_save = time_round_trip(path, lazy=True)
+            print(f"{size:>10} {full_load:>9.2f}s {full_save:>9.2f}s {lazy_load:>9.2f}s {lazy_save:>9.2f}s")
+
+
+if __name__ == "__main__":
+    main()
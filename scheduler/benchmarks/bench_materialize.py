@@ -0,0 +1,80 @@
+"""Benchmark topping up repeat series: validated copies vs shared payloads.
+
+Usage:
+    python -m scheduler.benchmarks.bench_materialize [--series 10000] [--ahead 3]
+"""
+import argparse
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from typing import Callable
+from zoneinfo import ZoneInfo
+
+from ..models import MediaItem, Post, PostType, RepeatConfig, RepeatType, ThreadItem
+from ..services.repeat_service import RepeatService
+
+TZ = ZoneInfo("Asia/Tokyo")
+
+
+def make_series(count: int, start: datetime) -> list[Post]:
+    """Create the first post of count daily thread series."""
+    return [
+        Post(
+            type=PostType.THREAD,
+            scheduled_at=start,
+            thread=[
+                ThreadItem(text=f"series {i} part {part}", media=[MediaItem(type="image", path=f"img/{i}-{part}.png")])
+                for part in range(3)
+            ],
+            repeat=RepeatConfig(type=RepeatType.DAILY, time=start.strftime("%H:%M")),
+        )
+        for i in range(count)
+    ]
+
+
+def copied(service: RepeatService, posts: list[Post], now: datetime, ahead: int) -> list[Post]:
+    """Chain generate_next_post the way a copy per occurrence would."""
+    created = []
+    for post in posts:
+        for _ in range(ahead - 1):
+            post = service.generate_next_post(post, now=now).model_copy(deep=True)
+            created.append(post)
+    return created
+
+
+def measure(run: Callable[[], list[Post]]) -> tuple[float, float, int]:
+    """Get the time in seconds, the peak traced memory in MB and the posts created."""
+    start = time.perf_counter()
+    created = run()
+    elapsed = time.perf_counter() - start
+
+    del created
+    tracemalloc.start()
+    created = run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 1024 / 1024, len(created)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--series", type=int, default=10_000)
+    parser.add_argument("--ahead", type=int, default=3)
+    args = parser.parse_args()
+
+    now = datetime.now(TZ).replace(second=0, microsecond=0)
+    posts = make_series(args.series, now + timedelta(hours=1))
+    service = RepeatService(timezone="Asia/Tokyo")
+    methods = {
+        "copied": lambda: copied(service, posts, now, args.ahead),
+        "shared": lambda: service.materialize(posts, now, ahead=args.ahead),
+    }
+
+    print(f"{'series':>10} {'method':>8} {'posts':>8} {'time':>8} {'peak MB':>9}")
+    for name, run in methods.items():
+        elapsed, peak, created = measure(run)
+        print(f"{args.series:>10} {name:>8} {created:>8} {elapsed:>7.2f}s {peak:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
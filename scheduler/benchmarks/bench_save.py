@@ -0,0 +1,61 @@
+"""Benchmark saving posts.json: the previous dict-tree dump vs streaming.
+
+Usage:
+    python -m scheduler.benchmarks.bench_save [--sizes 10000 100000 ...]
+"""
+import argparse
+import json
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable
+
+from ..models import PostsData
+from ..storage.json_storage import JsonStorage
+from .bench_lazy_load import write_posts_json
+
+
+def dict_tree_save(path: Path, data: PostsData) -> None:
+    """Save the way JsonStorage did before streaming."""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data.model_dump(mode="json"), f, indent=2, ensure_ascii=False, default=str)
+
+
+def measure(save: Callable[[], None]) -> tuple[float, float]:
+    """Get the time in seconds and the peak traced memory in MB of a save."""
+    start = time.perf_counter()
+    save()
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    save()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 1024 / 1024
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    args = parser.parse_args()
+
+    print(f"{'records':>10} {'method':>10} {'time':>8} {'peak MB':>9} {'size MB':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "posts.json"
+        for size in args.sizes:
+            write_posts_json(path, size)
+            data = JsonStorage(path).load()
+            methods = {
+                "dict tree": lambda: dict_tree_save(path, data),
+                "streamed": lambda: JsonStorage(path).save(data),
+                "compact": lambda: JsonStorage(path, compact=True).save(data),
+            }
+            for name, save in methods.items():
+                elapsed, peak = measure(save)
+                output = path.stat().st_size / 1024 / 1024
+                print(f"{size:>10} {name:>10} {elapsed:>7.2f}s {peak:>9.2f} {output:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Benchmark posts.json with and without payload templates.
+
+Writes the posts of long-running daily thread series, then compares the
+file size and load/save times of the plain format and the dedup format.
+
+Usage:
+    python -m scheduler.benchmarks.bench_templates [--series 100] [--days 365]
+"""
+import argparse
+import json
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from ..storage.json_storage import JsonStorage
+
+
+def write_series_json(path: Path, series: int, days: int) -> None:
+    """Write a posts.json with one thread post per series and day, the last ones pending."""
+    now = datetime.now(timezone.utc)
+    posts = []
+    for day in range(days):
+        pending = day >= days - 3
+        for i in range(series):
+            posts.append({
+                "id": f"series-{i}-day-{day}",
+                "type": "thread",
+                "status": "pending" if pending else "posted",
+                "scheduled_at": (now + timedelta(days=day - days + 3)).isoformat(),
+                "created_at": now.isoformat(),
+                "updated_at": now.isoformat(),
+                "thread": [
+                    {
+                        "text": f"Series {i}, part {part}: " + "benchmark thread text " * 8,
+                        "media": [{"type": "image", "path": f"media/series-{i}-{part}.png"}],
+                    }
+                    for part in range(3)
+                ],
+                "repeat": {"type": "daily", "time": "09:00", "executed_count": day},
+                "series_id": f"series-{i}-day-0",
+                "posted_tweet_id": None if pending else str(10**18 + day * series + i),
+            })
+
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({
+            "config": {"timezone": "UTC", "history_retention": 0},
+            "posts": posts,
+            "history": [],
+            "stats": {"daily_reset_at": now.isoformat(), "monthly_reset_at": now.isoformat()},
+        }, f, indent=2)
+
+
+def time_round_trip(path: Path, lazy: bool, dedup: bool) -> tuple[float, float]:
+    """Get load and save times in seconds."""
+    storage = JsonStorage(path, lazy=lazy, dedup=dedup)
+    start = time.perf_counter()
+    data = storage.load()
+    loaded = time.perf_counter()
+    storage.save(data)
+    return loaded - start, time.perf_counter() - loaded
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--series", type=int, default=100)
+    parser.add_argument("--days", type=int, default=365)
+    args = parser.parse_args()
+
+    print(f"{'format':>8} {'size MB':>9} {'full load':>10} {'full save':>10} {'lazy load':>10} {'lazy save':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "posts.json"
+        write_series_json(path, args.series, args.days)
+        for dedup in (False, True):
+            # Rewrite in the format being measured first
+            JsonStorage(path, dedup=dedup).save(JsonStorage(path).load())
+            size = path.stat().st_size / 1024 / 1024
+            full_load, full_save = time_round_trip(path, lazy=False, dedup=dedup)
+            lazy_load, lazy_save = time_round_trip(path, lazy=True, dedup=dedup)
+            name = "dedup" if dedup else "plain"
+            print(
+                f"{name:>8} {size:>9.1f} {full_load:>9.2f}s {full_save:>9.2f}s "
+                f"{lazy_load:>9.2f}s {lazy_save:>9.2f}s"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,286 @@
+"""Local stand-in for the X API endpoints used by XApiClient.
+
+Serves the v2 tweet, repost, user and timeline endpoints and the v1.1
+simple and chunked media upload, with configurable latency, server
+errors and 429 responses. Requests are not authenticated.
+
+Usage:
+    python -m scheduler.benchmarks.fake_x_api [--port 8080] [--latency 0.05] ...
+
+Then run the scheduler with X_API_BASE_URL=http://127.0.0.1:8080.
+"""
+import argparse
+import itertools
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from email.parser import BytesParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import parse_qs, urlsplit
+
+USER_ID = "42"
+RATE_LIMIT = 300
+
+
+class FakeXApi:
+    """Threaded HTTP server imitating the X API.
+
+    Usage:
+        with FakeXApi(latency=0.05) as server:
+            client = XApiClient(credentials, api_base_url=server.base_url)
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        window: int = 900,
+        seed: Optional[int] = None
+    ):
+        """Initialize fake server.
+
+        Args:
+            host: Interface to listen on
+            port: Port to listen on (0 picks a free port)
+            latency: Seconds added to every response
+            jitter: Maximum random seconds added on top of latency
+            error_rate: Fraction of requests answered with 503
+            rate_limit_rate: Fraction of requests answered with 429
+            window: Seconds until the reported rate limits reset
+            seed: Random seed for reproducible failures
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.window = window
+        # Routes, e.g. "POST /2/tweets", that always answer 429
+        self.exhausted: set[str] = set()
+        self.random = random.Random(seed)
+        self.tweets: dict[str, dict] = {}
+        self.requests: Counter[str] = Counter()
+        self._ids = itertools.count(10**18)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), _handler(self))
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeXApi":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "FakeXApi":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def next_id(self) -> str:
+        with self._lock:
+            return str(next(self._ids))
+
+    def add_tweet(self, text: str, reposted_id: Optional[str] = None) -> str:
+        tweet_id = self.next_id()
+        with self._lock:
+            self.tweets[tweet_id] = {
+                "id": tweet_id,
+                "text": text,
+                "created_at": datetime.now(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z"),
+                "reposted_id": reposted_id,
+            }
+        return tweet_id
+
+    def fault(self) -> Optional[int]:
+        """Pick the injected failure status for a request, if any."""
+        with self._lock:
+            roll = self.random.random()
+            delay = self.latency + self.random.random() * self.jitter
+        time.sleep(delay)
+        if roll < self.rate_limit_rate:
+            return 429
+        if roll < self.rate_limit_rate + self.error_rate:
+            return 503
+        return None
+
+
+def _handler(api: FakeXApi) -> type[BaseHTTPRequestHandler]:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args) -> None:
+            pass
+
+        def _send(self, status: int, body: Optional[dict] = None) -> None:
+            payload = json.dumps(body).encode() if body is not None else b""
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            remaining = 0 if status == 429 else RATE_LIMIT - 1
+            self.send_header("x-rate-limit-limit", str(RATE_LIMIT))
+            self.send_header("x-rate-limit-remaining", str(remaining))
+            self.send_header("x-rate-limit-reset", str(int(time.time()) + api.window))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def _read_body(self) -> bytes:
+            return self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+        def _form(self, body: bytes) -> dict[str, bytes]:
+            """Parse a urlencoded or multipart form body."""
+            content_type = self.headers.get("Content-Type", "")
+            if content_type.startswith("multipart/form-data"):
+                message = BytesParser().parsebytes(
+                    f"Content-Type: {content_type}\r\n\r\n".encode() + body
+                )
+                return {
+                    part.get_param("name", header="content-disposition"): part.get_payload(decode=True)
+                    for part in message.get_payload()
+                }
+            return {key: values[0].encode() for key, values in parse_qs(body.decode()).items()}
+
+        def _dispatch(self, method: str) -> None:
+            url = urlsplit(self.path)
+            body = self._read_body()
+            version, _, rest = url.path.lstrip("/").partition("/")
+            route = f"/{version}/" + re.sub(r"(^|/)\d+(?=/|$)", r"\1:id", rest)
+            route_key = f"{method} {route}"
+            api.requests[route_key] += 1
+
+            status = 429 if route_key in api.exhausted else api.fault()
+            if status is not None:
+                self._send(status, {"title": "Too Many Requests" if status == 429 else "Service Unavailable"})
+                return
+
+            handler = ROUTES.get((method, route))
+            if handler is None:
+                self._send(404, {"title": "Not Found", "detail": f"{method} {url.path}"})
+                return
+            handler(self, url, body)
+
+        def do_GET(self) -> None:
+            self._dispatch("GET")
+
+        def do_POST(self) -> None:
+            self._dispatch("POST")
+
+        def do_DELETE(self) -> None:
+            self._dispatch("DELETE")
+
+        def create_tweet(self, url, body) -> None:
+            text = json.loads(body or b"{}").get("text", "")
+            tweet_id = api.add_tweet(text)
+            self._send(201, {"data": {"id": tweet_id, "text": text, "edit_history_tweet_ids": [tweet_id]}})
+
+        def delete_tweet(self, url, body) -> None:
+            tweet_id = url.path.rsplit("/", 1)[1]
+            with api._lock:
+                deleted = api.tweets.pop(tweet_id, None) is not None
+            self._send(200, {"data": {"deleted": deleted}})
+
+        def retweet(self, url, body) -> None:
+            target = json.loads(body or b"{}").get("tweet_id")
+            api.add_tweet(f"RT: {target}", reposted_id=target)
+            self._send(200, {"data": {"retweeted": True}})
+
+        def get_me(self, url, body) -> None:
+            self._send(200, {"data": {"id": USER_ID, "name": "Fake", "username": "fake"}})
+
+        def get_users_tweets(self, url, body) -> None:
+            with api._lock:
+                tweets = sorted(api.tweets.values(), key=lambda t: t["id"], reverse=True)[:100]
+            data = []
+            for tweet in tweets:
+                item = {
+                    "id": tweet["id"],
+                    "text": tweet["text"],
+                    "created_at": tweet["created_at"],
+                    "edit_history_tweet_ids": [tweet["id"]],
+                }
+                if tweet["reposted_id"]:
+                    item["referenced_tweets"] = [{"type": "retweeted", "id": tweet["reposted_id"]}]
+                data.append(item)
+            self._send(200, {"data": data, "meta": {"result_count": len(data)}})
+
+        def media_upload(self, url, body) -> None:
+            if self.command == "GET":
+                form = {key: values[0].encode() for key, values in parse_qs(url.query).items()}
+            else:
+                form = self._form(body)
+            command = form.get("command", b"").decode()
+
+            if command == "APPEND":
+                self._send(204)
+            elif command in ("FINALIZE", "STATUS"):
+                media_id = form["media_id"].decode()
+                self._send(200, {
+                    "media_id": int(media_id),
+                    "media_id_string": media_id,
+                    "processing_info": {"state": "succeeded"},
+                })
+            else:
+                # INIT, or a simple upload
+                media_id = api.next_id()
+                self._send(200, {
+                    "media_id": int(media_id),
+                    "media_id_string": media_id,
+                    "size": len(form.get("media", b"")),
+                    "expires_after_secs": 86400,
+                })
+
+    ROUTES = {
+        ("POST", "/2/tweets"): Handler.create_tweet,
+        ("DELETE", "/2/tweets/:id"): Handler.delete_tweet,
+        ("POST", "/2/users/:id/retweets"): Handler.retweet,
+        ("GET", "/2/users/me"): Handler.get_me,
+        ("GET", "/2/users/:id/tweets"): Handler.get_users_tweets,
+        ("POST", "/1.1/media/upload.json"): Handler.media_upload,
+        ("GET", "/1.1/media/upload.json"): Handler.media_upload,
+    }
+    return Handler
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Maximum random extra seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of 503 responses")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fraction of 429 responses")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    server = FakeXApi(
+        args.host, args.port, latency=args.latency, jitter=args.jitter,
+        error_rate=args.error_rate, rate_limit_rate=args.rate_limit_rate, seed=args.seed
+    )
+    print(f"Fake X API listening on {server.base_url}")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""End-to-end scheduler throughput against the fake X API.
+
+Each round loads a generated posts.json, posts the due posts through
+XApiClient and tweepy to a local FakeXApi, and saves the result.
+
+Usage:
+    pip install -e ".[bench]"
+    python -m pytest scheduler/benchmarks --benchmark-only
+    BENCH_SIZES=1000,1000000 BENCH_LATENCY=0.1 python -m pytest scheduler/benchmarks --benchmark-only
+
+ops/s in the report is ticks per second. Per-post latency percentiles
+of the timed rounds and the peak RSS of one extra tick are added to each
+result's extra_info (see --benchmark-json). The extra tick runs in its
+own process, as ru_maxrss is a high-water mark for the whole process
+and would otherwise repeat the largest size so far.
+"""
+import json
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from ..config import SchedulerConfig
+from ..main import create_api_services, run_tick
+from ..services.post_service import PostService
+from .fake_x_api import FakeXApi
+
+SIZES = [int(size) for size in os.environ.get("BENCH_SIZES", "1000,10000,100000").split(",")]
+LATENCY = float(os.environ.get("BENCH_LATENCY", "0.05"))
+DUE_PER_TICK = int(os.environ.get("BENCH_DUE", "20"))
+CONCURRENCY = int(os.environ.get("BENCH_CONCURRENCY", "4"))
+PENDING_RATIO = 0.05
+
+# One tick of the data file given as argument, printing the peak RSS
+RSS_TICK = """
+import resource
+import sys
+from scheduler.config import SchedulerConfig
+from scheduler.main import create_api_services, run_tick
+config = SchedulerConfig(sys.argv[1])
+config.load()
+run_tick(config, create_api_services(config))
+print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+
+def write_posts(path: Path, count: int) -> None:
+    """Write a posts.json with DUE_PER_TICK due posts, some future posts and many finished ones."""
+    now = datetime.now(timezone.utc)
+    pending_every = int(1 / PENDING_RATIO)
+    posts = []
+    for i in range(count):
+        due = i < DUE_PER_TICK
+        pending = due or i % pending_every == 0
+        scheduled_at = now - timedelta(minutes=1) if due else now + timedelta(minutes=i)
+        posts.append({
+            "id": f"post-{i}",
+            "type": "tweet",
+            "status": "pending" if pending else "posted",
+            "scheduled_at": scheduled_at.isoformat(),
+            "text": f"benchmark post {i}",
+        })
+
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({
+            "config": {
+                "timezone": "UTC",
+                "daily_limit": count,
+                "monthly_limit": count,
+                "concurrency": CONCURRENCY,
+                "history_retention": 0,
+            },
+            "posts": posts,
+            "history": [],
+            "stats": {"daily_reset_at": now.isoformat(), "monthly_reset_at": now.isoformat()},
+        }, f)
+
+
+def peak_rss_mb(data_path: Path) -> float:
+    """Run one tick in a new process and get its peak RSS in MB."""
+    result = subprocess.run(
+        [sys.executable, "-c", RSS_TICK, str(data_path)],
+        cwd=Path(__file__).parents[2],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    max_rss = int(result.stdout.split()[-1])
+    # Bytes on macOS, kilobytes elsewhere
+    return max_rss / 1024 / 1024 if sys.platform == "darwin" else max_rss / 1024
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] if ordered else 0.0
+
+
+@pytest.fixture(scope="module")
+def fake_x_api():
+    with FakeXApi(latency=LATENCY, jitter=LATENCY / 2, seed=0) as server:
+        yield server
+
+
+@pytest.fixture
+def scheduler_env(fake_x_api, monkeypatch):
+    monkeypatch.setenv("X_API_KEY", "key")
+    monkeypatch.setenv("X_API_KEY_SECRET", "secret")
+    monkeypatch.setenv("X_ACCESS_TOKEN", "42-token")
+    monkeypatch.setenv("X_ACCESS_TOKEN_SECRET", "token-secret")
+    monkeypatch.setenv("X_API_BASE_URL", fake_x_api.base_url)
+    monkeypatch.delenv("DRY_RUN", raising=False)
+
+
+@pytest.fixture
+def post_latencies(monkeypatch):
+    """Record the wall time of every executed post."""
+    latencies = []
+    execute_post = PostService.execute_post
+
+    def timed(self, post, dry_run=False):
+        start = time.perf_counter()
+        try:
+            return execute_post(self, post, dry_run=dry_run)
+        finally:
+            latencies.append(time.perf_counter() - start)
+
+    monkeypatch.setattr(PostService, "execute_post", timed)
+    return latencies
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_tick_throughput(benchmark, scheduler_env, post_latencies, tmp_path, size):
+    """Benchmark one scheduler run: load, post due posts, save."""
+    data_path = tmp_path / "posts.json"
+
+    def setup():
+        write_posts(data_path, size)
+        return (), {}
+
+    def tick():
+        config = SchedulerConfig(str(data_path))
+        config.load()
+        api = create_api_services(config)
+        run_tick(config, api)
+        return config
+
+    config = benchmark.pedantic(tick, setup=setup, rounds=1 if size >= 1_000_000 else 3)
+    assert all(config.data.get_post(f"post-{i}").status.value == "posted" for i in range(DUE_PER_TICK))
+
+    # In its own process, so the extra tick adds no latency samples
+    setup()
+    peak_rss = peak_rss_mb(data_path)
+
+    benchmark.extra_info.update({
+        "posts": size,
+        "due_per_tick": DUE_PER_TICK,
+        "post_latency_p50_ms": percentile(post_latencies, 0.50) * 1000,
+        "post_latency_p95_ms": percentile(post_latencies, 0.95) * 1000,
+        "post_latency_p99_ms": percentile(post_latencies, 0.99) * 1000,
+        "peak_rss_mb": peak_rss,
+    })
@@ -1,38 +1,57 @@
 """Configuration management for the X scheduler."""
-import json
 import os
+from datetime import datetime
 from pathlib import Path
 from typing import Optional
+from zoneinfo import ZoneInfo
 
-from .models import PostsData, Config, Stats
+from .models import HistoryEntry, Post, PostsData, PostStatus, Config, Stats
+from .precheck import journal_path, resolve_data_path
+from .storage import DueIndex, HistoryArchive, Journal, StorageBackend, create_storage
+
+
+def account_env_suffix(account: Optional[str]) -> str:
+    """Get the environment variable suffix of an account, e.g. "_BRAND_A" for "brand-a"."""
+    if account is None:
+        return ""
+    return "_" + account.replace("-", "_").upper()
 
 
 class SchedulerConfig:
     """Scheduler configuration manager."""
 
-    def __init__(self, data_path: Optional[str] = None):
+    def __init__(
+        self,
+        data_path: Optional[str] = None,
+        storage: Optional[StorageBackend] = None
+    ):
         """Initialize scheduler config.
 
         Args:
-            data_path: Path to posts.json. If None, uses default path.
+            data_path: Path to the data file (posts.json or a .db file).
+                If None, uses DATA_PATH or the default path.
+            storage: Storage backend. If None, chosen from the data path suffix.
         """
-        self.data_path = Path(data_path or self._get_default_path())
+        self.data_path = resolve_data_path(data_path)
+        self.storage = storage or create_storage(
+            self.data_path,
+            lazy=self.is_lazy_load(),
+            compact=self.is_compact_json(),
+            shard_by=self.get_shard_by(),
+            dedup=self.is_dedup_payloads()
+        )
         self._data: Optional[PostsData] = None
-
-    @staticmethod
-    def _get_default_path() -> str:
-        """Get the default path for posts.json.
-
-        Returns:
-            Absolute path to data/posts.json
-        """
-        # Look for data/posts.json relative to project root
-        current = Path(__file__).parent.parent
-        return str(current / "data" / "posts.json")
+        self._due_index: Optional[DueIndex] = None
+        self._journal = Journal(journal_path(self.data_path))
+        self._signature: Optional[tuple[int, int]] = None
 
     def load(self) -> PostsData:
         """Load posts data from file.
 
+        Depending on the storage backend, finished posts and history
+        may be left out. Changes journaled by an interrupted run are
+        replayed on top of the file.
+
         Returns:
             Validated PostsData instance
 
@@ -40,32 +59,139 @@ class SchedulerConfig:
             FileNotFoundError: If data file does not exist
             ValidationError: If data validation fails
         """
-        if not self.data_path.exists():
+        if not self.storage.exists():
             raise FileNotFoundError(f"Data file not found: {self.data_path}")
 
-        with open(self.data_path, "r", encoding="utf-8") as f:
-            raw_data = json.load(f)
-
-        self._data = PostsData.model_validate(raw_data)
+        self._data = self.storage.load()
+        self._journal.replay(self._data)
+        self._due_index = DueIndex.build(self._data.posts, self._data.config.timezone)
+        self._signature = self._file_signature()
         return self._data
 
     def save(self) -> None:
         """Save posts data to file.
 
+        History beyond config.history_retention entries is moved to the
+        history archive first.
+
         Raises:
             ValueError: If no data has been loaded
         """
         if self._data is None:
             raise ValueError("No data to save. Call load() first.")
 
-        with open(self.data_path, "w", encoding="utf-8") as f:
-            json.dump(
-                self._data.model_dump(mode="json"),
-                f,
-                indent=2,
-                ensure_ascii=False,
-                default=str
-            )
+        retention = self._data.config.history_retention
+        if retention:
+            self.storage.roll_history(self._data, self.history_archive, retention)
+
+        self._journal.checkpoint(self._data)
+        self.storage.save(self._data)
+        self._journal.truncate()
+        self._signature = self._file_signature()
+        posting = sum(1 for post in self._data.posts if post.status == PostStatus.POSTING)
+        self.due_index.save(self.data_path, config=self._data.config.model_dump(mode="json"), posting=posting)
+
+    def _file_signature(self) -> Optional[tuple[int, int]]:
+        try:
+            stat = self.data_path.stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def changed_on_disk(self) -> bool:
+        """Check if the data file was modified since it was last loaded or saved.
+
+        Returns:
+            True if another process changed the data file
+        """
+        return self._file_signature() != self._signature
+
+    @property
+    def history_archive(self) -> HistoryArchive:
+        """Get the archive of history rolled out of the data file.
+
+        Returns:
+            HistoryArchive in the history directory next to the data file
+        """
+        return HistoryArchive(self.data_path.with_name("history"), self.config.timezone)
+
+    @property
+    def media_cache_path(self) -> Path:
+        """Get the path of the media ID cache file.
+
+        Returns:
+            Path next to the data file
+        """
+        return self.data_path.with_name("media_cache.json")
+
+    @property
+    def upload_state_dir(self) -> Path:
+        """Get the directory for chunked upload progress files.
+
+        Returns:
+            Path next to the data file
+        """
+        return self.data_path.with_name("uploads")
+
+    @property
+    def user_cache_path(self) -> Path:
+        """Get the path of the authenticated user ID cache file.
+
+        Returns:
+            Path next to the data file
+        """
+        return self.data_path.with_name("x_user_cache.json")
+
+    def account_path(self, path: Path, account: Optional[str]) -> Path:
+        """Get the per-account variant of a file or directory next to the data file.
+
+        Args:
+            path: Path for the default account, e.g. media_cache_path
+            account: Account key, or None for the default account
+
+        Returns:
+            path itself for the default account, else e.g. media_cache.brand-a.json
+        """
+        if account is None:
+            return path
+        return path.with_name(f"{path.stem}.{account}{path.suffix}")
+
+    def add_posts(self, posts: list[Post]) -> None:
+        """Append new posts with one journal write and one index merge.
+
+        Args:
+            posts: Posts to add
+        """
+        for post in posts:
+            self.data.add_post(post)
+        self._journal.record(added=posts)
+        self.due_index.add_all(posts)
+
+    def cancel_posts(self, cancellations: list[tuple[Post, str]]) -> None:
+        """Cancel pending posts, recording why in their history.
+
+        Args:
+            cancellations: (post, reason) pairs
+        """
+        updated_at = datetime.now(ZoneInfo(self.config.timezone))
+        history = []
+        for post, reason in cancellations:
+            post.status = PostStatus.CANCELLED
+            post.error_message = reason
+            post.updated_at = updated_at
+            self.due_index.discard(post.id)
+            history.append(HistoryEntry(post_id=post.id, action="cancelled", error=reason))
+        self.data.history.extend(history)
+        self._journal.record(updated=[post for post, _ in cancellations], history=history)
+
+    @property
+    def journal(self) -> Journal:
+        """Get the write-ahead journal of changes since the last save.
+
+        Returns:
+            Journal next to the data file
+        """
+        return self._journal
 
     @property
     def data(self) -> PostsData:
@@ -78,6 +204,17 @@ class SchedulerConfig:
             self.load()
         return self._data
 
+    @property
+    def due_index(self) -> DueIndex:
+        """Get the index of pending posts.
+
+        Returns:
+            DueIndex instance
+        """
+        if self._due_index is None:
+            self.load()
+        return self._due_index
+
     @property
     def config(self) -> Config:
         """Get the config section.
@@ -87,20 +224,43 @@ class SchedulerConfig:
         """
         return self.data.config
 
-    def get_env_credentials(self) -> dict:
+    def get_env_credentials(self, account: Optional[str] = None) -> dict:
         """Get X API credentials from environment variables.
 
+        Other accounts use the same variables with the account key as a
+        suffix, e.g. X_ACCESS_TOKEN_BRAND_A for "brand-a". Accounts that
+        share the X app may leave out X_API_KEY and X_API_KEY_SECRET.
+
+        Args:
+            account: Account key, or None for the default account
+
         Returns:
             Dictionary with OAuth 1.0a credentials for tweepy
         """
+        suffix = account_env_suffix(account)
+
+        def env(name: str, shared: bool = False) -> str:
+            value = os.environ.get(name + suffix, "")
+            if not value and shared:
+                value = os.environ.get(name, "")
+            return value
+
         return {
             # OAuth 1.0a (required for posting)
-            "consumer_key": os.environ.get("X_API_KEY", ""),
-            "consumer_secret": os.environ.get("X_API_KEY_SECRET", ""),
-            "access_token": os.environ.get("X_ACCESS_TOKEN", ""),
-            "access_token_secret": os.environ.get("X_ACCESS_TOKEN_SECRET", ""),
+            "consumer_key": env("X_API_KEY", shared=True),
+            "consumer_secret": env("X_API_KEY_SECRET", shared=True),
+            "access_token": env("X_ACCESS_TOKEN"),
+            "access_token_secret": env("X_ACCESS_TOKEN_SECRET"),
         }
 
+    def get_api_base_url(self) -> Optional[str]:
+        """Get the base URL override for X API requests.
+
+        Returns:
+            X_API_BASE_URL environment variable, or None for the real API
+        """
+        return os.environ.get("X_API_BASE_URL") or None
+
     def is_dry_run(self) -> bool:
         """Check if running in dry run mode.
 
@@ -108,3 +268,35 @@ class SchedulerConfig:
             True if DRY_RUN environment variable is set to "true"
         """
         return os.environ.get("DRY_RUN", "false").lower() == "true"
+
+    def is_lazy_load(self) -> bool:
+        """Check if finished posts and history should be left unvalidated.
+
+        Returns:
+            True if LAZY_LOAD environment variable is set to "true"
+        """
+        return os.environ.get("LAZY_LOAD", "false").lower() == "true"
+
+    def get_shard_by(self) -> str:
+        """Get how a new sharded store splits posts.
+
+        Returns:
+            SHARD_BY environment variable ("month" or "account"), default "month"
+        """
+        return os.environ.get("SHARD_BY", "month").lower()
+
+    def is_compact_json(self) -> bool:
+        """Check if posts.json should be written without indentation.
+
+        Returns:
+            True if COMPACT_JSON environment variable is set to "true"
+        """
+        return os.environ.get("COMPACT_JSON", "false").lower() == "true"
+
+    def is_dedup_payloads(self) -> bool:
+        """Check if posts.json should store identical post payloads once.
+
+        Returns:
+            True if DEDUP_PAYLOADS environment variable is set to "true"
+        """
+        return os.environ.get("DEDUP_PAYLOADS", "false").lower() == "true"
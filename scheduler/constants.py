@@ -0,0 +1,10 @@
+"""Data file layout constants shared by storage and the pre-check.
+
+Kept free of third-party imports, since the pre-check runs before
+pydantic is imported.
+"""
+
+# Data file suffixes stored in SQLite; other files are JSON
+SQLITE_SUFFIXES = frozenset({".db", ".sqlite", ".sqlite3"})
+# File name that selects sharded JSON storage
+MANIFEST_NAME = "manifest.json"
@@ -0,0 +1,129 @@
+"""Long-running scheduler mode.
+
+Started with ``python -m scheduler.main --daemon``. Instead of waking up on
+every cron interval, the daemon keeps the data and the X API client in
+memory and sleeps until the next post is due.
+"""
+import logging
+import signal
+import threading
+from datetime import datetime, timedelta
+from typing import Optional, Union
+
+from .config import SchedulerConfig
+from .main import ApiPool, ApiServices, create_api_pool, run_tick
+
+logger = logging.getLogger(__name__)
+
+
+class SchedulerDaemon:
+    """Runs scheduler ticks exactly when posts become due.
+
+    The data file is polled for changes (by mtime and size), so posts
+    created while the daemon is running are picked up without a restart.
+    """
+
+    def __init__(
+        self,
+        config: Optional[SchedulerConfig] = None,
+        poll_seconds: float = 10.0,
+        api: Optional[Union[ApiServices, ApiPool]] = None
+    ):
+        """Initialize scheduler daemon.
+
+        Args:
+            config: Scheduler config. If None, uses the default data path.
+            poll_seconds: Maximum sleep between data file change checks
+            api: X API services, or a pool of all accounts. If None, a
+                pool is created from the environment credentials on start.
+        """
+        self.config = config or SchedulerConfig()
+        self.poll_seconds = poll_seconds
+        self._stop = threading.Event()
+        self._api = api
+
+    def stop(self) -> None:
+        """Ask the daemon to exit after the current tick."""
+        self._stop.set()
+
+    def _install_signal_handlers(self) -> None:
+        if threading.current_thread() is not threading.main_thread():
+            return
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig, lambda signum, frame: self.stop())
+
+    def next_wake(self, tick_started: datetime) -> Optional[datetime]:
+        """Get when the next tick should run.
+
+        Posts scheduled after the last tick started wake the daemon at their
+        scheduled time. Posts that were due but are still pending (retries,
+        exhausted limits) are retried after one interval.
+
+        Returns:
+            Wake-up time, or None if nothing is pending
+        """
+        index = self.config.due_index
+        wake = index.next_due(after=tick_started)
+        if index.due(tick_started):
+            retry_at = tick_started + timedelta(minutes=self.config.config.interval_minutes)
+            wake = min(wake, retry_at) if wake else retry_at
+        return wake
+
+    def run(self) -> int:
+        """Run until stopped.
+
+        Returns:
+            Exit code (0 for success, 1 for error)
+        """
+        logger.info("Starting X Scheduler daemon")
+        self._install_signal_handlers()
+
+        try:
+            self.config.load()
+            if self._api is None:
+                self._api = create_api_pool(self.config)
+            if self._api is None:
+                return 1
+        except Exception as e:
+            logger.exception(f"Scheduler error: {e}")
+            return 1
+
+        dry_run = self.config.is_dry_run()
+        if dry_run:
+            logger.info("Running in DRY RUN mode")
+
+        while not self._stop.is_set():
+            tick_started = datetime.now(self.config.due_index.tz)
+            try:
+                run_tick(self.config, self._api, dry_run=dry_run)
+            except Exception as e:
+                logger.exception(f"Scheduler error: {e}")
+
+            wake = self.next_wake(tick_started)
+            logger.info(f"Next wake-up: {wake.isoformat() if wake else 'when posts are added'}")
+            self._sleep_until(wake)
+
+        logger.info("Scheduler daemon stopped")
+        return 0
+
+    def _sleep_until(self, wake: Optional[datetime]) -> None:
+        """Sleep until wake, returning early on stop or data file changes."""
+        while not self._stop.is_set():
+            if self.config.changed_on_disk():
+                logger.info("Data file changed, reloading")
+                try:
+                    self.config.load()
+                except Exception as e:
+                    # Likely caught mid-write; try again on the next poll
+                    logger.warning(f"Failed to reload data file: {e}")
+                    self._stop.wait(self.poll_seconds)
+                    continue
+                return
+
+            timeout = self.poll_seconds
+            if wake is not None:
+                remaining = (wake - datetime.now(wake.tzinfo)).total_seconds()
+                if remaining <= 0:
+                    return
+                timeout = min(timeout, remaining)
+            self._stop.wait(timeout)
@@ -1,8 +1,12 @@
 """Main entry point for the X scheduler."""
+import argparse
 import logging
 import sys
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import timedelta
 from pathlib import Path
+from typing import TYPE_CHECKING, Optional, Union
 
 # Load .env file if exists
 try:
@@ -13,15 +17,19 @@ try:
 except ImportError:
     pass  # python-dotenv not installed, use system env vars
 
-from .config import SchedulerConfig
-from .models import PostStatus
-from .services.x_api_client import XApiClient, XCredentials
-from .services.post_service import PostService
-from .services.media_service import MediaService
-from .services.limit_service import LimitService
-from .services.repeat_service import RepeatService
+from .precheck import peek, resolve_data_path
 from .utils.datetime_utils import now
 
+# Models, services and tweepy are imported only once there is work to do,
+# so a cron run with nothing due exits quickly.
+if TYPE_CHECKING:
+    from .config import SchedulerConfig
+    from .services.x_api_client import XApiClient
+    from .services.media_service import MediaService
+    from .services.media_cache import MediaCache
+    from .services.post_service import PostResult, PostService
+    from .services.rate_limits import RateLimitTracker
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -31,10 +39,14 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-def should_run(config: SchedulerConfig) -> bool:
+def should_run(config: "SchedulerConfig") -> bool:
     """Check if scheduler should run based on interval settings."""
-    interval = config.config.interval_minutes
-    current = now(config.config.timezone)
+    return interval_aligned(config.config.interval_minutes, config.config.timezone)
+
+
+def interval_aligned(interval: int, timezone: str) -> bool:
+    """Check if the current minute aligns with the run interval."""
+    current = now(timezone)
 
     # Check if current minute aligns with interval
     if current.minute % interval != 0:
@@ -44,17 +56,334 @@ def should_run(config: SchedulerConfig) -> bool:
     return True
 
 
-def main() -> int:
+@dataclass
+class ApiServices:
+    """Services that talk to the X API and are kept across ticks."""
+    x_client: "XApiClient"
+    media_service: "MediaService"
+    media_cache: "MediaCache"
+    rate_limits: Optional["RateLimitTracker"] = None
+
+
+class ApiPool:
+    """X API services per account, created when an account first has work.
+
+    Every account has its own client, media cache and rate limit state,
+    so one account's 429s do not hold back the others.
+    """
+
+    def __init__(self, config: "SchedulerConfig", services: Optional[dict[Optional[str], ApiServices]] = None):
+        """Initialize API pool.
+
+        Args:
+            config: Scheduler config to read credentials from
+            services: Services already created, by account key
+        """
+        self.config = config
+        self._services: dict[Optional[str], Optional[ApiServices]] = dict(services or {})
+
+    def get(self, account: Optional[str] = None) -> Optional[ApiServices]:
+        """Get the services of an account, creating them on first use.
+
+        Returns:
+            ApiServices, or None if the account's credentials are missing
+        """
+        if account not in self._services:
+            self._services[account] = create_api_services(self.config, account)
+        return self._services[account]
+
+    def created(self) -> dict[Optional[str], ApiServices]:
+        """Get the services created so far, by account key."""
+        return {account: services for account, services in self._services.items() if services is not None}
+
+
+def create_api_services(config: "SchedulerConfig", account: Optional[str] = None) -> Optional[ApiServices]:
+    """Create the X API client and media services of an account.
+
+    Args:
+        config: Scheduler config
+        account: Account key, or None for the default account
+
+    Returns:
+        ApiServices, or None if credentials are missing
+    """
+    from .config import account_env_suffix
+    from .services.x_api_client import XApiClient, XCredentials
+    from .services.media_service import MediaService
+    from .services.media_cache import MediaCache
+    from .services.rate_limits import RateLimitTracker
+
+    creds = config.get_env_credentials(account)
+    if not all([creds["consumer_key"], creds["consumer_secret"],
+                creds["access_token"], creds["access_token_secret"]]):
+        names = ", ".join(
+            f"{name}{account_env_suffix(account)}"
+            for name in ("X_API_KEY", "X_API_KEY_SECRET", "X_ACCESS_TOKEN", "X_ACCESS_TOKEN_SECRET")
+        )
+        logger.error(f"Missing X API credentials for account {account or 'default'}. Required: {names}")
+        return None
+
+    x_credentials = XCredentials(
+        consumer_key=creds["consumer_key"],
+        consumer_secret=creds["consumer_secret"],
+        access_token=creds["access_token"],
+        access_token_secret=creds["access_token_secret"]
+    )
+    rate_limits = RateLimitTracker()
+    x_client = XApiClient(
+        x_credentials,
+        rate_limits=rate_limits,
+        upload_state_dir=str(config.account_path(config.upload_state_dir, account)),
+        user_cache_path=str(config.account_path(config.user_cache_path, account)),
+        api_base_url=config.get_api_base_url()
+    )
+    # Media IDs belong to the account that uploaded them
+    media_cache = MediaCache(config.account_path(config.media_cache_path, account))
+    media_cache.load()
+    media_service = MediaService(
+        x_client,
+        max_parallel_uploads=config.config.upload_concurrency,
+        cache=media_cache
+    )
+    return ApiServices(
+        x_client=x_client,
+        media_service=media_service,
+        media_cache=media_cache,
+        rate_limits=rate_limits
+    )
+
+
+def create_api_pool(config: "SchedulerConfig") -> Optional[ApiPool]:
+    """Create the API pool, checking credentials of accounts with active posts.
+
+    Returns:
+        ApiPool, or None if none of those accounts has credentials
+    """
+    from .storage.base import ACTIVE_STATUSES
+
+    pool = ApiPool(config)
+    accounts = {post.account for post in config.data.posts if post.status.value in ACTIVE_STATUSES} or {None}
+    if all(pool.get(account) is None for account in accounts):
+        return None
+    return pool
+
+
+def _create_post_service(config: "SchedulerConfig", services: ApiServices, account: Optional[str]) -> "PostService":
+    """Create the post service of an account, with its own quota and rate limits."""
+    from .services.limit_service import LimitService
+    from .services.post_service import PostService
+    from .services.rate_limits import RateLimitTracker
+
+    stats = config.data.stats_for(account)
+    if services.rate_limits is None:
+        services.rate_limits = RateLimitTracker()
+    services.rate_limits.restore(stats.rate_limits)
+
+    limit_service = LimitService(
+        stats=stats,
+        daily_limit=config.config.daily_limit,
+        monthly_limit=config.config.monthly_limit,
+        timezone=config.config.timezone,
+        burst_limit=config.config.burst_limit
+    )
+    return PostService(
+        x_client=services.x_client,
+        media_service=services.media_service,
+        limit_service=limit_service,
+        timezone=config.config.timezone,
+        due_index=config.due_index,
+        journal=config.journal,
+        rate_limits=services.rate_limits,
+        account=account
+    )
+
+
+def _execute_accounts(
+    config: "SchedulerConfig",
+    post_services: dict[Optional[str], "PostService"],
+    ready: dict[Optional[str], list],
+    dry_run: bool
+) -> dict[Optional[str], list["PostResult"]]:
+    """Execute the ready posts of every account, accounts in parallel."""
+    from .services.executor import PostExecutor
+
+    def run(account: Optional[str]) -> list["PostResult"]:
+        executor = PostExecutor(post_services[account], max_workers=config.config.concurrency)
+        return executor.run(ready[account], dry_run=dry_run)
+
+    if len(ready) <= 1:
+        return {account: run(account) for account in ready}
+
+    logger.info(f"Executing posts of {len(ready)} accounts in parallel")
+    with ThreadPoolExecutor(max_workers=len(ready), thread_name_prefix="account") as pool:
+        futures = {account: pool.submit(run, account) for account in ready}
+        return {account: future.result() for account, future in futures.items()}
+
+
+def _save(config: "SchedulerConfig", pool: ApiPool) -> None:
+    for account, services in pool.created().items():
+        if services.rate_limits is not None:
+            config.data.stats_for(account).rate_limits = services.rate_limits.snapshot()
+    config.save()
+
+
+def run_tick(config: "SchedulerConfig", api: Union[ApiServices, ApiPool], dry_run: bool = False) -> None:
+    """Execute all due posts once and save the results.
+
+    Each account's posts are planned against its own quota and rate
+    limits, and accounts are executed in parallel.
+
+    Args:
+        config: Loaded scheduler config
+        api: X API services of the default account, or a pool of all accounts
+        dry_run: If True, don't actually post
+    """
+    from .models import PostStatus
+    from .services.planner import BacklogPlanner
+    from .services.repeat_service import RepeatService
+
+    pool = api if isinstance(api, ApiPool) else ApiPool(config, {None: api})
+    post_services: dict[Optional[str], Optional["PostService"]] = {}
+
+    def post_service_for(account: Optional[str]) -> Optional["PostService"]:
+        if account not in post_services:
+            services = pool.get(account)
+            post_services[account] = _create_post_service(config, services, account) if services else None
+        return post_services[account]
+
+    # Resolve posts an interrupted run left POSTING before anything new
+    reconciled = 0
+    if not dry_run:
+        stranded = {post.account for post in config.data.posts if post.status == PostStatus.POSTING}
+        for account in stranded:
+            post_service = post_service_for(account)
+            if post_service is not None:
+                reconciled += post_service.reconcile_stranded(config.data)
+
+    # Stop the series of repeat posts the user cancelled
+    tick_time = now(config.config.timezone)
+    repeat_service = RepeatService(timezone=config.config.timezone)
+    stopped_series = config.data.stats.stopped_series
+    known_series = dict(stopped_series)
+    stopped = repeat_service.stop_cancelled(config.data.posts, stopped_series)
+    if stopped or stopped_series != known_series:
+        config.journal.record(updated=stopped, stats=config.data.stats)
+
+    # Skip overdue repeat posts but the latest, and the rest of stopped series
+    pruned = repeat_service.prune(config.data.posts, tick_time, stopped=stopped_series)
+    if pruned:
+        config.cancel_posts(pruned)
+
+    # Keep the next occurrences of every repeat series as pending posts
+    horizon_days = config.config.repeat_horizon_days
+    materialized = repeat_service.materialize(
+        config.data.posts,
+        tick_time,
+        ahead=config.config.repeat_ahead,
+        horizon=timedelta(days=horizon_days) if horizon_days else None,
+        stopped=stopped_series
+    )
+    if materialized:
+        config.add_posts(materialized)
+
+    # Get due posts
+    due_by_account: dict[Optional[str], list] = {}
+    for post in config.due_index.due(tick_time):
+        due_by_account.setdefault(post.account, []).append(post)
+    logger.info(f"Found {sum(map(len, due_by_account.values()))} due posts")
+
+    if not due_by_account:
+        logger.info("No posts to process")
+        if reconciled or stopped_series != known_series or stopped or pruned or materialized:
+            _save(config, pool)
+        return
+
+    # Run what each account's quota and rate limits allow now; hold back the rest
+    ready = {}
+    for account, due_posts in due_by_account.items():
+        post_service = post_service_for(account)
+        if post_service is None:
+            logger.error(f"Skipping {len(due_posts)} due posts of account {account}: no credentials")
+            continue
+        planner = BacklogPlanner(post_service.limit_service, post_service.rate_limits, timezone=config.config.timezone)
+        plan = planner.plan(due_posts)
+        post_service.defer(plan.deferred)
+        if plan.ready:
+            ready[account] = plan.ready
+
+    # Process posts
+    results = _execute_accounts(config, post_services, ready, dry_run)
+
+    for account, account_results in results.items():
+        post_services[account].apply_results(
+            config.data,
+            account_results,
+            retry_max=config.config.retry_max
+        )
+
+    # Save changes
+    _save(config, pool)
+    logger.info("Saved updated posts data")
+
+    for services in pool.created().values():
+        services.media_cache.save()
+        cache_stats = services.media_cache.stats()
+        if cache_stats["hits"] or cache_stats["misses"]:
+            logger.info(
+                f"Media cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses "
+                f"({cache_stats['hit_rate']:.0%} hit rate)"
+            )
+
+
+def parse_args(argv: Optional[list[str]] = None) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="X Scheduler")
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="Keep running and wake up exactly when the next post is due"
+    )
+    parser.add_argument(
+        "--poll-seconds",
+        type=float,
+        default=10.0,
+        help="How often the daemon checks the data file for changes"
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
     """Main scheduler function.
 
     Returns:
         Exit code (0 for success, 1 for error)
     """
+    args = parse_args(argv)
+    if args.daemon:
+        from .daemon import SchedulerDaemon
+        return SchedulerDaemon(poll_seconds=args.poll_seconds).run()
+
     logger.info("Starting X Scheduler")
 
     try:
+        # Cheap check of the interval and next due time before a full load
+        data_path = resolve_data_path()
+        try:
+            peeked = peek(data_path)
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Pre-check failed, doing a full load: {e}")
+            peeked = None
+
+        if peeked is not None:
+            if not interval_aligned(peeked.interval_minutes, peeked.timezone):
+                return 0
+            if not peeked.has_due_posts() and not peeked.posting:
+                logger.info(f"No posts to process (next due: {peeked.next_due})")
+                return 0
+
         # Load configuration
-        config = SchedulerConfig()
+        from .config import SchedulerConfig
+        config = SchedulerConfig(str(data_path))
         config.load()
         logger.info(f"Loaded {len(config.data.posts)} posts")
 
@@ -67,65 +396,12 @@ def main() -> int:
         if dry_run:
             logger.info("Running in DRY RUN mode")
 
-        # Get credentials
-        creds = config.get_env_credentials()
-        if not all([creds["consumer_key"], creds["consumer_secret"],
-                    creds["access_token"], creds["access_token_secret"]]):
-            logger.error("Missing X API credentials. Required: X_API_KEY, X_API_KEY_SECRET, X_ACCESS_TOKEN, X_ACCESS_TOKEN_SECRET")
-            return 1
-
         # Initialize services
-        x_credentials = XCredentials(
-            consumer_key=creds["consumer_key"],
-            consumer_secret=creds["consumer_secret"],
-            access_token=creds["access_token"],
-            access_token_secret=creds["access_token_secret"]
-        )
-        x_client = XApiClient(x_credentials)
-        media_service = MediaService(x_client)
-        limit_service = LimitService(
-            stats=config.data.stats,
-            daily_limit=config.config.daily_limit,
-            monthly_limit=config.config.monthly_limit,
-            timezone=config.config.timezone
-        )
-        post_service = PostService(
-            x_client=x_client,
-            media_service=media_service,
-            limit_service=limit_service,
-            timezone=config.config.timezone
-        )
-        repeat_service = RepeatService(timezone=config.config.timezone)
-
-        # Get due posts
-        due_posts = post_service.get_due_posts(config.data.posts)
-        logger.info(f"Found {len(due_posts)} due posts")
-
-        if not due_posts:
-            logger.info("No posts to process")
-            return 0
-
-        # Process each post
-        for post in due_posts:
-            logger.info(f"Processing post: {post.id} (type={post.type})")
-
-            result = post_service.execute_post(post, dry_run=dry_run)
-            post_service.update_post_status(
-                config.data,
-                result,
-                retry_max=config.config.retry_max
-            )
-
-            # Generate next repeat post if applicable
-            if result.success and post.repeat:
-                next_post = repeat_service.generate_next_post(post)
-                if next_post:
-                    config.data.posts.append(next_post)
-
-        # Save changes
-        config.save()
-        logger.info("Saved updated posts data")
+        api = create_api_pool(config)
+        if api is None:
+            return 1
 
+        run_tick(config, api, dry_run=dry_run)
         return 0
 
     except Exception as e:
@@ -1,8 +1,8 @@
 """Data models for the X scheduler."""
-from datetime import datetime
+from datetime import datetime, timezone
 from enum import Enum
 from typing import Optional
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 import uuid
 
 
@@ -54,12 +54,22 @@ class RepeatConfig(BaseModel):
     executed_count: int = 0
 
 
+class Payload(BaseModel):
+    """Content of a post, stored once for posts that share it."""
+    text: Optional[str] = Field(None, max_length=280)
+    media: list[MediaItem] = Field(default_factory=list)
+    thread: Optional[list[ThreadItem]] = None
+
+
 class Post(BaseModel):
     """Post model."""
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     type: PostType
     status: PostStatus = PostStatus.PENDING
     scheduled_at: datetime
+    # Key of the X account to post as; None is the default account. Lowercase
+    # with hyphens only, so no two keys share environment variables (see account_env_suffix)
+    account: Optional[str] = Field(None, pattern=r"^[a-z0-9-]+$")
     created_at: datetime = Field(default_factory=datetime.now)
     updated_at: datetime = Field(default_factory=datetime.now)
 
@@ -75,12 +85,37 @@ class Post(BaseModel):
 
     # For repeat
     repeat: Optional[RepeatConfig] = None
+    series_id: Optional[str] = None  # ID of the first post of its repeat series
 
     # Execution info
+    priority: int = 0  # Higher goes first when the quota cannot cover every due post
+    deferred_until: Optional[datetime] = None  # Held back for quota or rate limits until then
+    claimed_at: Optional[datetime] = None  # When the current attempt went POSTING
+    attempt_id: Optional[str] = None
     retry_count: int = 0
     error_message: Optional[str] = None
     posted_tweet_id: Optional[str] = None
 
+    def media_items(self) -> list[MediaItem]:
+        """Get the media of the post and of its thread items, in posting order."""
+        media = list(self.media)
+        for item in self.thread or []:
+            media.extend(item.media)
+        return media
+
+    def own_payload(self) -> None:
+        """Copy media and thread items that may be shared with other posts.
+
+        Posts of a repeat series share these items until one is posted,
+        which sets media and tweet IDs on them.
+        """
+        self.media = [item.model_copy() for item in self.media]
+        if self.thread is not None:
+            self.thread = [
+                item.model_copy(update={"media": [media.model_copy() for media in item.media]})
+                for item in self.thread
+            ]
+
 
 class Config(BaseModel):
     """Configuration model."""
@@ -89,6 +124,19 @@ class Config(BaseModel):
     daily_limit: int = 17
     monthly_limit: int = 500
     retry_max: int = 3
+    concurrency: int = Field(1, ge=1, le=16)
+    upload_concurrency: int = Field(4, ge=1, le=16)
+    history_retention: int = Field(1000, ge=0)  # 0 keeps all history inline
+    burst_limit: Optional[int] = Field(None, ge=1)  # Max posts back to back
+    repeat_ahead: int = Field(3, ge=1)  # Upcoming posts kept per repeat series
+    repeat_horizon_days: Optional[int] = Field(None, ge=1)  # Only keep those within this many days
+
+
+class RateLimit(BaseModel):
+    """X API rate limit state of one endpoint, from response headers."""
+    limit: Optional[int] = None
+    remaining: int
+    reset_at: datetime
 
 
 class Stats(BaseModel):
@@ -97,6 +145,13 @@ class Stats(BaseModel):
     daily_reset_at: datetime
     monthly_count: int = 0
     monthly_reset_at: datetime
+    post_times: list[datetime] = Field(default_factory=list)  # Posts in the last 30 days
+    rate_limits: dict[str, RateLimit] = Field(default_factory=dict)  # By endpoint
+    journal_seq: int = 0  # Last journal record included in this file
+    # Scheduled time of the post the user cancelled, by repeat series key
+    stopped_series: dict[str, datetime] = Field(default_factory=dict)
+    # Stats of other accounts by account key; the fields above are the default account's
+    accounts: dict[str, "Stats"] = Field(default_factory=dict)
 
 
 class HistoryEntry(BaseModel):
@@ -115,3 +170,97 @@ class PostsData(BaseModel):
     posts: list[Post] = Field(default_factory=list)
     history: list[HistoryEntry] = Field(default_factory=list)
     stats: Stats
+
+    _posts_by_id: dict[str, Post] = PrivateAttr(default_factory=dict)
+    # Raw payload templates by key, and those validated so far
+    _templates: dict[str, dict] = PrivateAttr(default_factory=dict)
+    _payloads: dict[str, Payload] = PrivateAttr(default_factory=dict)
+
+    def model_post_init(self, __context) -> None:
+        self._posts_by_id = {post.id: post for post in self.posts}
+
+    def stats_for(self, account: Optional[str]) -> Stats:
+        """Get the stats of an account, adding them on first use."""
+        if account is None:
+            return self.stats
+        stats = self.stats.accounts.get(account)
+        if stats is None:
+            now = datetime.now(timezone.utc)
+            stats = self.stats.accounts[account] = Stats(daily_reset_at=now, monthly_reset_at=now)
+        return stats
+
+    @property
+    def templates(self) -> dict[str, dict]:
+        """Get the raw payload templates read with the data, by key."""
+        return self._templates
+
+    def set_templates(self, templates: dict[str, dict]) -> None:
+        """Set the raw payload templates that stored post records refer to."""
+        self._templates = templates
+        self._payloads = {}
+
+    def payload(self, key: str) -> Payload:
+        """Get a payload template, validating it on first use.
+
+        Raises:
+            ValueError: If there is no template with that key
+        """
+        payload = self._payloads.get(key)
+        if payload is None:
+            raw = self._templates.get(key)
+            if raw is None:
+                raise ValueError(f"Unknown payload template: {key}")
+            payload = self._payloads[key] = Payload.model_validate(raw)
+        return payload
+
+    def resolve_post(self, record: dict) -> Post:
+        """Validate a stored post record, filling in its payload template.
+
+        A record may refer to a template by key instead of holding its
+        text, media and thread items, with the IDs of its uploaded media
+        in media_ids. Posts with the same template share its items until
+        one is claimed (see Post.own_payload).
+        """
+        key = record.get("template")
+        if key is None:
+            return Post.model_validate(record)
+
+        post = Post.model_validate({
+            field: value for field, value in record.items() if field not in ("template", "media_ids")
+        })
+        payload = self.payload(key)
+        post.text, post.media, post.thread = payload.text, payload.media, payload.thread
+        media_ids = record.get("media_ids")
+        if media_ids:
+            post.own_payload()
+            for item, media_id in zip(post.media_items(), media_ids):
+                item.media_id = media_id
+        return post
+
+    def get_post(self, post_id: str) -> Optional[Post]:
+        """Get a post by ID."""
+        post = self._posts_by_id.get(post_id)
+        if post is None and len(self._posts_by_id) != len(self.posts):
+            # posts was modified directly, resync the map
+            self._posts_by_id = {p.id: p for p in self.posts}
+            post = self._posts_by_id.get(post_id)
+        return post
+
+    def add_post(self, post: Post) -> None:
+        """Append a post and index it by ID."""
+        self.posts.append(post)
+        self._posts_by_id[post.id] = post
+
+    def replace_post(self, post: Post) -> bool:
+        """Replace the post with the same ID.
+
+        Returns:
+            False if no post has that ID
+        """
+        current = self.get_post(post.id)
+        if current is None:
+            return False
+        index = next(i for i, p in enumerate(self.posts) if p is current)
+        self.posts[index] = post
+        self._posts_by_id[post.id] = post
+        return True
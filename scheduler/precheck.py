@@ -0,0 +1,158 @@
+"""Fast pre-check of the data file before a full load.
+
+Reads only the config and the next due time so a cron run with nothing to
+do can exit without importing pydantic or tweepy. Uses the due index file
+written next to the data file when it is up to date, and otherwise reads
+the raw JSON without validating posts.
+"""
+import json
+import os
+import sqlite3
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+from zoneinfo import ZoneInfo
+
+from .constants import MANIFEST_NAME, SQLITE_SUFFIXES
+
+# Same defaults as models.Config
+DEFAULT_TIMEZONE = "Asia/Tokyo"
+DEFAULT_INTERVAL_MINUTES = 15
+
+
+def resolve_data_path(data_path: Optional[str] = None) -> Path:
+    """Get the data file path.
+
+    Args:
+        data_path: Explicit path. If None, uses DATA_PATH or data/posts.json
+            relative to the project root.
+    """
+    if data_path or os.environ.get("DATA_PATH"):
+        return Path(data_path or os.environ["DATA_PATH"])
+    return Path(__file__).parent.parent / "data" / "posts.json"
+
+
+def sidecar_path(data_path: Path) -> Path:
+    """Get the due index file path for a data file."""
+    return data_path.with_name(f"{data_path.stem}.due.json")
+
+
+def journal_path(data_path: Path) -> Path:
+    """Get the write-ahead journal path for a data file."""
+    return data_path.with_name(f"{data_path.stem}.journal")
+
+
+def file_signature(data_path: Path) -> list[int]:
+    """Get the mtime/size pair used to detect changes to a data file."""
+    stat = data_path.stat()
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def read_sidecar(data_path: Path) -> Optional[dict]:
+    """Read the due index file if it matches the current data file."""
+    try:
+        with open(sidecar_path(data_path), "r", encoding="utf-8") as f:
+            raw = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if raw.get("signature") != file_signature(data_path):
+        return None
+    return raw
+
+
+@dataclass
+class Peek:
+    """Config and next due time read without a full load."""
+    config: dict
+    next_due: Optional[datetime]
+    posting: int = 0  # Posts left POSTING, which need reconciling
+
+    @property
+    def timezone(self) -> str:
+        return self.config.get("timezone", DEFAULT_TIMEZONE)
+
+    @property
+    def interval_minutes(self) -> int:
+        return self.config.get("interval_minutes", DEFAULT_INTERVAL_MINUTES)
+
+    def has_due_posts(self, now: Optional[datetime] = None) -> bool:
+        """Check if any pending post is due."""
+        if self.next_due is None:
+            return False
+        return self.next_due <= (now or datetime.now(ZoneInfo(self.timezone)))
+
+
+def _parse_scheduled_at(value: str, tz: ZoneInfo) -> datetime:
+    dt = datetime.fromisoformat(value)
+    return dt if dt.tzinfo is not None else dt.replace(tzinfo=tz)
+
+
+def _earliest(scheduled: list[tuple[str, Optional[str]]], tz: ZoneInfo) -> Optional[datetime]:
+    """Get the earliest due time of (scheduled_at, deferred_until) pairs."""
+    return min(
+        (
+            max(_parse_scheduled_at(at, tz), _parse_scheduled_at(until, tz)) if until
+            else _parse_scheduled_at(at, tz)
+            for at, until in scheduled
+        ),
+        default=None
+    )
+
+
+def peek(data_path: Path) -> Peek:
+    """Read the config and next due time of a data file.
+
+    Raises:
+        OSError: If the data file cannot be read
+        ValueError: If the data file is malformed or has unsaved
+            journal records
+    """
+    journal = journal_path(data_path)
+    if journal.exists() and journal.stat().st_size:
+        raise ValueError(f"Journal has changes not yet saved: {journal}")
+
+    sidecar = read_sidecar(data_path)
+    if sidecar is not None and "config" in sidecar:
+        config = sidecar["config"]
+        epochs = sidecar.get("epochs") or []
+        tz = ZoneInfo(config.get("timezone", DEFAULT_TIMEZONE))
+        next_due = datetime.fromtimestamp(epochs[0], tz) if epochs else None
+        return Peek(config=config, next_due=next_due, posting=sidecar.get("posting", 0))
+
+    if data_path.suffix.lower() in SQLITE_SUFFIXES:
+        if not data_path.exists():
+            raise FileNotFoundError(f"Data file not found: {data_path}")
+        conn = sqlite3.connect(data_path)
+        try:
+            row = conn.execute("SELECT value FROM meta WHERE key = 'config'").fetchone()
+            scheduled = conn.execute(
+                "SELECT scheduled_at, json_extract(body, '$.deferred_until') FROM posts WHERE status = 'pending'"
+            ).fetchall()
+            (posting,) = conn.execute("SELECT COUNT(*) FROM posts WHERE status = 'posting'").fetchone()
+        except sqlite3.Error as e:
+            raise ValueError(f"Invalid data file {data_path}: {e}") from e
+        finally:
+            conn.close()
+        config = json.loads(row[0]) if row else {}
+    elif data_path.name == MANIFEST_NAME:
+        with open(data_path, "r", encoding="utf-8") as f:
+            raw = json.load(f)
+        config = raw.get("config") or {}
+        shards = (raw.get("shards") or {}).values()
+        scheduled = [(shard["first_due"], None) for shard in shards if shard.get("first_due")]
+        posting = sum(shard.get("posting", 0) for shard in shards)
+    else:
+        with open(data_path, "r", encoding="utf-8") as f:
+            raw = json.load(f)
+        config = raw.get("config") or {}
+        posts = raw.get("posts", [])
+        scheduled = [
+            (post["scheduled_at"], post.get("deferred_until"))
+            for post in posts if post.get("status", "pending") == "pending"
+        ]
+        posting = sum(1 for post in posts if post.get("status") == "posting")
+
+    tz = ZoneInfo(config.get("timezone", DEFAULT_TIMEZONE))
+    return Peek(config=config, next_due=_earliest(scheduled, tz), posting=posting)
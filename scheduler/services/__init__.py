@@ -1,16 +1,32 @@
-"""Services package for the X scheduler."""
-from .x_api_client import XApiClient, XCredentials
-from .post_service import PostService, PostResult
-from .media_service import MediaService
-from .limit_service import LimitService
-from .repeat_service import RepeatService
+"""Services package for the X scheduler.
 
-__all__ = [
-    "XApiClient",
-    "XCredentials",
-    "PostService",
-    "PostResult",
-    "MediaService",
-    "LimitService",
-    "RepeatService",
-]
+Services are imported on first access, so importing one service does not
+pull in tweepy or aiohttp unless the API clients are used.
+"""
+import importlib
+
+_EXPORTS = {
+    "XApiClient": ".x_api_client",
+    "XCredentials": ".x_api_client",
+    "AsyncXApiClient": ".async_x_api_client",
+    "PostService": ".post_service",
+    "PostResult": ".post_service",
+    "MediaService": ".media_service",
+    "MediaCache": ".media_cache",
+    "LimitService": ".limit_service",
+    "QuotaEngine": ".quota",
+    "BacklogPlanner": ".planner",
+    "RepeatService": ".repeat_service",
+    "Recurrence": ".repeat_service",
+    "PostExecutor": ".executor",
+    "RateLimitTracker": ".rate_limits",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(module, __name__), name)
@@ -0,0 +1,326 @@
+"""Asynchronous X API client using aiohttp."""
+import asyncio
+import logging
+from pathlib import Path
+from typing import Any, Optional
+
+from oauthlib.oauth1 import Client as OAuth1Client
+
+try:
+    import aiohttp
+except ImportError:  # aiohttp is an optional dependency
+    aiohttp = None
+
+from .media_cache import MediaId
+from .rate_limits import RateLimitTracker
+from .x_api_client import OutcomeUnknownError, RateLimitError, XApiError, XCredentials
+
+logger = logging.getLogger(__name__)
+
+API_BASE_URL = "https://api.twitter.com"
+UPLOAD_BASE_URL = "https://upload.twitter.com"
+
+
+class AsyncXApiClient:
+    """Async X API client with the same operations as XApiClient.
+
+    All requests share one aiohttp session, so connections are kept alive
+    and many calls can be in flight on one event loop. Base URLs can be
+    pointed at a local server for testing.
+
+    Usage:
+        async with AsyncXApiClient(credentials) as client:
+            await client.post_tweet("hello")
+    """
+
+    def __init__(
+        self,
+        credentials: XCredentials,
+        api_base_url: str = API_BASE_URL,
+        upload_base_url: str = UPLOAD_BASE_URL,
+        pool_size: int = 100,
+        timeout: float = 30.0,
+        rate_limits: Optional[RateLimitTracker] = None
+    ):
+        """Initialize async X API client.
+
+        Args:
+            credentials: X API OAuth 1.0a credentials
+            api_base_url: Base URL of the v2 API
+            upload_base_url: Base URL of the v1.1 media upload API
+            pool_size: Maximum number of open connections
+            timeout: Total timeout per request in seconds
+            rate_limits: Tracker updated from every response's rate limit
+                headers. If None, a new one is created.
+        """
+        if aiohttp is None:
+            raise ImportError("AsyncXApiClient requires aiohttp (pip install 'postx[async]')")
+
+        self.credentials = credentials
+        self.api_base_url = api_base_url.rstrip("/")
+        self.upload_base_url = upload_base_url.rstrip("/")
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.rate_limits = rate_limits or RateLimitTracker()
+        self._oauth = OAuth1Client(
+            credentials.consumer_key,
+            client_secret=credentials.consumer_secret,
+            resource_owner_key=credentials.access_token,
+            resource_owner_secret=credentials.access_token_secret
+        )
+        self._session: Optional["aiohttp.ClientSession"] = None
+        self._user_id: Optional[str] = None
+        self._user_lock = asyncio.Lock()
+
+    async def __aenter__(self) -> "AsyncXApiClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    def _get_session(self) -> "aiohttp.ClientSession":
+        """Get or create the shared HTTP session."""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.pool_size)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+            logger.debug("Initialized aiohttp session")
+        return self._session
+
+    async def close(self) -> None:
+        """Close the HTTP session and its connections."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def _request(
+        self,
+        method: str,
+        url: str,
+        json: Optional[dict] = None,
+        data: Any = None
+    ) -> dict:
+        """Send a signed request and return the decoded JSON body.
+
+        Raises:
+            RateLimitError: If the endpoint's rate limit is exhausted (HTTP 429)
+            OutcomeUnknownError: If the request timed out, the connection
+                dropped or X returned a 5xx, so it may have been carried out
+            XApiError: If the request fails or returns another error status
+        """
+        # JSON and multipart bodies are not part of the OAuth 1.0a signature
+        _, headers, _ = self._oauth.sign(url, http_method=method)
+        session = self._get_session()
+
+        try:
+            async with session.request(method, url, json=json, data=data, headers=headers) as response:
+                self.rate_limits.record_response(method, url, response.headers)
+                if response.status >= 400:
+                    text = await response.text()
+                    message = f"{response.status} {response.reason}: {text}"
+                    if response.status == 429:
+                        raise RateLimitError(message)
+                    if response.status >= 500:
+                        raise OutcomeUnknownError(message)
+                    raise XApiError(message)
+                if response.status == 204:
+                    return {}
+                return await response.json(content_type=None)
+        except aiohttp.ClientConnectorError as e:
+            raise XApiError(f"Request failed: {e}") from e
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            raise OutcomeUnknownError(f"Request failed: {e!r}") from e
+
+    async def post_tweet(
+        self,
+        text: str,
+        media_ids: Optional[list[str]] = None,
+        reply_to: Optional[str] = None
+    ) -> str:
+        """Post a tweet.
+
+        Args:
+            text: Tweet text (max 280 characters)
+            media_ids: List of media IDs to attach (max 4)
+            reply_to: Tweet ID to reply to (for threads)
+
+        Returns:
+            The posted tweet ID
+
+        Raises:
+            XApiError: If posting fails
+            ValueError: If parameters are invalid
+        """
+        if not text or len(text) > 280:
+            raise ValueError(f"Tweet text must be 1-280 characters, got {len(text)}")
+
+        if media_ids and len(media_ids) > 4:
+            raise ValueError(f"Maximum 4 media items allowed, got {len(media_ids)}")
+
+        payload: dict[str, Any] = {"text": text}
+        if media_ids:
+            payload["media"] = {"media_ids": [str(media_id) for media_id in media_ids]}
+        if reply_to:
+            payload["reply"] = {"in_reply_to_tweet_id": str(reply_to)}
+
+        try:
+            response = await self._request("POST", f"{self.api_base_url}/2/tweets", json=payload)
+            tweet_id = str(response["data"]["id"])
+        except XApiError as e:
+            logger.error(f"Failed to post tweet: {e}, text: {text[:50]}...")
+            # Keeps the error type, so rate limits and unknown outcomes stay distinguishable
+            raise type(e)(f"Tweet posting failed: {e}") from e
+
+        logger.info(f"Posted tweet: {tweet_id} (text: {text[:50]}...)")
+        return tweet_id
+
+    async def post_thread(self, items: list[dict]) -> list[str]:
+        """Post a thread of tweets.
+
+        Args:
+            items: List of dicts with 'text' and optional 'media_ids'
+
+        Returns:
+            List of posted tweet IDs in order
+
+        Raises:
+            XApiError: If posting fails
+            ValueError: If items structure is invalid
+        """
+        if not items:
+            raise ValueError("Thread must contain at least one item")
+
+        tweet_ids = []
+        reply_to = None
+
+        for idx, item in enumerate(items, 1):
+            if "text" not in item:
+                raise ValueError(f"Thread item {idx} missing 'text' field")
+
+            try:
+                tweet_id = await self.post_tweet(
+                    text=item["text"],
+                    media_ids=item.get("media_ids"),
+                    reply_to=reply_to
+                )
+                tweet_ids.append(tweet_id)
+                reply_to = tweet_id
+
+            except XApiError as e:
+                logger.error(f"Thread posting failed at item {idx}/{len(items)}: {e}")
+                # Rollback: delete successfully posted tweets
+                results = await asyncio.gather(
+                    *(self.delete_tweet(tid) for tid in tweet_ids),
+                    return_exceptions=True
+                )
+                for tid, result in zip(tweet_ids, results):
+                    if isinstance(result, Exception):
+                        logger.warning(f"Failed to rollback tweet {tid}: {result}")
+                    else:
+                        logger.info(f"Rolled back tweet: {tid}")
+                raise type(e)(f"Thread posting failed at item {idx}: {e}") from e
+
+        logger.info(f"Posted thread with {len(tweet_ids)} tweets: {tweet_ids}")
+        return tweet_ids
+
+    async def get_user_id(self) -> str:
+        """Get the authenticated user's ID, looked up once per client."""
+        async with self._user_lock:
+            if self._user_id is None:
+                response = await self._request("GET", f"{self.api_base_url}/2/users/me")
+                self._user_id = str(response["data"]["id"])
+        return self._user_id
+
+    async def repost(self, tweet_id: str) -> bool:
+        """Repost (retweet) a tweet.
+
+        Args:
+            tweet_id: The tweet ID to repost
+
+        Returns:
+            True if successful
+
+        Raises:
+            XApiError: If reposting fails
+        """
+        if not tweet_id:
+            raise ValueError("tweet_id cannot be empty")
+
+        try:
+            user_id = await self.get_user_id()
+            await self._request(
+                "POST",
+                f"{self.api_base_url}/2/users/{user_id}/retweets",
+                json={"tweet_id": str(tweet_id)}
+            )
+        except XApiError as e:
+            logger.error(f"Failed to repost tweet {tweet_id}: {e}")
+            raise type(e)(f"Repost failed: {e}") from e
+
+        logger.info(f"Reposted tweet: {tweet_id} by user {user_id}")
+        return True
+
+    async def upload_media(self, file_path: str) -> str:
+        """Upload media file.
+
+        Args:
+            file_path: Path to the media file
+
+        Returns:
+            The media ID, as a MediaId with the expiry X reported
+
+        Raises:
+            XApiError: If upload fails
+            FileNotFoundError: If file doesn't exist
+        """
+        path = Path(file_path)
+        if not path.exists():
+            raise FileNotFoundError(f"Media file not found: {file_path}")
+
+        file_size = path.stat().st_size
+        if file_size > 512 * 1024 * 1024:  # 512MB
+            raise ValueError(f"File too large: {file_size} bytes (max 512MB)")
+
+        logger.debug(f"Uploading media: {file_path} ({file_size} bytes)")
+        try:
+            with open(path, "rb") as f:
+                form = aiohttp.FormData()
+                form.add_field("media", f, filename=path.name)
+                response = await self._request(
+                    "POST",
+                    f"{self.upload_base_url}/1.1/media/upload.json",
+                    data=form
+                )
+            media_id = MediaId(str(response["media_id_string"]), response.get("expires_after_secs"))
+        except XApiError as e:
+            logger.error(f"Failed to upload media {file_path}: {e}")
+            raise type(e)(f"Media upload failed: {e}") from e
+
+        logger.info(f"Uploaded media: {media_id} from {path.name}")
+        return media_id
+
+    async def delete_tweet(self, tweet_id: str) -> bool:
+        """Delete a tweet.
+
+        Args:
+            tweet_id: The tweet ID to delete
+
+        Returns:
+            True if successful
+
+        Raises:
+            XApiError: If deletion fails
+        """
+        if not tweet_id:
+            raise ValueError("tweet_id cannot be empty")
+
+        try:
+            await self._request("DELETE", f"{self.api_base_url}/2/tweets/{tweet_id}")
+        except XApiError as e:
+            logger.error(f"Failed to delete tweet {tweet_id}: {e}")
+            raise type(e)(f"Tweet deletion failed: {e}") from e
+
+        logger.info(f"Deleted tweet: {tweet_id}")
+        return True
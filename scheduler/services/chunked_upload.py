@@ -0,0 +1,167 @@
+"""Chunked, resumable media upload."""
+import hashlib
+import json
+import logging
+import mmap
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional
+
+from .media_cache import MediaId
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 4 * 1024 * 1024  # X accepts up to 5MB per APPEND
+MAX_SEGMENTS = 999
+DEFAULT_MEDIA_EXPIRY = 24 * 60 * 60
+
+
+class MediaProcessingError(Exception):
+    """Media was uploaded but X failed to process it."""
+    pass
+
+
+class ChunkedUploader:
+    """Uploads a file with INIT/APPEND/FINALIZE.
+
+    Chunks are sliced from a memory-mapped file and several are appended
+    at once. With a state directory, the media ID and finished segments
+    are recorded after each chunk, so an interrupted upload continues from
+    where it stopped on the next run.
+    """
+
+    def __init__(
+        self,
+        api,
+        state_dir: Optional[str | Path] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        max_parallel_chunks: int = 2
+    ):
+        """Initialize chunked uploader.
+
+        Args:
+            api: tweepy.API (v1.1) instance
+            state_dir: Directory for upload progress files. If None, uploads
+                are not resumable.
+            chunk_size: Bytes per APPEND request
+            max_parallel_chunks: Number of APPEND requests in flight
+        """
+        self.api = api
+        self.state_dir = Path(state_dir) if state_dir else None
+        self.chunk_size = chunk_size
+        self.max_parallel_chunks = max(1, max_parallel_chunks)
+
+    def _state_path(self, path: Path) -> Optional[Path]:
+        if self.state_dir is None:
+            return None
+        key = hashlib.sha1(str(path.resolve()).encode()).hexdigest()
+        return self.state_dir / f"{key}.json"
+
+    def _load_state(self, path: Path, size: int, mtime_ns: int) -> Optional[dict]:
+        """Load progress of an earlier upload of the same unchanged file."""
+        state_path = self._state_path(path)
+        if state_path is None or not state_path.exists():
+            return None
+
+        try:
+            with open(state_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if (state.get("size"), state.get("mtime_ns")) != (size, mtime_ns):
+            return None
+        if state.get("expires_at", 0) <= time.time():
+            return None
+        return state
+
+    def _save_state(self, path: Path, state: dict) -> None:
+        state_path = self._state_path(path)
+        if state_path is None:
+            return
+        state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = state_path.with_name(state_path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, state_path)
+
+    def _clear_state(self, path: Path) -> None:
+        state_path = self._state_path(path)
+        if state_path is not None and state_path.exists():
+            state_path.unlink()
+
+    def upload(self, path: Path, media_type: str, media_category: Optional[str] = None) -> str:
+        """Upload a file in chunks.
+
+        Args:
+            path: File to upload
+            media_type: MIME type, e.g. "video/mp4"
+            media_category: X media category, e.g. "tweet_video"
+
+        Returns:
+            The media ID, as a MediaId with the expiry X reported
+        """
+        stat = path.stat()
+        size = stat.st_size
+        # Grow chunks if needed to stay within the segment limit
+        chunk_size = max(self.chunk_size, -(-size // MAX_SEGMENTS))
+
+        state = self._load_state(path, size, stat.st_mtime_ns)
+        if state and state["chunk_size"] == chunk_size:
+            logger.info(f"Resuming upload of {path.name}: {len(state['done'])} segments already sent")
+        else:
+            media = self.api.chunked_upload_init(size, media_type, media_category=media_category)
+            state = {
+                "media_id": str(media.media_id),
+                "size": size,
+                "mtime_ns": stat.st_mtime_ns,
+                "chunk_size": chunk_size,
+                "expires_at": time.time() + getattr(media, "expires_after_secs", DEFAULT_MEDIA_EXPIRY),
+                "done": [],
+            }
+            self._save_state(path, state)
+
+        media_id = state["media_id"]
+        segments = -(-size // chunk_size)
+        done = set(state["done"])
+        todo = [index for index in range(segments) if index not in done]
+        lock = threading.Lock()
+
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            def append(index: int) -> None:
+                start = index * chunk_size
+                self.api.chunked_upload_append(media_id, (path.name, mm[start:start + chunk_size]), index)
+                with lock:
+                    state["done"].append(index)
+                    self._save_state(path, state)
+
+            with ThreadPoolExecutor(max_workers=self.max_parallel_chunks) as pool:
+                # Surface the first failure; progress so far stays recorded
+                for future in [pool.submit(append, index) for index in todo]:
+                    future.result()
+
+        try:
+            media = self.api.chunked_upload_finalize(media_id)
+        except Exception:
+            # The server may have dropped the upload; start over next time
+            self._clear_state(path)
+            raise
+
+        processing = getattr(media, "processing_info", None)
+        while processing and processing.get("state") in ("pending", "in_progress"):
+            time.sleep(processing.get("check_after_secs", 1))
+            media = self.api.get_media_upload_status(media_id)
+            processing = getattr(media, "processing_info", None)
+
+        self._clear_state(path)
+        if processing and processing.get("state") == "failed":
+            raise MediaProcessingError(f"Media processing failed: {processing.get('error')}")
+
+        expires_after_secs = getattr(media, "expires_after_secs", None)
+        if expires_after_secs is None:
+            # Fall back to the expiry reported by INIT
+            expires_after_secs = int(state["expires_at"] - time.time())
+        return MediaId(media_id, expires_after_secs)
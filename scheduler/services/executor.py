@@ -0,0 +1,68 @@
+"""Concurrent execution of due posts."""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from ..models import Post, PostType
+from .post_service import PostResult, PostService
+
+logger = logging.getLogger(__name__)
+
+
+class PostExecutor:
+    """Runs due posts on a bounded worker pool.
+
+    Posts that share an ordering key run one after another in the order
+    given; different keys run in parallel. A thread post always runs on a
+    single worker, so its tweets stay in reply order. Results are returned
+    in the order of the input posts regardless of completion order.
+    """
+
+    def __init__(self, post_service: PostService, max_workers: int = 1):
+        self.post_service = post_service
+        self.max_workers = max(1, max_workers)
+
+    @staticmethod
+    def ordering_key(post: Post) -> str:
+        """Get the key of posts that must not run concurrently."""
+        # Reposting the same tweet twice at once would race on the retweet
+        if post.type == PostType.REPOST and post.target_tweet_id:
+            return f"repost:{post.target_tweet_id}"
+        return f"post:{post.id}"
+
+    def run(self, posts: list[Post], dry_run: bool = False) -> list[PostResult]:
+        """Execute posts.
+
+        Args:
+            posts: Due posts in execution order
+            dry_run: If True, don't actually post
+
+        Returns:
+            One PostResult per post, in the same order as posts
+        """
+        groups: dict[str, list[Post]] = {}
+        for post in posts:
+            groups.setdefault(self.ordering_key(post), []).append(post)
+
+        workers = min(self.max_workers, len(groups))
+        if workers <= 1:
+            return [self._execute(post, dry_run) for post in posts]
+
+        logger.info(f"Executing {len(posts)} posts with {workers} workers")
+        results: dict[str, PostResult] = {}
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="post") as pool:
+            futures = [
+                pool.submit(self._run_group, group, dry_run)
+                for group in groups.values()
+            ]
+            for future in futures:
+                for result in future.result():
+                    results[result.post_id] = result
+
+        return [results[post.id] for post in posts]
+
+    def _run_group(self, posts: list[Post], dry_run: bool) -> list[PostResult]:
+        return [self._execute(post, dry_run) for post in posts]
+
+    def _execute(self, post: Post, dry_run: bool) -> PostResult:
+        logger.info(f"Processing post: {post.id} (type={post.type})")
+        return self.post_service.execute_post(post, dry_run=dry_run)
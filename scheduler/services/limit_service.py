@@ -1,87 +1,165 @@
 """Rate limit management service."""
 import logging
+import threading
 from datetime import datetime, timedelta
+from typing import Optional
 from zoneinfo import ZoneInfo
 
 from ..models import Stats
+from .quota import QuotaEngine, SlidingWindow, TokenBucket
 
 logger = logging.getLogger(__name__)
 
+DAY = timedelta(hours=24)
+MONTH = timedelta(days=30)
+
 
 class LimitService:
-    """Service for managing rate limits."""
+    """Service for managing rate limits.
+
+    The daily and monthly limits are rolling 24-hour and 30-day windows
+    over the times of recent posts (stats.post_times), like X's own caps.
+    An optional burst limit spreads posts out with a token bucket that
+    refills at the daily rate.
+
+    Concurrent callers should use reserve() before posting and then
+    commit() or release(), so in-flight posts count against the limits.
+    """
 
     def __init__(
         self,
         stats: Stats,
         daily_limit: int = 17,
         monthly_limit: int = 500,
-        timezone: str = "Asia/Tokyo"
+        timezone: str = "Asia/Tokyo",
+        burst_limit: Optional[int] = None
     ):
         self.stats = stats
         self.daily_limit = daily_limit
         self.monthly_limit = monthly_limit
         self.tz = ZoneInfo(timezone)
-        self._check_reset()
-
-    def _check_reset(self) -> None:
-        """Check and reset counters if needed."""
-        now = datetime.now(self.tz)
-
-        # Check daily reset
-        daily_reset = self.stats.daily_reset_at
-        if daily_reset.tzinfo is None:
-            daily_reset = daily_reset.replace(tzinfo=self.tz)
-
-        if now >= daily_reset:
-            self.stats.daily_count = 0
-            # Set next reset to tomorrow midnight
-            tomorrow = now.date() + timedelta(days=1)
-            self.stats.daily_reset_at = datetime.combine(
-                tomorrow,
-                datetime.min.time(),
-                tzinfo=self.tz
-            )
-            logger.info("Daily counter reset")
-
-        # Check monthly reset
-        monthly_reset = self.stats.monthly_reset_at
-        if monthly_reset.tzinfo is None:
-            monthly_reset = monthly_reset.replace(tzinfo=self.tz)
-
-        if now >= monthly_reset:
-            self.stats.monthly_count = 0
-            # Set next reset to 1st of next month
-            if now.month == 12:
-                next_month = datetime(now.year + 1, 1, 1, tzinfo=self.tz)
-            else:
-                next_month = datetime(now.year, now.month + 1, 1, tzinfo=self.tz)
-            self.stats.monthly_reset_at = next_month
-            logger.info("Monthly counter reset")
+        self._lock = threading.Lock()
+
+        events = self._load_events()
+        limiters = {
+            "daily": SlidingWindow(daily_limit, DAY, events),
+            "monthly": SlidingWindow(monthly_limit, MONTH, events),
+        }
+        if burst_limit:
+            limiters["burst"] = TokenBucket(burst_limit, DAY / max(1, daily_limit), events)
+        self.quota = QuotaEngine(limiters)
+        self._sync_stats(self._now())
+
+    def _now(self) -> datetime:
+        return datetime.now(self.tz)
+
+    def _aware(self, dt: datetime) -> datetime:
+        return dt if dt.tzinfo is not None else dt.replace(tzinfo=self.tz)
+
+    def _load_events(self) -> list[datetime]:
+        """Get recent post times, converting calendar counters if needed."""
+        if self.stats.post_times:
+            return [self._aware(when) for when in self.stats.post_times]
+
+        # Counters from calendar-day/month limits: keep each counted post
+        # until the reset time it had
+        now = self._now()
+        events = []
+        daily_reset = self._aware(self.stats.daily_reset_at)
+        monthly_reset = self._aware(self.stats.monthly_reset_at)
+        daily = self.stats.daily_count if daily_reset > now else 0
+        if daily:
+            events += [daily_reset - DAY] * daily
+        if self.stats.monthly_count > daily and monthly_reset > now:
+            events += [monthly_reset - MONTH] * (self.stats.monthly_count - daily)
+        return events
+
+    def _sync_stats(self, now: datetime) -> None:
+        """Write the window state back to stats."""
+        daily = self.quota.limiters["daily"]
+        monthly = self.quota.limiters["monthly"]
+        self.stats.daily_count = daily.used(now)
+        self.stats.monthly_count = monthly.used(now)
+        self.stats.post_times = list(monthly.events)
+        # When the oldest counted post leaves each window
+        self.stats.daily_reset_at = daily.events[0] + DAY if daily.events else now
+        self.stats.monthly_reset_at = monthly.events[0] + MONTH if monthly.events else now
 
     def can_post(self) -> bool:
         """Check if posting is allowed within limits."""
-        self._check_reset()
+        with self._lock:
+            now = self._now()
+            self._sync_stats(now)
+            allowed = self.quota.available(now)
+
+        if not allowed:
+            logger.warning(
+                f"Post limit reached: daily {self.stats.daily_count}/{self.daily_limit}, "
+                f"monthly {self.stats.monthly_count}/{self.monthly_limit}"
+            )
+        return allowed
 
-        if self.stats.daily_count >= self.daily_limit:
-            logger.warning(f"Daily limit reached: {self.stats.daily_count}/{self.daily_limit}")
-            return False
+    def increment(self) -> None:
+        """Count a post that was made without a reservation."""
+        with self._lock:
+            now = self._now()
+            self.quota.add(now)
+            self._sync_stats(now)
+        logger.debug(f"Post count: daily={self.stats.daily_count}, monthly={self.stats.monthly_count}")
 
-        if self.stats.monthly_count >= self.monthly_limit:
-            logger.warning(f"Monthly limit reached: {self.stats.monthly_count}/{self.monthly_limit}")
+    def reserve(self) -> bool:
+        """Reserve quota for one post.
+
+        Returns:
+            True if a slot was reserved. The caller must then call
+            commit() or release().
+        """
+        with self._lock:
+            full = self.quota.reserve(self._now())
+
+        if full is not None:
+            next_slot = self.next_available()
+            logger.warning(
+                f"{full.capitalize()} limit reached, next slot at "
+                f"{next_slot.isoformat() if next_slot else 'after in-flight posts finish'}"
+            )
             return False
-
         return True
 
-    def increment(self) -> None:
-        """Increment the post counters."""
-        self.stats.daily_count += 1
-        self.stats.monthly_count += 1
-        logger.debug(f"Post count: daily={self.stats.daily_count}, monthly={self.stats.monthly_count}")
+    def commit(self) -> None:
+        """Count a reserved slot as posted."""
+        with self._lock:
+            now = self._now()
+            self.quota.commit(now)
+            self._sync_stats(now)
+
+    def release(self) -> None:
+        """Give back a reserved slot that was not used."""
+        with self._lock:
+            self.quota.release()
+
+    def next_available(self) -> Optional[datetime]:
+        """Get when the next post will be allowed.
+
+        Returns:
+            The time (now if a slot is free), or None if it depends on
+            posts still in flight
+        """
+        return self.quota.next_available(self._now())
+
+    def schedule(self, count: int, now: Optional[datetime] = None) -> list[Optional[datetime]]:
+        """Get when each of the next count posts will be allowed.
+
+        Returns:
+            Times in order, now for posts that fit in the current quota.
+            None for posts whose slot depends on posts still in flight.
+        """
+        return self.quota.schedule(now or self._now(), count)
 
     def get_remaining(self) -> dict:
         """Get remaining post counts."""
-        self._check_reset()
+        with self._lock:
+            self._sync_stats(self._now())
         return {
             "daily": self.daily_limit - self.stats.daily_count,
             "monthly": self.monthly_limit - self.stats.monthly_count,
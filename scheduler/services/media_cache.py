@@ -0,0 +1,185 @@
+"""Cache of uploaded media IDs keyed by file content."""
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# X keeps uploaded media for 24 hours; stop reusing IDs a bit earlier.
+# Used when the upload response does not report an expiry.
+DEFAULT_TTL_SECONDS = 23 * 60 * 60
+# Stop reusing an ID this long before the expiry X reported
+EXPIRY_MARGIN_SECONDS = 60 * 60
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+class MediaId(str):
+    """A media ID, with how long X said it keeps the upload if it did."""
+
+    expires_after_secs: Optional[int]
+
+    def __new__(cls, media_id: str, expires_after_secs: Optional[int] = None):
+        self = super().__new__(cls, media_id)
+        self.expires_after_secs = expires_after_secs
+        return self
+
+
+class MediaCache:
+    """Persistent cache of media IDs for files that were already uploaded.
+
+    Entries are keyed by the SHA-256 of the file content. A file's size
+    and mtime are remembered so unchanged files are not hashed again.
+    Entries are evicted when they expire or, beyond max_entries, least
+    recently used first.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str | Path] = None,
+        ttl_seconds: int = DEFAULT_TTL_SECONDS,
+        max_entries: int = 1000
+    ):
+        """Initialize media cache.
+
+        Args:
+            path: JSON file to persist the cache in. If None, memory only.
+            ttl_seconds: How long an uploaded media ID stays reusable
+            max_entries: Maximum number of cached media IDs
+        """
+        self.path = Path(path) if path else None
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, dict] = OrderedDict()
+        self._files: dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def load(self) -> None:
+        """Load the cache file if it exists."""
+        if self.path is None or not self.path.exists():
+            return
+
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                raw = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable media cache {self.path}: {e}")
+            return
+
+        entries = sorted(raw.get("entries", {}).items(), key=lambda kv: kv[1]["last_used"])
+        with self._lock:
+            self._entries = OrderedDict(entries)
+            self._files = raw.get("files", {})
+            self._evict()
+
+    def save(self) -> None:
+        """Write the cache file."""
+        if self.path is None:
+            return
+
+        with self._lock:
+            self._evict()
+            hashes = set(self._entries)
+            raw = {
+                "entries": dict(self._entries),
+                "files": {p: f for p, f in self._files.items() if f["sha256"] in hashes},
+            }
+
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(raw, f)
+        os.replace(tmp_path, self.path)
+
+    def content_hash(self, path: Path) -> str:
+        """Get the SHA-256 of a file, skipping the read if size/mtime match."""
+        key = str(path.resolve())
+        stat = path.stat()
+        with self._lock:
+            known = self._files.get(key)
+        if known and known["size"] == stat.st_size and known["mtime_ns"] == stat.st_mtime_ns:
+            return known["sha256"]
+
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+                digest.update(chunk)
+        sha256 = digest.hexdigest()
+
+        with self._lock:
+            self._files[key] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": sha256}
+        return sha256
+
+    def get(self, path: Path) -> Optional[str]:
+        """Get a still-valid media ID for a file's content."""
+        sha256 = self.content_hash(path)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(sha256)
+            if entry is None or entry["expires_at"] <= now:
+                self.misses += 1
+                return None
+
+            entry["last_used"] = now
+            self._entries.move_to_end(sha256)
+            self.hits += 1
+            return entry["media_id"]
+
+    def put(self, path: Path, media_id: str, expires_after_secs: Optional[int] = None) -> None:
+        """Remember the media ID uploaded for a file's content.
+
+        Args:
+            path: Uploaded file
+            media_id: Its media ID
+            expires_after_secs: Expiry reported by X for the upload, by
+                default the one a MediaId carries. The ID is reused until
+                EXPIRY_MARGIN_SECONDS before it, and at most for ttl_seconds.
+        """
+        if expires_after_secs is None:
+            expires_after_secs = getattr(media_id, "expires_after_secs", None)
+        ttl = self.ttl_seconds
+        if expires_after_secs is not None:
+            ttl = min(ttl, expires_after_secs - EXPIRY_MARGIN_SECONDS)
+        if ttl <= 0:
+            logger.debug(f"Not caching media {media_id}: it expires in {expires_after_secs}s")
+            return
+
+        sha256 = self.content_hash(path)
+        now = time.time()
+        with self._lock:
+            self._entries[sha256] = {
+                "media_id": str(media_id),
+                "expires_at": now + ttl,
+                "last_used": now,
+            }
+            self._entries.move_to_end(sha256)
+            self._evict()
+
+    def _evict(self) -> None:
+        """Drop expired entries, then the least recently used beyond the limit."""
+        now = time.time()
+        for sha256 in [h for h, e in self._entries.items() if e["expires_at"] <= now]:
+            del self._entries[sha256]
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    @property
+    def hit_rate(self) -> float:
+        """Get the fraction of lookups served from the cache."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self) -> dict:
+        """Get lookup statistics."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate,
+            "entries": len(self._entries),
+        }
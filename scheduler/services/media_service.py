@@ -1,9 +1,11 @@
 """Media upload service."""
 import logging
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
 from typing import Optional
 
 from ..models import MediaItem
+from .media_cache import MediaCache
 
 logger = logging.getLogger(__name__)
 
@@ -24,12 +26,62 @@ MEDIA_LIMITS = {
 }
 
 
-class MediaService:
-    """Service for handling media uploads."""
+class MediaUploads:
+    """Media uploads running in the background."""
+
+    def __init__(self, futures: list[Future]):
+        self._futures = futures
+
+    def result(self) -> list[str]:
+        """Wait for all uploads.
 
-    def __init__(self, x_client, base_path: Optional[str] = None):
+        Returns:
+            List of media IDs in the original order
+
+        Raises:
+            Exception: The first upload error, after cancelling the rest
+        """
+        try:
+            return [future.result() for future in self._futures]
+        except Exception:
+            self.cancel()
+            raise
+
+    def cancel(self) -> None:
+        """Cancel uploads that have not started yet."""
+        for future in self._futures:
+            future.cancel()
+
+
+class MediaService:
+    """Service for handling media uploads.
+
+    Uploads run on a shared pool, so at most max_parallel_uploads files
+    are uploaded at once across all posts. With a MediaCache, files whose
+    content was uploaded recently reuse the existing media ID.
+    """
+
+    def __init__(
+        self,
+        x_client,
+        base_path: Optional[str] = None,
+        max_parallel_uploads: int = 4,
+        cache: Optional[MediaCache] = None
+    ):
         self.x_client = x_client
         self.base_path = Path(base_path) if base_path else Path.cwd()
+        self.max_parallel_uploads = max(1, max_parallel_uploads)
+        self.cache = cache
+        self._pool: Optional[ThreadPoolExecutor] = None
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        """Get or create the upload pool."""
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(
+                max_workers=self.max_parallel_uploads,
+                thread_name_prefix="media-upload"
+            )
+        return self._pool
 
     def validate(self, media: MediaItem) -> tuple[bool, Optional[str]]:
         """Validate a media item.
@@ -68,17 +120,47 @@ class MediaService:
         if not is_valid:
             raise ValueError(error)
 
+        return self._upload(media)
+
+    def _upload(self, media: MediaItem) -> str:
         path = self.base_path / media.path
-        return self.x_client.upload_media(str(path))
+
+        media_id = self.cache.get(path) if self.cache else None
+        if media_id:
+            logger.info(f"Reusing media {media_id} for {media.path}")
+        else:
+            media_id = self.x_client.upload_media(str(path))
+            if self.cache:
+                self.cache.put(path, media_id)
+
+        media.media_id = media_id = str(media_id)
+        return media_id
+
+    def start_upload_all(self, media_list: list[MediaItem]) -> MediaUploads:
+        """Start uploading all media items in the background.
+
+        All items are validated before any upload starts.
+
+        Returns:
+            MediaUploads to wait on for the media IDs
+
+        Raises:
+            ValueError: If any media item is invalid
+        """
+        for media in media_list:
+            is_valid, error = self.validate(media)
+            if not is_valid:
+                raise ValueError(error)
+
+        pool = self._get_pool()
+        return MediaUploads([pool.submit(self._upload, media) for media in media_list])
 
     def upload_all(self, media_list: list[MediaItem]) -> list[str]:
-        """Upload all media items.
+        """Upload all media items concurrently.
 
         Returns:
             List of media IDs
         """
-        media_ids = []
-        for media in media_list:
-            media_id = self.upload(media)
-            media_ids.append(media_id)
-        return media_ids
+        if len(media_list) <= 1:
+            return [self.upload(media) for media in media_list]
+        return self.start_upload_all(media_list).result()
@@ -0,0 +1,110 @@
+"""Planning which due posts run now and when the rest can run."""
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Optional
+from zoneinfo import ZoneInfo
+
+from ..models import Post
+from ..storage.due_index import due_at
+from .limit_service import LimitService
+from .rate_limits import RateLimitTracker, post_calls
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Plan:
+    """Due posts split into those to execute now and those deferred."""
+    ready: list[Post] = field(default_factory=list)  # In execution order
+    # Posts and when they can run; None means the next run
+    deferred: list[tuple[Post, Optional[datetime]]] = field(default_factory=list)
+
+
+class BacklogPlanner:
+    """Fits a backlog of due posts into the remaining quota.
+
+    Posts run highest priority first, then oldest first, while the daily,
+    monthly and burst limits have room and the X API endpoints they need
+    have calls left. Every other post is deferred to the time its quota
+    slot or rate limit window frees up, instead of being attempted and
+    counted as a failure.
+    """
+
+    def __init__(
+        self,
+        limit_service: LimitService,
+        rate_limits: Optional[RateLimitTracker] = None,
+        timezone: str = "Asia/Tokyo"
+    ):
+        self.limit_service = limit_service
+        self.rate_limits = rate_limits
+        self.tz = ZoneInfo(timezone)
+
+    def _order(self, post: Post) -> tuple:
+        return (-post.priority, due_at(post, self.tz).timestamp())
+
+    def plan(self, posts: list[Post], now: Optional[datetime] = None) -> Plan:
+        """Plan the execution of due posts.
+
+        Takes O(n log n) time in the number of posts.
+
+        Args:
+            posts: Due posts
+            now: Current time
+
+        Returns:
+            Plan of the posts to run now and the deferred ones
+        """
+        now = now or datetime.now(self.tz)
+        ordered = sorted(posts, key=self._order)
+        slots = iter(self.limit_service.schedule(len(ordered), now))
+        # Calls left per endpoint, taken from the tracker on first use
+        budgets: dict[str, int] = {}
+
+        plan = Plan()
+        for post in ordered:
+            calls = post_calls(post)
+            blocked_until = self._blocked_until(calls, budgets, now)
+            if blocked_until is not None:
+                plan.deferred.append((post, blocked_until))
+                continue
+
+            # Posts held back by rate limits do not use a quota slot
+            slot = next(slots)
+            if slot is None or slot > now:
+                plan.deferred.append((post, slot))
+                continue
+
+            for endpoint, count in calls.items():
+                if endpoint in budgets:
+                    budgets[endpoint] -= count
+            plan.ready.append(post)
+
+        if plan.deferred:
+            logger.info(f"Running {len(plan.ready)} due posts now, deferring {len(plan.deferred)}")
+        return plan
+
+    def _blocked_until(
+        self,
+        calls: dict[str, int],
+        budgets: dict[str, int],
+        now: datetime
+    ) -> Optional[datetime]:
+        """Get when the endpoints a post needs have enough calls left.
+
+        Returns:
+            The latest reset time, or None if the post can run now
+        """
+        if self.rate_limits is None:
+            return None
+
+        blocked = None
+        for endpoint, count in calls.items():
+            limit = self.rate_limits.get(endpoint)
+            if limit is None or limit.reset_at <= now:
+                continue
+            remaining = budgets.setdefault(endpoint, limit.remaining)
+            if remaining < count:
+                blocked = max(blocked, limit.reset_at) if blocked else limit.reset_at
+        return blocked
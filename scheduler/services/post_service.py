@@ -1,16 +1,31 @@
 """Post processing service."""
+import html
 import logging
-from datetime import datetime
-from typing import Optional
+import re
+import uuid
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Optional
 from zoneinfo import ZoneInfo
 
 from ..models import Post, PostStatus, PostType, HistoryEntry, PostsData
-from .x_api_client import XApiClient
+from ..storage.due_index import DueIndex, due_at
+from ..storage.journal import Journal
 from .media_service import MediaService
 from .limit_service import LimitService
+from .rate_limits import RateLimitTracker, post_calls
+
+if TYPE_CHECKING:
+    # Imported lazily so that loading the service does not import tweepy
+    from .x_api_client import XApiClient
 
 logger = logging.getLogger(__name__)
 
+# A POSTING claim older than this belongs to a run that died
+STRANDED_AFTER = timedelta(minutes=2)
+# Allowance for the difference between our clock and X's
+CLOCK_SKEW = timedelta(minutes=1)
+URL_PATTERN = re.compile(r"https?://\S+")
+
 
 class PostResult:
     """Result of a post operation."""
@@ -20,44 +35,62 @@ class PostResult:
         post_id: str,
         success: bool,
         tweet_id: Optional[str] = None,
-        error: Optional[str] = None
+        error: Optional[str] = None,
+        deferred: bool = False,
+        retry_at: Optional[datetime] = None,
+        outcome_unknown: bool = False
     ):
         self.post_id = post_id
         self.success = success
         self.tweet_id = tweet_id
         self.error = error
+        # Not attempted because of a rate limit; retried later without counting a retry
+        self.deferred = deferred
+        # When a deferred post can be tried again, if known
+        self.retry_at = retry_at
+        # Failed after it may have reached X; left POSTING for reconcile_stranded
+        self.outcome_unknown = outcome_unknown
 
 
 class PostService:
-    """Service for processing scheduled posts."""
+    """Service for processing the scheduled posts of one account."""
 
     def __init__(
         self,
-        x_client: XApiClient,
+        x_client: "XApiClient",
         media_service: MediaService,
         limit_service: LimitService,
-        timezone: str = "Asia/Tokyo"
+        timezone: str = "Asia/Tokyo",
+        due_index: Optional[DueIndex] = None,
+        journal: Optional[Journal] = None,
+        rate_limits: Optional[RateLimitTracker] = None,
+        account: Optional[str] = None
     ):
         self.x_client = x_client
         self.media_service = media_service
         self.limit_service = limit_service
         self.tz = ZoneInfo(timezone)
+        self.due_index = due_index
+        self.journal = journal
+        self.rate_limits = rate_limits
+        self.account = account
 
     def get_due_posts(self, posts: list[Post]) -> list[Post]:
-        """Get posts that are due for execution."""
+        """Get posts that are due for execution.
+
+        Uses the due index when available instead of scanning posts.
+        """
         now = datetime.now(self.tz)
+        if self.due_index is not None:
+            return self.due_index.due(now)
+
         due_posts = []
 
         for post in posts:
             if post.status != PostStatus.PENDING:
                 continue
 
-            # Make scheduled_at timezone-aware if needed
-            scheduled_at = post.scheduled_at
-            if scheduled_at.tzinfo is None:
-                scheduled_at = scheduled_at.replace(tzinfo=self.tz)
-
-            if scheduled_at <= now:
+            if due_at(post, self.tz) <= now:
                 due_posts.append(post)
 
         return due_posts
@@ -73,37 +106,101 @@ class PostService:
             PostResult with execution status
         """
         try:
-            # Check limits
-            if not self.limit_service.can_post():
-                return PostResult(
-                    post_id=post.id,
-                    success=False,
-                    error="Daily or monthly limit exceeded"
-                )
+            blocked_until = None if dry_run else self._blocked_until(post)
+            if blocked_until is not None:
+                return self._deferred(post, blocked_until, "rate limited")
+
+            # Reserve quota so concurrent posts cannot overshoot the limits
+            if not self.limit_service.reserve():
+                return self._deferred(post, self.limit_service.next_available(), "post quota full")
 
             if dry_run:
+                self.limit_service.release()
                 logger.info(f"[DRY RUN] Would post: {post.id}")
                 return PostResult(post_id=post.id, success=True, tweet_id="dry-run")
 
-            # Execute based on type
-            if post.type == PostType.TWEET:
-                tweet_id = self._execute_tweet(post)
-            elif post.type == PostType.THREAD:
-                tweet_id = self._execute_thread(post)
-            elif post.type == PostType.REPOST:
-                tweet_id = self._execute_repost(post)
-            else:
-                raise ValueError(f"Unknown post type: {post.type}")
+            try:
+                self._mark_posting(post)
+                tweet_id = self._execute(post)
+            except Exception:
+                self.limit_service.release()
+                raise
 
             # Update limit
-            self.limit_service.increment()
+            self.limit_service.commit()
 
             return PostResult(post_id=post.id, success=True, tweet_id=tweet_id)
 
         except Exception as e:
+            if self._outcome_unknown(e):
+                logger.warning(f"Post {post.id} may have been published, leaving it to reconciliation: {e}")
+                return PostResult(post_id=post.id, success=False, error=str(e), outcome_unknown=True)
+
+            # A 429 leaves the endpoint marked exhausted in the tracker
+            blocked_until = self._blocked_until(post)
+            if blocked_until is not None:
+                return self._deferred(post, blocked_until, "rate limited")
+
             logger.error(f"Failed to execute post {post.id}: {e}")
             return PostResult(post_id=post.id, success=False, error=str(e))
 
+    @staticmethod
+    def _outcome_unknown(error: Exception) -> bool:
+        """Check if a failed post may still have been published."""
+        # Imported here so that loading the service does not import tweepy
+        from .x_api_client import OutcomeUnknownError
+        return isinstance(error, OutcomeUnknownError)
+
+    def _blocked_until(self, post: Post) -> Optional[datetime]:
+        if self.rate_limits is None:
+            return None
+        return self.rate_limits.blocked_until(post_calls(post))
+
+    def _deferred(self, post: Post, until: Optional[datetime], reason: str) -> PostResult:
+        error = f"{reason.capitalize()} until {until.isoformat() if until else 'in-flight posts finish'}"
+        logger.warning(f"Deferring post {post.id}: {error}")
+        return PostResult(post_id=post.id, success=False, error=error, deferred=True, retry_at=until)
+
+    def defer(self, deferrals: list[tuple[Post, Optional[datetime]]]) -> None:
+        """Hold posts back until the given times without counting a retry.
+
+        Args:
+            deferrals: Posts and the times they can be tried again. None
+                means the next run.
+        """
+        for post, until in deferrals:
+            post.deferred_until = until
+            if self.due_index is not None:
+                self.due_index.add(post)
+
+        if deferrals and self.journal is not None:
+            self.journal.record(updated=[post for post, _ in deferrals])
+
+    def _mark_posting(self, post: Post) -> None:
+        """Mark a post as POSTING, on disk, before it is sent to X.
+
+        If the run dies before the result is saved, the post stays
+        POSTING instead of being posted again on the next run.
+        """
+        post.own_payload()
+        post.status = PostStatus.POSTING
+        post.updated_at = post.claimed_at = datetime.now(self.tz)
+        post.attempt_id = uuid.uuid4().hex[:12]
+        logger.debug(f"Claimed post {post.id} (attempt {post.attempt_id})")
+        if self.journal is not None:
+            self.journal.record(updated=[post])
+
+    def _execute(self, post: Post) -> str:
+        """Execute a post based on its type."""
+        if post.type == PostType.TWEET:
+            return self._execute_tweet(post)
+        elif post.type == PostType.THREAD:
+            return self._execute_thread(post)
+        elif post.type == PostType.REPOST:
+            return self._execute_repost(post)
+        else:
+            raise ValueError(f"Unknown post type: {post.type}")
+
     def _execute_tweet(self, post: Post) -> str:
         """Execute a single tweet."""
         media_ids = None
@@ -113,18 +210,31 @@ class PostService:
         return self.x_client.post_tweet(text=post.text, media_ids=media_ids)
 
     def _execute_thread(self, post: Post) -> str:
-        """Execute a thread."""
+        """Execute a thread.
+
+        Media for every item starts uploading up front, so later items
+        upload while earlier tweets are being posted.
+        """
         if not post.thread:
             raise ValueError("Thread post has no thread items")
 
+        uploads = []
         items = []
-        for item in post.thread:
-            media_ids = None
-            if item.media:
-                media_ids = self.media_service.upload_all(item.media)
-            items.append({"text": item.text, "media_ids": media_ids})
+        try:
+            for item in post.thread:
+                media_ids = None
+                if item.media:
+                    item_uploads = self.media_service.start_upload_all(item.media)
+                    uploads.append(item_uploads)
+                    media_ids = item_uploads.result
+                items.append({"text": item.text, "media_ids": media_ids})
+
+            tweet_ids = self.x_client.post_thread(items)
+        except Exception:
+            for item_uploads in uploads:
+                item_uploads.cancel()
+            raise
 
-        tweet_ids = self.x_client.post_thread(items)
         return tweet_ids[0] if tweet_ids else None
 
     def _execute_repost(self, post: Post) -> str:
@@ -135,6 +245,86 @@ class PostService:
         self.x_client.repost(post.target_tweet_id)
         return post.target_tweet_id
 
+    def _aware(self, dt: datetime) -> datetime:
+        return dt if dt.tzinfo is not None else dt.replace(tzinfo=self.tz)
+
+    @staticmethod
+    def _normalize(text: Optional[str]) -> str:
+        """Normalize tweet text for comparison.
+
+        X returns text HTML-escaped, with links shortened and media links
+        appended, so links and whitespace are ignored.
+        """
+        return " ".join(URL_PATTERN.sub("", html.unescape(text or "")).split())
+
+    def _published_as(self, post: Post, tweets: list[dict]) -> Optional[dict]:
+        """Find the tweet a post was published as."""
+        if post.type == PostType.REPOST:
+            return next((t for t in tweets if t["reposted_id"] == post.target_tweet_id), None)
+
+        text = post.thread[0].text if post.type == PostType.THREAD and post.thread else post.text
+        text = self._normalize(text)
+        return next(
+            (t for t in tweets if not t["reposted_id"] and self._normalize(t["text"]) == text),
+            None
+        )
+
+    def reconcile_stranded(self, data: PostsData, now: Optional[datetime] = None) -> int:
+        """Resolve this account's posts left POSTING by an interrupted run or a failed request.
+
+        The account's recent tweets are checked instead of posting again.
+        A post found there is marked POSTED; one that never reached X goes
+        back to PENDING without counting as a retry. If the lookup fails,
+        the posts stay POSTING until the next run.
+
+        Args:
+            data: Loaded posts data
+            now: Current time
+
+        Returns:
+            Number of posts resolved
+        """
+        now = now or datetime.now(self.tz)
+        stranded = [
+            post for post in data.posts
+            if post.status == PostStatus.POSTING
+            and post.account == self.account
+            and self._aware(post.claimed_at or post.updated_at) <= now - STRANDED_AFTER
+        ]
+        if not stranded:
+            return 0
+
+        since = min(self._aware(post.claimed_at or post.updated_at) for post in stranded) - CLOCK_SKEW
+        try:
+            tweets = self.x_client.get_recent_tweets(since)
+        except Exception as e:
+            logger.warning(f"Could not reconcile {len(stranded)} stranded posts: {e}")
+            return 0
+
+        results = []
+        released = []
+        for post in stranded:
+            tweet = self._published_as(post, tweets)
+            if tweet is not None:
+                # Each tweet accounts for one post only
+                tweets.remove(tweet)
+                tweet_id = post.target_tweet_id if post.type == PostType.REPOST else tweet["id"]
+                logger.info(f"Post {post.id} (attempt {post.attempt_id}) was already published: {tweet_id}")
+                self.limit_service.increment()
+                results.append(PostResult(post_id=post.id, success=True, tweet_id=tweet_id))
+            else:
+                logger.info(f"Post {post.id} (attempt {post.attempt_id}) never reached X, retrying")
+                post.status = PostStatus.PENDING
+                post.updated_at = now
+                if self.due_index is not None:
+                    self.due_index.add(post)
+                released.append(post)
+
+        if released and self.journal is not None:
+            self.journal.record(updated=released)
+        self.apply_results(data, results)
+        return len(stranded)
+
     def update_post_status(
         self,
         data: PostsData,
@@ -142,28 +332,78 @@ class PostService:
         retry_max: int = 3
     ) -> None:
         """Update post status based on result."""
-        for post in data.posts:
-            if post.id != result.post_id:
+        self.apply_results(data, [result], retry_max=retry_max)
+
+    def apply_results(
+        self,
+        data: PostsData,
+        results: list[PostResult],
+        retry_max: int = 3
+    ) -> None:
+        """Update post statuses for a batch of results in one pass.
+
+        The changes are journaled together with one disk flush.
+        """
+        updated = []
+        history = []
+        for result in results:
+            post = data.get_post(result.post_id)
+            if post is None:
+                logger.warning(f"Post not found for result: {result.post_id}")
                 continue
 
-            post.updated_at = datetime.now(self.tz)
+            entry = self._apply_result(data, post, result, retry_max)
+            if entry is not None:
+                history.append(entry)
+            updated.append(post)
 
-            if result.success:
-                post.status = PostStatus.POSTED
-                post.posted_tweet_id = result.tweet_id
-            else:
-                post.retry_count += 1
-                post.error_message = result.error
+        if self.journal is not None:
+            self.journal.record(updated=updated, history=history, stats=data.stats)
 
-                if post.retry_count >= retry_max:
-                    post.status = PostStatus.FAILED
+    def _apply_result(
+        self,
+        data: PostsData,
+        post: Post,
+        result: PostResult,
+        retry_max: int
+    ) -> Optional[HistoryEntry]:
+        post.updated_at = datetime.now(self.tz)
+
+        if result.deferred:
+            post.status = PostStatus.PENDING
+            post.deferred_until = result.retry_at
+            if self.due_index is not None:
+                self.due_index.add(post)
+            return None
+
+        if result.outcome_unknown:
+            # Stays POSTING; reconcile_stranded checks X before it is retried
+            post.error_message = result.error
+            return None
+
+        post.deferred_until = None
+        if result.success:
+            post.status = PostStatus.POSTED
+            post.posted_tweet_id = result.tweet_id
+        else:
+            post.retry_count += 1
+            post.error_message = result.error
+
+            if post.retry_count >= retry_max:
+                post.status = PostStatus.FAILED
+            else:
                 # Keep as pending for retry
-
-            # Add history entry
-            data.history.append(HistoryEntry(
-                post_id=post.id,
-                action="posted" if result.success else "failed",
-                tweet_id=result.tweet_id,
-                error=result.error
-            ))
-            break
+                post.status = PostStatus.PENDING
+
+        if self.due_index is not None:
+            self.due_index.add(post)
+
+        # Add history entry
+        entry = HistoryEntry(
+            post_id=post.id,
+            action="posted" if result.success else "failed",
+            tweet_id=result.tweet_id,
+            error=result.error
+        )
+        data.history.append(entry)
+        return entry
@@ -0,0 +1,220 @@
+"""Rolling-window and token-bucket post quotas."""
+import copy
+import threading
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Iterable, Optional, Protocol
+
+
+class Limiter(Protocol):
+    """A single quota rule. Not thread-safe on its own; see QuotaEngine."""
+
+    def available(self, now: datetime) -> bool: ...
+    def reserve(self, now: datetime) -> None: ...
+    def commit(self, now: datetime) -> None: ...
+    def release(self) -> None: ...
+    def add(self, when: datetime) -> None: ...
+    def next_available(self, now: datetime) -> Optional[datetime]: ...
+
+
+class SlidingWindow:
+    """At most limit posts within any rolling window.
+
+    Matches X's 24-hour posting caps: a slot frees up exactly one window
+    after the post that used it, not at a calendar boundary.
+    """
+
+    def __init__(self, limit: int, window: timedelta, events: Iterable[datetime] = ()):
+        """Initialize sliding window.
+
+        Args:
+            limit: Posts allowed per window
+            window: Window length
+            events: Times of earlier posts
+        """
+        self.limit = limit
+        self.window = window
+        self.events: deque[datetime] = deque(sorted(events))
+        self.reserved = 0
+
+    def _expire(self, now: datetime) -> None:
+        while self.events and self.events[0] <= now - self.window:
+            self.events.popleft()
+
+    def used(self, now: datetime) -> int:
+        """Get the number of posts within the window ending now."""
+        self._expire(now)
+        return len(self.events)
+
+    def available(self, now: datetime) -> bool:
+        return self.used(now) + self.reserved < self.limit
+
+    def reserve(self, now: datetime) -> None:
+        self.reserved += 1
+
+    def commit(self, now: datetime) -> None:
+        self.reserved -= 1
+        self.add(now)
+
+    def release(self) -> None:
+        self.reserved -= 1
+
+    def add(self, when: datetime) -> None:
+        """Record a post made without a reservation."""
+        self.events.append(when)
+        if len(self.events) > 1 and self.events[-2] > when:
+            self.events = deque(sorted(self.events))
+
+    def next_available(self, now: datetime) -> Optional[datetime]:
+        """Get when a slot is free, or None if only in-flight posts hold them."""
+        excess = self.used(now) + self.reserved - self.limit + 1
+        if excess <= 0:
+            return now
+        if excess > len(self.events):
+            return None
+        return self.events[excess - 1] + self.window
+
+
+class TokenBucket:
+    """Allows bursts of up to capacity posts, refilled at a steady rate."""
+
+    def __init__(self, capacity: int, refill_every: timedelta, events: Iterable[datetime] = ()):
+        """Initialize token bucket.
+
+        Args:
+            capacity: Maximum posts in a burst
+            refill_every: Time for one token to refill
+            events: Times of earlier posts, replayed from a full bucket
+        """
+        self.capacity = capacity
+        self.refill_every = refill_every
+        self.tokens = float(capacity)
+        self.updated_at: Optional[datetime] = None
+        self.reserved = 0
+        for when in sorted(events):
+            self.add(when)
+
+    def _refill(self, now: datetime) -> None:
+        if self.updated_at is not None and now > self.updated_at:
+            refilled = (now - self.updated_at) / self.refill_every
+            self.tokens = min(float(self.capacity), self.tokens + refilled)
+        if self.updated_at is None or now > self.updated_at:
+            self.updated_at = now
+
+    def available(self, now: datetime) -> bool:
+        self._refill(now)
+        return self.tokens - self.reserved >= 1
+
+    def reserve(self, now: datetime) -> None:
+        self.reserved += 1
+
+    def commit(self, now: datetime) -> None:
+        self.reserved -= 1
+        self.add(now)
+
+    def release(self) -> None:
+        self.reserved -= 1
+
+    def add(self, when: datetime) -> None:
+        """Take a token for a post made without a reservation."""
+        self._refill(when)
+        self.tokens -= 1
+
+    def next_available(self, now: datetime) -> Optional[datetime]:
+        self._refill(now)
+        missing = 1 - (self.tokens - self.reserved)
+        if missing <= 0:
+            return now
+        return now + self.refill_every * missing
+
+
+class QuotaEngine:
+    """Thread-safe set of limiters that must all admit a post.
+
+    Callers reserve() a slot before posting, then commit() it once the
+    post is published or release() it if it was not, so in-flight posts
+    count against every limit.
+    """
+
+    def __init__(self, limiters: dict[str, Limiter]):
+        self.limiters = limiters
+        self._lock = threading.Lock()
+
+    def reserve(self, now: datetime) -> Optional[str]:
+        """Reserve a slot in every limiter.
+
+        Returns:
+            None if reserved, else the name of the first limiter that is full
+        """
+        with self._lock:
+            for name, limiter in self.limiters.items():
+                if not limiter.available(now):
+                    return name
+            for limiter in self.limiters.values():
+                limiter.reserve(now)
+            return None
+
+    def commit(self, now: datetime) -> None:
+        with self._lock:
+            for limiter in self.limiters.values():
+                limiter.commit(now)
+
+    def release(self) -> None:
+        with self._lock:
+            for limiter in self.limiters.values():
+                limiter.release()
+
+    def add(self, when: datetime) -> None:
+        """Count a post that was made without a reservation."""
+        with self._lock:
+            for limiter in self.limiters.values():
+                limiter.add(when)
+
+    def available(self, now: datetime) -> bool:
+        with self._lock:
+            return all(limiter.available(now) for limiter in self.limiters.values())
+
+    def next_available(self, now: datetime) -> Optional[datetime]:
+        """Get the earliest time every limiter has a free slot.
+
+        Returns:
+            The time, or None if it depends on posts still in flight
+        """
+        with self._lock:
+            return self._next_available(self.limiters.values(), now)
+
+    @staticmethod
+    def _next_available(limiters: Iterable[Limiter], now: datetime) -> Optional[datetime]:
+        times = [limiter.next_available(now) for limiter in limiters]
+        if any(when is None for when in times):
+            return None
+        return max(times, default=now)
+
+    def schedule(self, now: datetime, count: int) -> list[Optional[datetime]]:
+        """Get the times the next count posts would be admitted.
+
+        Simulates admitting posts one after another as soon as every
+        limiter allows, without changing the real state.
+
+        Returns:
+            Admission times in order. None for posts whose slot depends
+            on posts still in flight.
+        """
+        with self._lock:
+            limiters = copy.deepcopy(list(self.limiters.values()))
+
+        times: list[Optional[datetime]] = []
+        when = now
+        while len(times) < count:
+            # Each limiter may push the time later; stop once all agree
+            later = self._next_available(limiters, when)
+            while later is not None and later > when:
+                when = later
+                later = self._next_available(limiters, when)
+            if later is None:
+                return times + [None] * (count - len(times))
+
+            for limiter in limiters:
+                limiter.add(when)
+            times.append(when)
+        return times
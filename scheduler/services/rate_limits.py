@@ -0,0 +1,127 @@
+"""Per-endpoint X API rate limit tracking."""
+import logging
+import re
+import threading
+from datetime import datetime, timezone
+from typing import Iterable, Mapping, Optional
+from urllib.parse import urlsplit
+
+from ..models import Post, PostType, RateLimit
+
+logger = logging.getLogger(__name__)
+
+# Endpoint keys as produced by endpoint_key()
+TWEET_ENDPOINT = "POST /2/tweets"
+REPOST_ENDPOINT = "POST /2/users/:id/retweets"
+MEDIA_UPLOAD_ENDPOINT = "POST /1.1/media/upload.json"
+
+# Header prefixes X uses: the 15-minute window, and the 24-hour caps on posting
+HEADER_FAMILIES = ("x-rate-limit", "x-user-limit-24hour", "x-app-limit-24hour")
+
+
+def endpoint_key(method: str, url: str) -> str:
+    """Get the endpoint key of a request, with IDs in the path replaced."""
+    version, _, rest = urlsplit(url).path.lstrip("/").partition("/")
+    return f"{method} /{version}/" + re.sub(r"(^|/)\d+(?=/|$)", r"\1:id", rest)
+
+
+def post_calls(post: Post) -> dict[str, int]:
+    """Get the X API endpoints executing a post will call, with call counts.
+
+    Media uploads are counted once per file, although chunked uploads
+    make several calls. Files with a media_id from an earlier attempt
+    count too, as MediaService uploads them again unless its cache has
+    them.
+    """
+    if post.type == PostType.REPOST:
+        return {REPOST_ENDPOINT: 1}
+
+    calls = {TWEET_ENDPOINT: len(post.thread) if post.type == PostType.THREAD and post.thread else 1}
+    uploads = sum(1 for _ in post.media_items())
+    if uploads:
+        calls[MEDIA_UPLOAD_ENDPOINT] = uploads
+    return calls
+
+
+def parse_headers(headers: Mapping[str, str]) -> Optional[RateLimit]:
+    """Get the most restrictive rate limit reported in response headers.
+
+    Returns:
+        RateLimit, or None if the response has no rate limit headers
+    """
+    found = []
+    for prefix in HEADER_FAMILIES:
+        remaining = headers.get(f"{prefix}-remaining")
+        reset = headers.get(f"{prefix}-reset")
+        if remaining is None or reset is None:
+            continue
+        limit = headers.get(f"{prefix}-limit")
+        found.append(RateLimit(
+            limit=int(limit) if limit is not None else None,
+            remaining=int(remaining),
+            reset_at=datetime.fromtimestamp(int(reset), timezone.utc),
+        ))
+
+    # Fewest calls left first; when exhausted, the one that resets last
+    return min(found, key=lambda r: (r.remaining, -r.reset_at.timestamp()), default=None)
+
+
+class RateLimitTracker:
+    """Remaining calls per endpoint, as last reported by X.
+
+    Updated from the headers of every API response (see XApiClient) and
+    persisted in Stats between runs, so posts for an exhausted endpoint
+    can be deferred without calling X while other endpoints keep going.
+    """
+
+    def __init__(self, limits: Optional[Mapping[str, RateLimit]] = None):
+        self._limits: dict[str, RateLimit] = dict(limits or {})
+        self._lock = threading.Lock()
+
+    def update(self, endpoint: str, limit: RateLimit) -> None:
+        """Record the rate limit reported for an endpoint."""
+        with self._lock:
+            self._limits[endpoint] = limit
+        if limit.remaining == 0:
+            logger.warning(f"Rate limit exhausted for {endpoint} until {limit.reset_at.isoformat()}")
+
+    def record_response(self, method: str, url: str, headers: Mapping[str, str]) -> None:
+        """Record the rate limit headers of an API response, if any."""
+        limit = parse_headers(headers)
+        if limit is not None:
+            self.update(endpoint_key(method, url), limit)
+
+    def get(self, endpoint: str) -> Optional[RateLimit]:
+        with self._lock:
+            return self._limits.get(endpoint)
+
+    def blocked_until(self, endpoints: Iterable[str], now: Optional[datetime] = None) -> Optional[datetime]:
+        """Get when the last of the exhausted endpoints resets.
+
+        Args:
+            endpoints: Endpoint keys a post needs
+            now: Current time
+
+        Returns:
+            Reset time, or None if every endpoint has calls left
+        """
+        now = now or datetime.now(timezone.utc)
+        blocked = None
+        with self._lock:
+            for endpoint in endpoints:
+                limit = self._limits.get(endpoint)
+                if limit and limit.remaining <= 0 and limit.reset_at > now:
+                    blocked = max(blocked, limit.reset_at) if blocked else limit.reset_at
+        return blocked
+
+    def snapshot(self, now: Optional[datetime] = None) -> dict[str, RateLimit]:
+        """Get the limits whose window has not reset yet."""
+        now = now or datetime.now(timezone.utc)
+        with self._lock:
+            return {endpoint: limit for endpoint, limit in self._limits.items() if limit.reset_at > now}
+
+    def restore(self, limits: Mapping[str, RateLimit]) -> None:
+        """Add saved limits for endpoints not seen since the process started."""
+        with self._lock:
+            for endpoint, limit in limits.items():
+                self._limits.setdefault(endpoint, limit)
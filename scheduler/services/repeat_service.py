@@ -1,6 +1,9 @@
 """Repeat post handling service."""
+import calendar
 import logging
-from datetime import datetime, timedelta
+from datetime import date, datetime, time, timedelta
+from itertools import islice
+from typing import Iterable, Iterator, Mapping, Optional
 from zoneinfo import ZoneInfo
 import uuid
 
@@ -11,90 +14,401 @@ logger = logging.getLogger(__name__)
 WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
 
 
+# error_message of repeat posts cancelled by RepeatService.prune
+SKIPPED_REASON = "Skipped: a later occurrence of the series was due"
+SERIES_CANCELLED_REASON = "Cancelled with an earlier post of the series"
+# error_message given by RepeatService.stop_cancelled to a post the user cancelled
+SERIES_STOPPED_REASON = "Cancelled by the user; the series is stopped"
+
+
+class Recurrence:
+    """A repeat config compiled for fast occurrence lookups.
+
+    The time of day, weekdays (as a bitmask) and end date are parsed once,
+    so next_after() finds the first occurrence after any time in constant
+    time instead of stepping from the previous occurrence.
+    """
+
+    __slots__ = ("type", "time", "weekdays", "day_of_month", "tz", "end", "last")
+
+    def __init__(self, repeat: RepeatConfig, tz: ZoneInfo):
+        """Compile a repeat config.
+
+        Args:
+            repeat: Repeat config
+            tz: Timezone the time of day is in
+
+        Raises:
+            ValueError: If the config has no days to repeat on
+        """
+        self.type = repeat.type
+        hour, minute = map(int, repeat.time.split(":"))
+        self.time = time(hour, minute)
+        self.tz = tz
+        self.weekdays = 0
+        for day in repeat.days or []:
+            self.weekdays |= 1 << WEEKDAYS.index(day.lower())
+        self.day_of_month = repeat.day_of_month
+
+        if self.type == RepeatType.WEEKLY and not self.weekdays:
+            raise ValueError("Weekly repeat has no days")
+        if self.type == RepeatType.MONTHLY and not self.day_of_month:
+            raise ValueError("Monthly repeat has no day of month")
+
+        self.end: Optional[datetime] = None
+        # A post before end_date still gets its next occurrence, so the
+        # series ends with the first occurrence at or after end_date
+        self.last: Optional[datetime] = None
+        if repeat.end_date:
+            self.end = self._aware(datetime.fromisoformat(repeat.end_date))
+            self.last = self.next_after(self.end - timedelta(microseconds=1))
+
+    def _aware(self, dt: datetime) -> datetime:
+        return dt if dt.tzinfo is not None else dt.replace(tzinfo=self.tz)
+
+    def _at(self, day: date) -> datetime:
+        return datetime.combine(day, self.time, tzinfo=self.tz)
+
+    def next_after(self, after: datetime) -> datetime:
+        """Get the first occurrence strictly after a time, ignoring end conditions."""
+        after = self._aware(after)
+        today = after.astimezone(self.tz).date()
+
+        if self.type == RepeatType.MONTHLY:
+            candidate = self._in_month(today.year, today.month)
+            if candidate <= after:
+                year, month = (today.year + 1, 1) if today.month == 12 else (today.year, today.month + 1)
+                candidate = self._in_month(year, month)
+            return candidate
+
+        day = today if self._at(today) > after else today + timedelta(days=1)
+        if self.type == RepeatType.WEEKLY:
+            # Rotate the mask so bit 0 is day's weekday; the lowest set bit is the offset
+            start = day.weekday()
+            rotated = ((self.weekdays >> start) | (self.weekdays << (7 - start))) & 0x7F
+            day += timedelta(days=(rotated & -rotated).bit_length() - 1)
+        return self._at(day)
+
+    def _in_month(self, year: int, month: int) -> datetime:
+        """Get the occurrence in a month, on its last day if it is too short."""
+        day = min(self.day_of_month, calendar.monthrange(year, month)[1])
+        return self._at(date(year, month, day))
+
+    def occurrences(
+        self,
+        after: datetime,
+        limit: Optional[int] = None,
+        skip_until: Optional[datetime] = None
+    ) -> Iterator[datetime]:
+        """Yield occurrences after a time, in order, until the series ends.
+
+        Args:
+            after: Time of the previous occurrence
+            limit: Maximum number of occurrences, e.g. those left before end_count
+            skip_until: Start after this time instead, if later
+        """
+        when = self._aware(after)
+        if self.end is not None and when >= self.end:
+            return
+        if skip_until is not None:
+            when = max(when, self._aware(skip_until))
+
+        count = 0
+        while limit is None or count < limit:
+            when = self.next_after(when)
+            if self.last is not None and when > self.last:
+                return
+            yield when
+            count += 1
+
+
 class RepeatService:
     """Service for handling repeat posts."""
 
     def __init__(self, timezone: str = "Asia/Tokyo"):
         self.tz = ZoneInfo(timezone)
+        self._compiled: dict[tuple, Optional[Recurrence]] = {}
+
+    def compile(self, repeat: RepeatConfig) -> Optional[Recurrence]:
+        """Get the compiled form of a repeat config, cached across posts of a series.
+
+        Returns:
+            Recurrence, or None if the config has no days to repeat on
+        """
+        key = (repeat.type, tuple(repeat.days or ()), repeat.day_of_month, repeat.time, repeat.end_date)
+        if key not in self._compiled:
+            try:
+                self._compiled[key] = Recurrence(repeat, self.tz)
+            except ValueError as e:
+                logger.warning(f"Invalid repeat config: {e}")
+                self._compiled[key] = None
+        return self._compiled[key]
+
+    def occurrences(
+        self,
+        repeat: RepeatConfig,
+        after: datetime,
+        now: Optional[datetime] = None
+    ) -> Iterator[datetime]:
+        """Yield the remaining occurrences of a series lazily.
+
+        Args:
+            repeat: Repeat config
+            after: Scheduled time of the latest post of the series
+            now: If given, skip occurrences that are already past
+
+        Returns:
+            Iterator of occurrence times, empty if the series is complete
+        """
+        recurrence = self.compile(repeat)
+        if recurrence is None:
+            return iter(())
+
+        limit = None
+        if repeat.end_count:
+            limit = max(0, repeat.end_count - repeat.executed_count)
+        return recurrence.occurrences(after, limit, skip_until=now)
 
-    def calculate_next(self, repeat: RepeatConfig, from_date: datetime) -> datetime | None:
+    def calculate_next(
+        self,
+        repeat: RepeatConfig,
+        from_date: datetime,
+        now: Optional[datetime] = None
+    ) -> datetime | None:
         """Calculate the next scheduled time for a repeat config.
 
+        Args:
+            repeat: Repeat config
+            from_date: Scheduled time of the latest post of the series
+            now: If given, the first occurrence after now, so a series
+                that missed occurrences catches up in one step
+
         Returns:
             Next datetime or None if repeat is complete
         """
-        # Check end conditions
-        if repeat.end_date:
-            end = datetime.fromisoformat(repeat.end_date)
-            if end.tzinfo is None:
-                end = end.replace(tzinfo=self.tz)
-            if from_date >= end:
-                return None
+        return next(self.occurrences(repeat, from_date, now=now), None)
+
+    @staticmethod
+    def series_key(post: Post) -> Optional[str]:
+        """Get the key of the repeat series a post belongs to.
 
-        if repeat.end_count and repeat.executed_count >= repeat.end_count:
+        Returns:
+            series_id, the post's own ID for a pending or cancelled repeat
+            post from before series IDs, or None if it is in no series
+        """
+        if post.repeat is None:
             return None
+        if post.series_id is not None:
+            return post.series_id
+        # Other finished repeat posts from before series IDs already created their successor
+        if post.status in (PostStatus.PENDING, PostStatus.CANCELLED):
+            return post.id
+        return None
 
-        # Parse time
-        hour, minute = map(int, repeat.time.split(":"))
+    def _by_series(self, posts: Iterable[Post]) -> dict[str, list[Post]]:
+        series: dict[str, list[Post]] = {}
+        for post in posts:
+            key = self.series_key(post)
+            if key is not None:
+                series.setdefault(key, []).append(post)
+        return series
+
+    def stop_cancelled(self, posts: Iterable[Post], stopped: dict[str, datetime]) -> list[Post]:
+        """Record the series stopped by posts the user cancelled.
+
+        Backends that load only active posts still load a repeat post the
+        user cancelled, until this has recorded its scheduled time in
+        stopped (Stats.stopped_series) and given it an error_message. The
+        series stays stopped from then on, whether its cancelled post is
+        loaded or not. Series with no loaded posts left are forgotten, as
+        nothing could extend them any more.
 
-        if repeat.type == RepeatType.DAILY:
-            next_date = from_date.date() + timedelta(days=1)
-            return datetime.combine(next_date, datetime.min.time().replace(hour=hour, minute=minute), tzinfo=self.tz)
+        Args:
+            posts: Loaded posts
+            stopped: Scheduled time of the cancelled post by series key;
+                updated in place
 
-        elif repeat.type == RepeatType.WEEKLY:
-            if not repeat.days:
-                return None
+        Returns:
+            Posts given an error_message, to be saved
+        """
+        series = self._by_series(posts)
+        for key in [key for key in stopped if key not in series]:
+            del stopped[key]
 
-            current_weekday = from_date.weekday()
-            target_weekdays = [WEEKDAYS.index(d.lower()) for d in repeat.days]
+        updated = []
+        for key, members in series.items():
+            for post in members:
+                if post.status != PostStatus.CANCELLED or post.error_message is not None:
+                    continue
+                cancelled_at = self._aware(post.scheduled_at)
+                if key not in stopped or cancelled_at < self._aware(stopped[key]):
+                    stopped[key] = cancelled_at
+                post.series_id = key
+                post.error_message = SERIES_STOPPED_REASON
+                updated.append(post)
 
-            # Find next weekday
-            for i in range(1, 8):
-                check_day = (current_weekday + i) % 7
-                if check_day in target_weekdays:
-                    next_date = from_date.date() + timedelta(days=i)
-                    return datetime.combine(next_date, datetime.min.time().replace(hour=hour, minute=minute), tzinfo=self.tz)
+        if updated:
+            logger.info(f"Stopping {len(updated)} repeat series cancelled by the user")
+        return updated
 
-            return None
+    def prune(
+        self,
+        posts: Iterable[Post],
+        now: datetime,
+        stopped: Optional[Mapping[str, datetime]] = None
+    ) -> list[tuple[Post, str]]:
+        """Get the pending posts of repeat series that must not be posted.
 
-        elif repeat.type == RepeatType.MONTHLY:
-            if not repeat.day_of_month:
-                return None
+        Once the scheduler was down for several occurrences, only the
+        latest overdue post of a series is posted; the older ones are
+        skipped instead of posting the same text back to back. Pending
+        posts scheduled after the post the user cancelled in a stopped
+        series are cancelled with it.
 
-            # Next month
-            year = from_date.year
-            month = from_date.month + 1
-            if month > 12:
-                month = 1
-                year += 1
+        Args:
+            posts: Loaded posts
+            now: Current time
+            stopped: Stopped series (see stop_cancelled())
 
-            # Handle months with fewer days
-            day = min(repeat.day_of_month, 28)  # Safe default
-            try:
-                next_date = datetime(year, month, repeat.day_of_month, hour, minute, tzinfo=self.tz)
-            except ValueError:
-                # Day doesn't exist in month, use last day
-                if month == 12:
-                    next_month = datetime(year + 1, 1, 1, tzinfo=self.tz)
-                else:
-                    next_month = datetime(year, month + 1, 1, tzinfo=self.tz)
-                next_date = next_month - timedelta(days=1)
-                next_date = next_date.replace(hour=hour, minute=minute)
-
-            return next_date
+        Returns:
+            (post, reason) pairs of the posts to cancel
+        """
+        stopped = stopped or {}
+        pruned = []
+        for key, members in self._by_series(posts).items():
+            cancelled_at = self._aware(stopped[key]) if key in stopped else None
+            overdue = [
+                post for post in members
+                if post.status == PostStatus.PENDING and self._aware(post.scheduled_at) <= now
+            ]
+            keep = max(overdue, key=lambda post: self._aware(post.scheduled_at), default=None)
 
-        return None
+            for post in members:
+                if post.status != PostStatus.PENDING:
+                    continue
+                if cancelled_at is not None and self._aware(post.scheduled_at) > cancelled_at:
+                    pruned.append((post, SERIES_CANCELLED_REASON))
+                elif post in overdue and post is not keep:
+                    pruned.append((post, SKIPPED_REASON))
+
+        if pruned:
+            logger.info(f"Cancelling {len(pruned)} overdue or cancelled repeat posts")
+        return pruned
+
+    def materialize(
+        self,
+        posts: Iterable[Post],
+        now: datetime,
+        ahead: int = 3,
+        horizon: Optional[timedelta] = None,
+        stopped: Optional[Mapping[str, datetime]] = None
+    ) -> list[Post]:
+        """Top up every repeat series with its upcoming occurrences.
 
-    def generate_next_post(self, original: Post) -> Post | None:
+        A series is the posts sharing a series_id. A pending repeat post
+        without one, as created by the web UI, starts a new series and is
+        given its own ID as series_id, so the series is still found once
+        that post is finished and no longer loaded with pending ones. Each
+        series is extended from its latest post until it has ahead future
+        pending posts, so a failed post no longer ends the series. Stopped
+        series are not extended (see prune() for their pending posts).
+
+        The horizon never leaves a series without a future pending post:
+        its next occurrence is created even when it is further away, so
+        the series is loaded, and the pre-check and the daemon wake up
+        for it, when a horizon is shorter than its period.
+
+        New posts share the text, media and thread items of the latest
+        post instead of copying them (see Post.own_payload). Editing one
+        post of a series therefore changes only that post, not the ones
+        already created after it.
+
+        Args:
+            posts: Loaded posts
+            now: Current time; occurrences already past are skipped
+            ahead: Future pending posts to keep per series
+            horizon: Only create posts due within this time from now,
+                beyond the first future one
+            stopped: Stopped series (see stop_cancelled())
+
+        Returns:
+            New posts to add, in no particular order
+        """
+        stopped = stopped or {}
+        series = self._by_series(posts)
+        created_at = datetime.now(self.tz)
+        until = now + horizon if horizon else None
+        new_posts = []
+        for series_id, members in series.items():
+            for post in members:
+                if post.series_id is None and post.status == PostStatus.PENDING:
+                    post.series_id = series_id
+            if series_id in stopped:
+                continue
+
+            template = max(members, key=lambda post: self._aware(post.scheduled_at))
+            upcoming = sum(
+                1 for post in members
+                if post.status == PostStatus.PENDING and self._aware(post.scheduled_at) > now
+            )
+            if upcoming >= ahead or template.status == PostStatus.CANCELLED:
+                continue
+
+            executed_count = template.repeat.executed_count
+            for when in islice(self.occurrences(template.repeat, template.scheduled_at, now=now), ahead - upcoming):
+                if until is not None and when > until and upcoming:
+                    break
+                executed_count += 1
+                upcoming += 1
+                new_posts.append(self._next_in_series(template, series_id, when, executed_count, created_at))
+
+        if new_posts:
+            logger.info(f"Materialized {len(new_posts)} repeat posts for {len(series)} series")
+        return new_posts
+
+    def _aware(self, dt: datetime) -> datetime:
+        return dt if dt.tzinfo is not None else dt.replace(tzinfo=self.tz)
+
+    @staticmethod
+    def _next_in_series(
+        template: Post,
+        series_id: str,
+        when: datetime,
+        executed_count: int,
+        created_at: datetime
+    ) -> Post:
+        """Create a post of a series without validating or copying its payload."""
+        return Post.model_construct(
+            id=str(uuid.uuid4()),
+            type=template.type,
+            status=PostStatus.PENDING,
+            scheduled_at=when,
+            account=template.account,
+            created_at=created_at,
+            updated_at=created_at,
+            text=template.text,
+            media=template.media,
+            thread=template.thread,
+            target_tweet_id=template.target_tweet_id,
+            repeat=template.repeat.model_copy(update={"executed_count": executed_count}),
+            series_id=series_id,
+            priority=template.priority,
+        )
+
+    def generate_next_post(self, original: Post, now: Optional[datetime] = None) -> Post | None:
         """Generate the next repeat post.
 
+        Args:
+            original: Latest post of the series
+            now: If given, skip occurrences that are already past
+
         Returns:
             New post or None if repeat is complete
         """
         if not original.repeat:
             return None
 
-        next_time = self.calculate_next(original.repeat, original.scheduled_at)
+        next_time = self.calculate_next(original.repeat, original.scheduled_at, now=now)
         if not next_time:
             return None
 
@@ -104,10 +418,13 @@ class RepeatService:
             type=original.type,
             status=PostStatus.PENDING,
             scheduled_at=next_time,
+            account=original.account,
+            priority=original.priority,
             text=original.text,
             media=original.media,
             thread=original.thread,
             target_tweet_id=original.target_tweet_id,
+            series_id=original.series_id or original.id,
             repeat=RepeatConfig(
                 type=original.repeat.type,
                 days=original.repeat.days,
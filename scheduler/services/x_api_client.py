@@ -1,11 +1,24 @@
 """X API client wrapper using tweepy."""
+import hashlib
+import json
 import logging
+import mimetypes
+import os
+import threading
+import time
 from dataclasses import dataclass
+from datetime import datetime
 from pathlib import Path
 from typing import Optional
 
 import tweepy
-from tweepy.errors import TweepyException
+from requests import RequestException
+from requests.adapters import HTTPAdapter
+from tweepy.errors import TooManyRequests, TweepyException, TwitterServerError
+
+from .chunked_upload import ChunkedUploader, MediaProcessingError
+from .media_cache import MediaId
+from .rate_limits import RateLimitTracker
 
 logger = logging.getLogger(__name__)
 
@@ -18,24 +31,113 @@ class XCredentials:
     access_token: str
     access_token_secret: str
 
+    def cache_key(self) -> str:
+        """Get a stable key for this credential set that does not expose secrets."""
+        raw = f"{self.consumer_key}:{self.access_token}".encode()
+        return hashlib.sha256(raw).hexdigest()[:16]
+
 
 class XApiError(Exception):
     """X API operation error."""
     pass
 
 
+class RateLimitError(XApiError):
+    """An endpoint's rate limit is exhausted (HTTP 429)."""
+    pass
+
+
+class OutcomeUnknownError(XApiError):
+    """A request failed after it may have reached X.
+
+    Raised for timeouts, dropped connections and 5xx responses, after
+    which X may still have created the tweet.
+    """
+    pass
+
+
+# Files above this size, and all videos, use the chunked upload
+SIMPLE_UPLOAD_MAX_SIZE = 5 * 1024 * 1024
+
+MEDIA_CATEGORIES = {
+    "video": "tweet_video",
+    "image/gif": "tweet_gif",
+    "image": "tweet_image",
+}
+
+
+class BaseUrlAdapter(HTTPAdapter):
+    """Sends requests for the X API hosts to another base URL.
+
+    Used to point tweepy, which has the API hosts built in, at a local
+    server for tests and benchmarks. OAuth signatures are computed for
+    the original URL, which a fake server does not check.
+    """
+
+    HOSTS = (
+        "https://api.twitter.com",
+        "https://upload.twitter.com",
+        "https://api.x.com",
+        "https://upload.x.com",
+    )
+
+    def __init__(self, base_url: str):
+        super().__init__()
+        self.base_url = base_url.rstrip("/")
+
+    def send(self, request, **kwargs):
+        for host in self.HOSTS:
+            if request.url.startswith(host):
+                request.url = self.base_url + request.url[len(host):]
+                break
+        return super().send(request, **kwargs)
+
+
 class XApiClient:
     """X API v2 client wrapper with comprehensive error handling."""
 
-    def __init__(self, credentials: XCredentials):
+    # Authenticated user IDs shared by all clients in the process, per credential set
+    _user_ids: dict[str, str] = {}
+    # One lock per credential set, so a slow lookup holds up only its own account
+    _user_id_locks: dict[str, threading.Lock] = {}
+    _user_ids_lock = threading.Lock()
+
+    def __init__(
+        self,
+        credentials: XCredentials,
+        upload_state_dir: Optional[str] = None,
+        max_parallel_chunks: int = 2,
+        user_cache_path: Optional[str] = None,
+        user_cache_ttl: int = 7 * 24 * 60 * 60,
+        api_base_url: Optional[str] = None,
+        rate_limits: Optional[RateLimitTracker] = None
+    ):
         """Initialize X API client.
 
         Args:
             credentials: X API OAuth 1.0a credentials
+            upload_state_dir: Directory to record chunked upload progress
+                in, so interrupted uploads resume. If None, they restart.
+            max_parallel_chunks: Number of chunks uploaded at once
+            user_cache_path: JSON file to cache the authenticated user ID
+                in across runs. If None, it is cached in memory only.
+            user_cache_ttl: Seconds before a cached user ID on disk is
+                looked up again
+            api_base_url: Send all API requests to this base URL instead
+                of the X API hosts, e.g. a local fake server
+            rate_limits: Tracker updated from every response's rate limit
+                headers. If None, a new one is created.
         """
         self.credentials = credentials
+        self.upload_state_dir = upload_state_dir
+        self.max_parallel_chunks = max_parallel_chunks
+        self.user_cache_path = user_cache_path
+        self.user_cache_ttl = user_cache_ttl
+        self.api_base_url = api_base_url
+        self.rate_limits = rate_limits or RateLimitTracker()
         self._client: Optional[tweepy.Client] = None
         self._api: Optional[tweepy.API] = None
+        self._uploader: Optional[ChunkedUploader] = None
 
     def _get_client(self) -> tweepy.Client:
         """Get or create the tweepy Client (for v2 API)."""
@@ -46,8 +148,10 @@ class XApiClient:
                     consumer_secret=self.credentials.consumer_secret,
                     access_token=self.credentials.access_token,
                     access_token_secret=self.credentials.access_token_secret,
-                    wait_on_rate_limit=True
+                    # A 429 fails only that post instead of sleeping the run
+                    wait_on_rate_limit=False
                 )
+                self._prepare_session(self._client.session)
                 logger.debug("Initialized tweepy Client")
             except Exception as e:
                 logger.error(f"Failed to initialize tweepy Client: {e}")
@@ -64,13 +168,44 @@ class XApiClient:
                     access_token=self.credentials.access_token,
                     access_token_secret=self.credentials.access_token_secret
                 )
-                self._api = tweepy.API(auth, wait_on_rate_limit=True)
+                self._api = tweepy.API(auth, wait_on_rate_limit=False)
+                self._prepare_session(self._api.session)
                 logger.debug("Initialized tweepy API")
             except Exception as e:
                 logger.error(f"Failed to initialize tweepy API: {e}")
                 raise XApiError(f"API initialization failed: {e}") from e
         return self._api
 
+    def _prepare_session(self, session) -> None:
+        """Track rate limits and route to api_base_url on a tweepy session."""
+        session.hooks["response"].append(self._record_rate_limit)
+        if self.api_base_url:
+            session.mount("https://", BaseUrlAdapter(self.api_base_url))
+            logger.info(f"Sending X API requests to {self.api_base_url}")
+
+    def _record_rate_limit(self, response, *args, **kwargs) -> None:
+        request = response.request
+        self.rate_limits.record_response(request.method, request.url, response.headers)
+
+    @staticmethod
+    def _error(message: str, e: Exception) -> XApiError:
+        """Wrap a tweepy or requests error, keeping rate limiting and unknown outcomes distinguishable."""
+        if isinstance(e, TooManyRequests):
+            return RateLimitError(message)
+        if isinstance(e, (TwitterServerError, RequestException)):
+            return OutcomeUnknownError(message)
+        return XApiError(message)
+
+    def _get_uploader(self) -> ChunkedUploader:
+        """Get or create the chunked uploader."""
+        if self._uploader is None:
+            self._uploader = ChunkedUploader(
+                self._get_api(),
+                state_dir=self.upload_state_dir,
+                max_parallel_chunks=self.max_parallel_chunks
+            )
+        return self._uploader
+
     def post_tweet(
         self,
         text: str,
@@ -112,9 +247,10 @@ class XApiClient:
             logger.info(f"Posted tweet: {tweet_id} (text: {text[:50]}...)")
             return tweet_id
 
-        except TweepyException as e:
+        # tweepy.Client lets timeouts and connection errors through unwrapped
+        except (TweepyException, RequestException) as e:
             logger.error(f"Failed to post tweet: {e}, text: {text[:50]}...")
-            raise XApiError(f"Tweet posting failed: {e}") from e
+            raise self._error(f"Tweet posting failed: {e}", e) from e
 
     def post_thread(self, items: list[dict]) -> list[str]:
         """Post a thread of tweets.
@@ -122,6 +258,8 @@ class XApiClient:
         Args:
             items: List of dicts with 'text' and optional 'media_ids'
                    Example: [{"text": "...", "media_ids": ["..."]}]
+                   'media_ids' may also be a callable returning the IDs,
+                   called just before that item is posted.
 
         Returns:
             List of posted tweet IDs in order
@@ -141,9 +279,12 @@ class XApiClient:
                 raise ValueError(f"Thread item {idx} missing 'text' field")
 
             try:
+                media_ids = item.get("media_ids")
+                if callable(media_ids):
+                    media_ids = media_ids()
                 tweet_id = self.post_tweet(
                     text=item["text"],
-                    media_ids=item.get("media_ids"),
+                    media_ids=media_ids,
                     reply_to=reply_to
                 )
                 tweet_ids.append(tweet_id)
@@ -158,11 +299,69 @@ class XApiClient:
                         logger.info(f"Rolled back tweet: {tid}")
                     except Exception as rollback_err:
                         logger.warning(f"Failed to rollback tweet {tid}: {rollback_err}")
-                raise XApiError(f"Thread posting failed at item {idx}: {e}") from e
+                # Reconciliation finds the first item if it survived the rollback
+                error = type(e) if isinstance(e, (RateLimitError, OutcomeUnknownError)) else XApiError
+                raise error(f"Thread posting failed at item {idx}: {e}") from e
 
         logger.info(f"Posted thread with {len(tweet_ids)} tweets: {tweet_ids}")
         return tweet_ids
 
+    def get_user_id(self) -> str:
+        """Get the authenticated user's ID.
+
+        The ID is looked up with get_me once per credential set and then
+        served from the in-process cache, or the disk cache if configured.
+
+        Returns:
+            The user ID string
+
+        Raises:
+            XApiError: If the lookup fails
+        """
+        key = self.credentials.cache_key()
+        with self._user_ids_lock:
+            lock = self._user_id_locks.setdefault(key, threading.Lock())
+        with lock:
+            user_id = self._user_ids.get(key) or self._read_user_cache(key)
+            if user_id is None:
+                try:
+                    me = self._get_client().get_me()
+                except TweepyException as e:
+                    logger.error(f"Failed to get authenticated user: {e}")
+                    raise self._error(f"User lookup failed: {e}", e) from e
+                user_id = str(me.data.id)
+                self._write_user_cache(key, user_id)
+                logger.debug(f"Resolved authenticated user: {user_id}")
+            self._user_ids[key] = user_id
+        return user_id
+
+    def _read_user_cache(self, key: str) -> Optional[str]:
+        if not self.user_cache_path:
+            return None
+        try:
+            with open(self.user_cache_path, "r", encoding="utf-8") as f:
+                entry = json.load(f).get(key)
+        except (OSError, ValueError):
+            return None
+        if not entry or time.time() - entry["resolved_at"] > self.user_cache_ttl:
+            return None
+        return entry["user_id"]
+
+    def _write_user_cache(self, key: str, user_id: str) -> None:
+        if not self.user_cache_path:
+            return
+        try:
+            with open(self.user_cache_path, "r", encoding="utf-8") as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            cache = {}
+        cache[key] = {"user_id": user_id, "resolved_at": time.time()}
+
+        tmp_path = f"{self.user_cache_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(cache, f)
+        os.replace(tmp_path, self.user_cache_path)
+
     def repost(self, tweet_id: str) -> bool:
         """Repost (retweet) a tweet.
 
@@ -178,20 +377,56 @@ class XApiClient:
         if not tweet_id:
             raise ValueError("tweet_id cannot be empty")
 
+        user_id = self.get_user_id()
         client = self._get_client()
 
         try:
-            # Get authenticated user ID
-            me = client.get_me()
-            user_id = me.data.id
-
             client.retweet(tweet_id=tweet_id, user_auth=True)
             logger.info(f"Reposted tweet: {tweet_id} by user {user_id}")
             return True
 
-        except TweepyException as e:
+        except (TweepyException, RequestException) as e:
             logger.error(f"Failed to repost tweet {tweet_id}: {e}")
-            raise XApiError(f"Repost failed: {e}") from e
+            raise self._error(f"Repost failed: {e}", e) from e
+
+    def get_recent_tweets(self, start_time: datetime) -> list[dict]:
+        """Get the authenticated user's tweets and reposts since a time.
+
+        Only the newest page (up to 100 tweets) is fetched.
+
+        Args:
+            start_time: Oldest creation time to include
+
+        Returns:
+            Dicts with 'id', 'text' and 'reposted_id' (the original tweet
+            ID for reposts, else None), newest first
+
+        Raises:
+            XApiError: If the lookup fails
+        """
+        user_id = self.get_user_id()
+        client = self._get_client()
+
+        try:
+            response = client.get_users_tweets(
+                id=user_id,
+                start_time=start_time,
+                max_results=100,
+                tweet_fields=["created_at", "referenced_tweets"],
+                user_auth=True
+            )
+        except TweepyException as e:
+            logger.error(f"Failed to get recent tweets: {e}")
+            raise self._error(f"Timeline lookup failed: {e}", e) from e
+
+        tweets = []
+        for tweet in response.data or []:
+            reposted_id = next(
+                (str(ref.id) for ref in tweet.referenced_tweets or [] if ref.type == "retweeted"),
+                None
+            )
+            tweets.append({"id": str(tweet.id), "text": tweet.text, "reposted_id": reposted_id})
+        return tweets
 
     def upload_media(self, file_path: str) -> str:
         """Upload media file.
@@ -200,7 +435,7 @@ class XApiClient:
             file_path: Path to the media file
 
         Returns:
-            The media ID string
+            The media ID, as a MediaId with the expiry X reported
 
         Raises:
             XApiError: If upload fails
@@ -215,18 +450,23 @@ class XApiClient:
         if file_size > 512 * 1024 * 1024:  # 512MB
             raise ValueError(f"File too large: {file_size} bytes (max 512MB)")
 
-        api = self._get_api()
+        media_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+        chunked = media_type.startswith("video/") or file_size > SIMPLE_UPLOAD_MAX_SIZE
 
         try:
-            logger.debug(f"Uploading media: {file_path} ({file_size} bytes)")
-            media = api.media_upload(filename=str(path))
-            media_id = str(media.media_id)
+            logger.debug(f"Uploading media: {file_path} ({file_size} bytes, chunked={chunked})")
+            if chunked:
+                category = MEDIA_CATEGORIES.get(media_type) or MEDIA_CATEGORIES.get(media_type.split("/")[0])
+                media_id = self._get_uploader().upload(path, media_type, media_category=category)
+            else:
+                media = self._get_api().media_upload(filename=str(path))
+                media_id = MediaId(str(media.media_id), getattr(media, "expires_after_secs", None))
             logger.info(f"Uploaded media: {media_id} from {path.name}")
             return media_id
 
-        except TweepyException as e:
+        except (TweepyException, MediaProcessingError) as e:
             logger.error(f"Failed to upload media {file_path}: {e}")
-            raise XApiError(f"Media upload failed: {e}") from e
+            raise self._error(f"Media upload failed: {e}", e) from e
 
     def delete_tweet(self, tweet_id: str) -> bool:
         """Delete a tweet.
@@ -252,4 +492,4 @@ class XApiClient:
 
         except TweepyException as e:
             logger.error(f"Failed to delete tweet {tweet_id}: {e}")
-            raise XApiError(f"Tweet deletion failed: {e}") from e
+            raise self._error(f"Tweet deletion failed: {e}", e) from e
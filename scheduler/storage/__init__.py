@@ -0,0 +1,62 @@
+"""Storage backends for the X scheduler."""
+from pathlib import Path
+
+from ..constants import MANIFEST_NAME, SQLITE_SUFFIXES
+from .base import StorageBackend
+from .due_index import DueIndex
+from .history_archive import HistoryArchive
+from .journal import Journal
+from .json_storage import JsonStorage
+from .sharded_storage import ShardedStorage
+from .sqlite_storage import SqliteStorage
+
+
+def create_storage(
+    path: str | Path,
+    lazy: bool = False,
+    compact: bool = False,
+    shard_by: str = "month",
+    dedup: bool = False
+) -> StorageBackend:
+    """Create the storage backend matching a data file path.
+
+    Args:
+        path: Path to the data file. SQLite is used for .db/.sqlite files,
+            sharded JSON for a manifest.json, a single JSON file otherwise.
+        lazy: Load only active posts from JSON files. SQLite and sharded
+            storage always do.
+        compact: Write JSON files without indentation
+        shard_by: "month" or "account", for a new sharded store
+        dedup: Store identical post payloads in single JSON files once
+
+    Returns:
+        StorageBackend instance
+    """
+    path = Path(path)
+    if path.suffix.lower() in SQLITE_SUFFIXES:
+        return SqliteStorage(path)
+    if path.name == MANIFEST_NAME:
+        return ShardedStorage(path, partition=shard_by, compact=compact)
+    return JsonStorage(path, lazy=lazy, compact=compact, dedup=dedup)
+
+
+def convert(src: str | Path, dst: str | Path) -> None:
+    """Copy all posts data from one storage file to another.
+
+    Used to import posts.json into a database or export it back.
+    """
+    data = create_storage(src).load_all()
+    create_storage(dst).replace_all(data)
+
+
+__all__ = [
+    "StorageBackend",
+    "DueIndex",
+    "HistoryArchive",
+    "Journal",
+    "JsonStorage",
+    "ShardedStorage",
+    "SqliteStorage",
+    "create_storage",
+    "convert",
+]
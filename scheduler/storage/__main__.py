@@ -0,0 +1,26 @@
+"""Convert posts data between storage formats.
+
+Usage:
+    python -m scheduler.storage data/posts.json data/posts.db
+    python -m scheduler.storage data/posts.db data/posts.json
+    python -m scheduler.storage data/posts.json data/posts/manifest.json
+"""
+import argparse
+import sys
+
+from . import convert
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Convert posts data between storage formats")
+    parser.add_argument("src", help="Source data file (.json, .db or a shard manifest.json)")
+    parser.add_argument("dst", help="Destination data file (.json, .db or a shard manifest.json)")
+    args = parser.parse_args()
+
+    convert(args.src, args.dst)
+    print(f"Converted {args.src} -> {args.dst}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+"""Storage backend interface."""
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional
+
+from ..models import Post, PostsData, PostStatus
+
+if TYPE_CHECKING:
+    from .history_archive import HistoryArchive
+
+# Posts the scheduler may still act on. Everything else is only read on export.
+ACTIVE_STATUSES = (PostStatus.PENDING.value, PostStatus.POSTING.value)
+
+
+def _loaded(status: str, repeat: Optional[object], error_message: Optional[str]) -> bool:
+    if status in ACTIVE_STATUSES:
+        return True
+    # A repeat post the user cancelled, until the scheduler has stopped its
+    # series (RepeatService.stop_cancelled gives it an error_message)
+    return status == PostStatus.CANCELLED.value and repeat is not None and error_message is None
+
+
+def loads_record(record: dict) -> bool:
+    """Check if a backend loads a raw post record for scheduler runs."""
+    return _loaded(record.get("status", ACTIVE_STATUSES[0]), record.get("repeat"), record.get("error_message"))
+
+
+def loads_post(post: Post) -> bool:
+    """Check if a backend loads a post for scheduler runs."""
+    return _loaded(post.status.value, post.repeat, post.error_message)
+
+
+class StorageBackend(ABC):
+    """Interface for persisting PostsData.
+
+    A backend may load only the part of the data the scheduler needs
+    (active posts, no history) as long as save() writes back changes
+    without losing the records it did not load.
+    """
+
+    # Whether load() returns the full history inline in PostsData
+    inline_history = True
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+
+    def exists(self) -> bool:
+        """Check if the underlying data file exists."""
+        return self.path.exists()
+
+    @abstractmethod
+    def load(self) -> PostsData:
+        """Load the data needed for a scheduler run."""
+
+    @abstractmethod
+    def save(self, data: PostsData) -> None:
+        """Persist changes made to data returned by load()."""
+
+    def roll_history(self, data: PostsData, archive: "HistoryArchive", keep: int) -> None:
+        """Move all but the newest keep history entries to the archive."""
+        if self.inline_history:
+            data.history = archive.roll(data.history, keep)
+
+    @abstractmethod
+    def load_all(self) -> PostsData:
+        """Load every post and history entry."""
+
+    @abstractmethod
+    def replace_all(self, data: PostsData) -> None:
+        """Replace the stored data with a complete PostsData."""
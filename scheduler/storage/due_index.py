@@ -0,0 +1,157 @@
+"""Time-ordered index of pending posts."""
+import json
+import os
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, Optional
+from zoneinfo import ZoneInfo
+
+from ..models import Post, PostStatus
+from ..precheck import file_signature, sidecar_path
+
+
+def due_at(post: Post, tz: ZoneInfo) -> datetime:
+    """Get when a post is due: its scheduled time or the end of its deferral.
+
+    Naive times are taken to be in tz.
+    """
+    due = _aware(post.scheduled_at, tz)
+    if post.deferred_until is not None:
+        due = max(due, _aware(post.deferred_until, tz))
+    return due
+
+
+def _aware(dt: datetime, tz: ZoneInfo) -> datetime:
+    return dt if dt.tzinfo is not None else dt.replace(tzinfo=tz)
+
+
+class DueIndex:
+    """Pending posts sorted by the time they are due.
+
+    A post is due at its scheduled time, or when its deferral ends if
+    it was held back for quota or rate limits.
+
+    Lookups of due posts are a binary search over epoch seconds instead of
+    a scan of every post. The index is written next to the data file so
+    the next due time can be read without loading the posts.
+    """
+
+    def __init__(self, timezone: str = "Asia/Tokyo"):
+        self.tz = ZoneInfo(timezone)
+        self._epochs: list[float] = []
+        self._ids: list[str] = []
+        self._posts: dict[str, Post] = {}
+        self._keys: dict[str, float] = {}
+
+    @classmethod
+    def build(cls, posts: Iterable[Post], timezone: str = "Asia/Tokyo") -> "DueIndex":
+        """Build an index from a list of posts."""
+        index = cls(timezone)
+        entries = []
+        for post in posts:
+            if post.status == PostStatus.PENDING:
+                key = index._key(post)
+                index._posts[post.id] = post
+                index._keys[post.id] = key
+                entries.append((key, post.id))
+
+        entries.sort()
+        index._epochs = [key for key, _ in entries]
+        index._ids = [post_id for _, post_id in entries]
+        return index
+
+    def _key(self, post: Post) -> float:
+        """Get the sort key (epoch seconds) of a post."""
+        return due_at(post, self.tz).timestamp()
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, post_id: str) -> bool:
+        return post_id in self._keys
+
+    def add(self, post: Post) -> None:
+        """Add or re-index a post. Posts that are no longer pending are removed."""
+        self.discard(post.id)
+        if post.status != PostStatus.PENDING:
+            return
+
+        key = self._key(post)
+        pos = bisect_right(self._epochs, key)
+        self._epochs.insert(pos, key)
+        self._ids.insert(pos, post.id)
+        self._posts[post.id] = post
+        self._keys[post.id] = key
+
+    def add_all(self, posts: Iterable[Post]) -> None:
+        """Add or re-index many posts with one merge instead of one insert each."""
+        posts = list(posts)
+        for post in posts:
+            self.discard(post.id)
+
+        entries = list(zip(self._epochs, self._ids))
+        for post in posts:
+            if post.status != PostStatus.PENDING:
+                continue
+            key = self._key(post)
+            self._posts[post.id] = post
+            self._keys[post.id] = key
+            entries.append((key, post.id))
+
+        # Timsort keeps the already sorted run, so this is close to a merge
+        entries.sort()
+        self._epochs = [key for key, _ in entries]
+        self._ids = [post_id for _, post_id in entries]
+
+    def discard(self, post_id: str) -> None:
+        """Remove a post from the index if present."""
+        key = self._keys.pop(post_id, None)
+        if key is None:
+            return
+
+        del self._posts[post_id]
+        pos = bisect_left(self._epochs, key)
+        while self._ids[pos] != post_id:
+            pos += 1
+        del self._epochs[pos]
+        del self._ids[pos]
+
+    def due(self, now: datetime) -> list[Post]:
+        """Get pending posts due at or before now, oldest first."""
+        end = bisect_right(self._epochs, now.timestamp())
+        return [self._posts[post_id] for post_id in self._ids[:end]]
+
+    def next_due(self, after: Optional[datetime] = None) -> Optional[datetime]:
+        """Get the due time of the earliest pending post.
+
+        Args:
+            after: Only consider posts due after this time
+        """
+        pos = bisect_right(self._epochs, after.timestamp()) if after else 0
+        if pos >= len(self._epochs):
+            return None
+        return datetime.fromtimestamp(self._epochs[pos], self.tz)
+
+    def save(self, data_path: Path, config: Optional[dict] = None, posting: int = 0) -> None:
+        """Write the index next to a data file that has just been saved.
+
+        Args:
+            data_path: Path of the data file
+            config: Config to store alongside, for the pre-check
+            posting: Number of posts left POSTING, for the pre-check
+        """
+        path = sidecar_path(data_path)
+        tmp_path = path.with_name(path.name + ".tmp")
+        raw = {
+            "signature": file_signature(data_path),
+            "epochs": self._epochs,
+            "ids": self._ids,
+        }
+        if config is not None:
+            raw["config"] = config
+        if posting:
+            raw["posting"] = posting
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(raw, f)
+        os.replace(tmp_path, path)
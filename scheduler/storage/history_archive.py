@@ -0,0 +1,104 @@
+"""Archive files for old history entries."""
+import gzip
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator, Optional
+from zoneinfo import ZoneInfo
+
+from ..models import HistoryEntry
+
+
+class HistoryArchive:
+    """Month-partitioned, gzip-compressed JSON Lines history archive.
+
+    Entries are appended to files like history/2026-10.jsonl.gz, one gzip
+    member per roll, so archiving never rewrites earlier data.
+    """
+
+    SUFFIX = ".jsonl.gz"
+
+    def __init__(self, directory: str | Path, timezone: str = "Asia/Tokyo"):
+        self.directory = Path(directory)
+        self.tz = ZoneInfo(timezone)
+
+    def _aware(self, dt: datetime) -> datetime:
+        return dt if dt.tzinfo is not None else dt.replace(tzinfo=self.tz)
+
+    def partition(self, entry: HistoryEntry) -> str:
+        """Get the partition (YYYY-MM) an entry is archived in."""
+        return self._aware(entry.executed_at).astimezone(self.tz).strftime("%Y-%m")
+
+    def append(self, entries: list[HistoryEntry]) -> None:
+        """Append entries to their monthly archive files."""
+        by_partition: dict[str, list[HistoryEntry]] = {}
+        for entry in entries:
+            by_partition.setdefault(self.partition(entry), []).append(entry)
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        for partition, group in by_partition.items():
+            lines = "".join(entry.model_dump_json() + "\n" for entry in group)
+            with gzip.open(self.directory / f"{partition}{self.SUFFIX}", "at", encoding="utf-8") as f:
+                f.write(lines)
+
+    def roll(self, history: list[HistoryEntry], keep: int) -> list[HistoryEntry]:
+        """Archive all but the newest entries.
+
+        Args:
+            history: History in append order
+            keep: Number of recent entries to keep inline
+
+        Returns:
+            The entries to keep inline
+        """
+        if len(history) <= keep:
+            return history
+
+        cut = len(history) - keep
+        self.append(history[:cut])
+        return history[cut:]
+
+    def partitions(self) -> list[str]:
+        """Get the archived partitions, oldest first."""
+        if not self.directory.exists():
+            return []
+        return sorted(path.name[:-len(self.SUFFIX)] for path in self.directory.glob(f"*{self.SUFFIX}"))
+
+    def read(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        post_id: Optional[str] = None
+    ) -> Iterator[HistoryEntry]:
+        """Iterate archived entries, oldest partition first.
+
+        Only partitions overlapping the requested range are opened.
+
+        Args:
+            start: Only entries executed at or after this time
+            end: Only entries executed before this time
+            post_id: Only entries for this post
+        """
+        start = self._aware(start) if start else None
+        end = self._aware(end) if end else None
+        first = start.astimezone(self.tz).strftime("%Y-%m") if start else None
+        last = end.astimezone(self.tz).strftime("%Y-%m") if end else None
+        seen: set[str] = set()
+
+        for partition in self.partitions():
+            if (first and partition < first) or (last and partition > last):
+                continue
+
+            with gzip.open(self.directory / f"{partition}{self.SUFFIX}", "rt", encoding="utf-8") as f:
+                for line in f:
+                    entry = HistoryEntry.model_validate_json(line)
+                    # An interrupted save can archive the same entry twice
+                    if entry.id in seen:
+                        continue
+                    seen.add(entry.id)
+
+                    if post_id and entry.post_id != post_id:
+                        continue
+                    executed_at = self._aware(entry.executed_at)
+                    if (start and executed_at < start) or (end and executed_at >= end):
+                        continue
+                    yield entry
@@ -0,0 +1,125 @@
+"""Write-ahead journal of changes made between saves."""
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Iterable, Optional
+
+from ..models import HistoryEntry, Post, PostsData, PostStatus, Stats
+
+logger = logging.getLogger(__name__)
+
+
+class Journal:
+    """Append-only JSON Lines log of post changes, fsynced on every write.
+
+    Changes are journaled as they happen (a post is marked POSTING before
+    it is sent to X) and the data file is written only at the end of a
+    run. If a run is killed in between, the next load replays the journal
+    on top of the data file, so nothing that reached X is lost or posted
+    twice.
+
+    Each record has a sequence number. The last number included in a save
+    is stored in stats.journal_seq, so records that were already saved are
+    skipped even if the journal was not truncated afterwards.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.last_seq = 0
+        self._lock = threading.Lock()
+
+    def record(
+        self,
+        added: Iterable[Post] = (),
+        updated: Iterable[Post] = (),
+        history: Iterable[HistoryEntry] = (),
+        stats: Optional[Stats] = None
+    ) -> None:
+        """Append changes and flush them to disk.
+
+        Args:
+            added: New posts
+            updated: Posts whose fields changed
+            history: New history entries
+            stats: Current stats
+        """
+        records = [("add", post.model_dump(mode="json")) for post in added]
+        records += [("update", post.model_dump(mode="json")) for post in updated]
+        records += [("history", entry.model_dump(mode="json")) for entry in history]
+        if stats is not None:
+            records.append(("stats", stats.model_dump(mode="json", exclude={"journal_seq"})))
+        if not records:
+            return
+
+        with self._lock:
+            lines = []
+            for op, body in records:
+                self.last_seq += 1
+                lines.append(json.dumps({"seq": self.last_seq, "op": op, "body": body}) + "\n")
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write("".join(lines))
+                f.flush()
+                os.fsync(f.fileno())
+
+    def replay(self, data: PostsData) -> int:
+        """Apply records that are newer than the loaded data.
+
+        Args:
+            data: Freshly loaded data
+
+        Returns:
+            Number of records applied
+        """
+        self.last_seq = data.stats.journal_seq
+        if not self.path.exists():
+            return 0
+
+        applied = 0
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # A torn last line from a crash mid-append
+                    logger.warning(f"Ignoring incomplete journal record in {self.path}")
+                    break
+                if record["seq"] <= data.stats.journal_seq:
+                    continue
+                self._apply(data, record["op"], record["body"])
+                self.last_seq = record["seq"]
+                applied += 1
+
+        data.stats.journal_seq = self.last_seq
+        if applied:
+            logger.info(f"Replayed {applied} journal records from {self.path}")
+        for post in data.posts:
+            if post.status == PostStatus.POSTING:
+                logger.warning(f"Post {post.id} was interrupted while posting and needs reconciling")
+        return applied
+
+    @staticmethod
+    def _apply(data: PostsData, op: str, body: dict) -> None:
+        if op == "add":
+            if data.get_post(body["id"]) is None:
+                data.add_post(Post.model_validate(body))
+        elif op == "update":
+            if not data.replace_post(Post.model_validate(body)):
+                logger.warning(f"Journaled post {body['id']} is no longer in the data file")
+        elif op == "history":
+            data.history.append(HistoryEntry.model_validate(body))
+        elif op == "stats":
+            data.stats = Stats.model_validate({**body, "journal_seq": data.stats.journal_seq})
+        else:
+            raise ValueError(f"Unknown journal record: {op}")
+
+    def checkpoint(self, data: PostsData) -> None:
+        """Mark all records as included in data before it is saved."""
+        data.stats.journal_seq = self.last_seq
+
+    def truncate(self) -> None:
+        """Drop records after the data file has been saved."""
+        with self._lock:
+            if self.path.exists():
+                os.truncate(self.path, 0)
@@ -0,0 +1,235 @@
+"""JSON file storage backend (posts.json)."""
+import json
+import os
+from itertools import chain
+from pathlib import Path
+from typing import IO, Callable, Iterable, Optional, Union
+
+try:
+    import orjson
+except ImportError:  # orjson is an optional dependency
+    orjson = None
+
+from ..models import HistoryEntry, Post, PostsData
+from .base import StorageBackend, loads_record
+from .history_archive import HistoryArchive
+from .templates import TemplateWriter, expand
+
+
+def _dumps(raw: dict, indent: Optional[int]) -> str:
+    """Serialize a raw record like model_dump_json would."""
+    if orjson is not None:
+        return orjson.dumps(raw, option=orjson.OPT_INDENT_2 if indent else 0).decode()
+    if indent:
+        return json.dumps(raw, indent=indent, ensure_ascii=False)
+    return json.dumps(raw, separators=(",", ":"), ensure_ascii=False)
+
+
+def _write_document(
+    f: IO[str],
+    sections: list[tuple[str, Union[str, Callable[[], str], Iterable[str]]]],
+    indent: Optional[int]
+) -> None:
+    """Write a JSON object from pre-serialized values, one item at a time.
+
+    Args:
+        f: Output file
+        sections: (key, value) pairs. A value is either a serialized JSON
+            value, a function returning one when its turn comes, or an
+            iterable of serialized array items.
+        indent: Indent width, or None for compact output
+    """
+    def nested(fragment: str, level: int) -> str:
+        # JSON strings never contain raw newlines, so this only shifts lines
+        return fragment.replace("\n", "\n" + " " * (indent * level)) if indent else fragment
+
+    newline = "\n" if indent else ""
+    pad = " " * indent if indent else ""
+    f.write("{")
+    for i, (key, value) in enumerate(sections):
+        f.write(("," if i else "") + newline + pad + json.dumps(key) + (": " if indent else ":"))
+        if callable(value):
+            value = value()
+        if isinstance(value, str):
+            f.write(nested(value, 1))
+            continue
+
+        f.write("[")
+        empty = True
+        for item in value:
+            f.write(("" if empty else ",") + newline + pad * 2 + nested(item, 2))
+            empty = False
+        f.write("]" if empty else newline + pad + "]")
+    f.write(newline + "}")
+
+
+class JsonStorage(StorageBackend):
+    """Stores everything in a single posts.json document.
+
+    In lazy mode only PENDING/POSTING posts, and repeat posts the user
+    cancelled, are validated into models.
+    Finished posts and history stay as the raw dicts read from the file
+    and are written back unchanged, in their original order.
+
+    Saving serializes one record at a time into a temporary file that
+    then replaces posts.json, so a crash never leaves a partial file.
+
+    With dedup, the text, media and thread items of posts are written
+    once per distinct content to a "templates" table, and posts refer to
+    theirs by key. Files in either form can always be read; templates
+    are validated only for the posts that are loaded.
+    """
+
+    def __init__(self, path: str | Path, lazy: bool = False, compact: bool = False, dedup: bool = False):
+        """Initialize JSON storage.
+
+        Args:
+            path: Path to posts.json
+            lazy: Skip validation of finished posts and history
+            compact: Write without indentation
+            dedup: Write post payloads to a shared template table
+        """
+        super().__init__(path)
+        self.lazy = lazy
+        self.indent = None if compact else 2
+        self.dedup = dedup
+        self.inline_history = not lazy
+        # Raw finished posts, or IDs of the active posts in data.posts
+        self._layout: Optional[list[Union[dict, str]]] = None
+        self._raw_history: list[dict] = []
+
+    def load(self) -> PostsData:
+        """Load and validate posts.json.
+
+        In lazy mode the returned data holds only active posts, and its
+        history only entries added after the load.
+        """
+        if not self.lazy:
+            return self.load_all()
+
+        with open(self.path, "r", encoding="utf-8") as f:
+            raw_data = json.load(f)
+
+        data = PostsData.model_validate({**raw_data, "posts": [], "history": []})
+        data.set_templates(raw_data.get("templates", {}))
+        layout = []
+        for record in raw_data.get("posts", []):
+            if loads_record(record):
+                post = data.resolve_post(record)
+                data.add_post(post)
+                layout.append(post.id)
+            else:
+                layout.append(record)
+
+        self._layout = layout
+        self._raw_history = raw_data.get("history", [])
+        return data
+
+    def save(self, data: PostsData) -> None:
+        """Rewrite posts.json with the given data."""
+        indent = self.indent
+        writer = TemplateWriter(data.templates) if self.dedup else None
+        layout: list[Union[dict, str]] = []
+        if self._layout is None:
+            posts = (self._dump_post(post, writer) for post in data.posts)
+            history = (entry.model_dump_json(indent=indent) for entry in data.history)
+        else:
+            posts = self._merge_posts(data, writer, layout)
+            history = chain(
+                (_dumps(raw, indent) for raw in self._raw_history),
+                (entry.model_dump_json(indent=indent) for entry in data.history),
+            )
+
+        sections = [
+            ("config", data.config.model_dump_json(indent=indent)),
+            ("posts", posts),
+            ("history", history),
+            ("stats", data.stats.model_dump_json(indent=indent)),
+        ]
+        if writer is not None:
+            # Written last, once the posts have named every template they use
+            sections.append(("templates", lambda: _dumps(writer.templates, indent)))
+
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            _write_document(f, sections, indent)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        if self._layout is not None:
+            self._layout = layout
+        if writer is not None:
+            data.set_templates(writer.templates)
+
+    def _dump_post(self, post: Post, writer: Optional[TemplateWriter]) -> str:
+        if writer is None:
+            return post.model_dump_json(indent=self.indent)
+        return _dumps(writer.post(post), self.indent)
+
+    def _merge_posts(
+        self,
+        data: PostsData,
+        writer: Optional[TemplateWriter],
+        layout: list[Union[dict, str]]
+    ) -> Iterable[str]:
+        """Put the active posts back between the untouched finished ones.
+
+        Finished posts are converted to or from template form as needed.
+        The layout of the written file is collected in layout.
+        """
+        placed = set()
+        for item in self._layout:
+            if isinstance(item, dict):
+                item = writer.raw(item) if writer else expand(item, data.templates)
+                layout.append(item)
+                yield _dumps(item, self.indent)
+                continue
+            post = data.get_post(item)
+            if post is not None:
+                layout.append(item)
+                yield self._dump_post(post, writer)
+                placed.add(item)
+
+        for post in data.posts:
+            if post.id not in placed:
+                layout.append(post.id)
+                yield self._dump_post(post, writer)
+
+    def roll_history(self, data: PostsData, archive: HistoryArchive, keep: int) -> None:
+        """Archive old history, validating only the entries being moved."""
+        if self._layout is None:
+            super().roll_history(data, archive, keep)
+            return
+
+        cut = len(self._raw_history) + len(data.history) - keep
+        if cut <= 0:
+            return
+
+        raw_cut = min(cut, len(self._raw_history))
+        archive.append(
+            [HistoryEntry.model_validate(raw) for raw in self._raw_history[:raw_cut]]
+            + data.history[:cut - raw_cut]
+        )
+        self._raw_history = self._raw_history[raw_cut:]
+        data.history = data.history[cut - raw_cut:]
+
+    def load_all(self) -> PostsData:
+        """Load and validate the whole posts.json file."""
+        with open(self.path, "r", encoding="utf-8") as f:
+            raw_data = json.load(f)
+
+        self._layout = None
+        self._raw_history = []
+        if "templates" not in raw_data:
+            return PostsData.model_validate(raw_data)
+
+        data = PostsData.model_validate({**raw_data, "posts": []})
+        data.set_templates(raw_data.get("templates", {}))
+        for record in raw_data.get("posts", []):
+            data.add_post(data.resolve_post(record))
+        return data
+
+    def replace_all(self, data: PostsData) -> None:
+        self._layout = None
+        self._raw_history = []
+        self.save(data)
@@ -0,0 +1,298 @@
+"""Sharded JSON storage: posts split across files by month or account."""
+import json
+import logging
+import os
+import uuid
+from pathlib import Path
+from typing import IO, Callable, Union
+from zoneinfo import ZoneInfo
+
+from ..models import Config, HistoryEntry, Post, PostsData, PostStatus, Stats
+from .base import StorageBackend, loads_post, loads_record
+from .due_index import due_at
+from .json_storage import _dumps, _write_document
+
+logger = logging.getLogger(__name__)
+
+HISTORY_NAME = "history.jsonl"
+PARTITIONS = ("month", "account")
+
+
+def _atomic_write(path: Path, write: Callable[[IO[str]], None]) -> None:
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        write(f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class ShardedStorage(StorageBackend):
+    """Posts split across JSON files in one directory, with a manifest.
+
+    manifest.json holds the config, the stats and a summary of every
+    shard: its post counts and the due range of its pending posts.
+    load() opens only the shards that have pending or posting posts and
+    validates only those posts; save() rewrites only the shards whose
+    posts changed, then the manifest. History is appended to
+    history.jsonl and not loaded for scheduler runs.
+
+    Posts are sharded by the month of scheduled_at (2026-10) or by
+    account (account-brand-a). A rewritten shard goes to a new file,
+    e.g. 2026-10.1a2b3c4d.json, and the manifest names the file of each
+    shard, so a save only takes effect when the manifest is replaced.
+    If a run dies before that, the manifest still lists the previous
+    files and the journal replays the changes on top of them.
+
+    The files are only meant to be changed through this class; the web
+    UI edits a single posts.json and cannot be used with sharded storage.
+    """
+
+    inline_history = False
+
+    def __init__(self, path: str | Path, partition: str = "month", compact: bool = False):
+        """Initialize sharded storage.
+
+        Args:
+            path: Path to manifest.json
+            partition: "month" or "account". Used when the manifest is
+                first written; an existing manifest keeps its own.
+            compact: Write without indentation
+
+        Raises:
+            ValueError: If partition is unknown
+        """
+        super().__init__(path)
+        if partition not in PARTITIONS:
+            raise ValueError(f"Unknown shard partition: {partition}")
+        self.partition = partition
+        self.indent = None if compact else 2
+        # Manifest summaries by shard key
+        self._shards: dict[str, dict] = {}
+        # Loaded shards: raw finished posts, or IDs of posts held as models
+        self._layouts: dict[str, list[Union[dict, str]]] = {}
+        # Shard key and JSON of every post held as a model, as last loaded or saved
+        self._snapshot: dict[str, tuple[str, str]] = {}
+        # Shard files replaced by the pending save, deleted once the manifest is written
+        self._obsolete: list[Path] = []
+        self._history_saved = 0
+
+    @property
+    def directory(self) -> Path:
+        return self.path.parent
+
+    def shard_key(self, post: Post) -> str:
+        """Get the key of the shard a post belongs in."""
+        if self.partition == "account":
+            return f"account-{post.account or 'default'}"
+        return post.scheduled_at.strftime("%Y-%m")
+
+    def _shard_path(self, key: str) -> Path:
+        # Manifests written before shard file names were recorded use the bare key
+        return self.directory / self._shards.get(key, {}).get("file", f"{key}.json")
+
+    def _remove_obsolete(self) -> None:
+        for path in self._obsolete:
+            path.unlink(missing_ok=True)
+        self._obsolete = []
+
+    def _read_shard(self, key: str) -> list[dict]:
+        try:
+            with open(self._shard_path(key), "r", encoding="utf-8") as f:
+                return json.load(f).get("posts", [])
+        except FileNotFoundError:
+            return []
+
+    def _read_manifest(self) -> dict:
+        with open(self.path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        self.partition = manifest.get("partition", self.partition)
+        self._shards = manifest.get("shards", {})
+        return manifest
+
+    def load(self) -> PostsData:
+        """Load config, stats and the active posts of the shards that have any."""
+        manifest = self._read_manifest()
+        self._layouts = {}
+        self._snapshot = {}
+        posts = []
+        for key, summary in self._shards.items():
+            if not summary.get("active"):
+                continue
+            layout = []
+            for record in self._read_shard(key):
+                if loads_record(record):
+                    post = Post.model_validate(record)
+                    posts.append(post)
+                    layout.append(post.id)
+                    self._snapshot[post.id] = (key, post.model_dump_json())
+                else:
+                    layout.append(record)
+            self._layouts[key] = layout
+
+        self._history_saved = 0
+        return PostsData(
+            config=Config.model_validate(manifest["config"]),
+            stats=Stats.model_validate(manifest["stats"]),
+            posts=posts,
+        )
+
+    def save(self, data: PostsData) -> None:
+        """Append new history, rewrite the shards that changed, then the manifest."""
+        by_shard: dict[str, list[Post]] = {}
+        snapshot = {}
+        changed = set()
+        for post in data.posts:
+            key = self.shard_key(post)
+            by_shard.setdefault(key, []).append(post)
+            snapshot[post.id] = (key, post.model_dump_json())
+            previous = self._snapshot.get(post.id)
+            if previous != snapshot[post.id]:
+                changed.add(key)
+                if previous is not None:
+                    # The post may have moved out of its old shard
+                    changed.add(previous[0])
+
+        self._append_history(data.history[self._history_saved:])
+        tz = ZoneInfo(data.config.timezone)
+        for key in sorted(changed):
+            self._write_shard(key, by_shard.get(key, []), tz)
+        # The new shard files take effect here
+        self._write_manifest(data)
+        self._remove_obsolete()
+
+        self._snapshot = snapshot
+        self._history_saved = len(data.history)
+        if changed:
+            logger.debug(f"Saved {len(changed)} of {len(self._shards)} shards")
+
+    def _write_shard(self, key: str, posts: list[Post], tz: ZoneInfo) -> None:
+        """Rewrite one shard, keeping its other posts in their original order."""
+        layout = self._layouts.get(key)
+        if layout is None:
+            # Not loaded, so it holds only finished posts
+            layout = self._read_shard(key)
+
+        own = {post.id: post for post in posts}
+        new_layout: list[Union[dict, str]] = []
+        for item in layout:
+            if isinstance(item, dict):
+                new_layout.append(item)
+            elif item in own:
+                new_layout.append(item)
+                del own[item]
+        new_layout.extend(own)
+        self._layouts[key] = new_layout
+
+        models = {post.id: post for post in posts}
+        if key in self._shards:
+            self._obsolete.append(self._shard_path(key))
+        if not new_layout:
+            self._shards.pop(key, None)
+            return
+
+        items = (
+            _dumps(item, self.indent) if isinstance(item, dict)
+            else models[item].model_dump_json(indent=self.indent)
+            for item in new_layout
+        )
+        file_name = f"{key}.{uuid.uuid4().hex[:8]}.json"
+        _atomic_write(self.directory / file_name, lambda f: _write_document(f, [("posts", items)], self.indent))
+
+        active = [post for post in posts if loads_post(post)]
+        due = sorted(due_at(post, tz) for post in active if post.status == PostStatus.PENDING)
+        self._shards[key] = {
+            "file": file_name,
+            "posts": len(new_layout),
+            "active": len(active),
+            "posting": sum(1 for post in active if post.status == PostStatus.POSTING),
+            "first_due": due[0].isoformat() if due else None,
+            "last_due": due[-1].isoformat() if due else None,
+        }
+
+    def _write_manifest(self, data: PostsData) -> None:
+        indent = self.indent
+        shards = {key: self._shards[key] for key in sorted(self._shards)}
+        _atomic_write(self.path, lambda f: _write_document(f, [
+            ("partition", json.dumps(self.partition)),
+            ("config", data.config.model_dump_json(indent=indent)),
+            ("stats", data.stats.model_dump_json(indent=indent)),
+            ("shards", json.dumps(shards, indent=indent)),
+        ], indent))
+
+    def _append_history(self, entries: list[HistoryEntry]) -> None:
+        if not entries:
+            return
+        with open(self.directory / HISTORY_NAME, "a", encoding="utf-8") as f:
+            f.write("".join(entry.model_dump_json() + "\n" for entry in entries))
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _read_history(self) -> list[HistoryEntry]:
+        """Read history.jsonl, dropping entries appended twice by an interrupted save."""
+        entries: dict[str, HistoryEntry] = {}
+        try:
+            with open(self.directory / HISTORY_NAME, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = HistoryEntry.model_validate_json(line)
+                    except ValueError:
+                        logger.warning(f"Ignoring incomplete history line in {self.directory / HISTORY_NAME}")
+                        break
+                    entries.setdefault(entry.id, entry)
+        except FileNotFoundError:
+            pass
+        return list(entries.values())
+
+    def load_all(self) -> PostsData:
+        """Load every shard and the whole history."""
+        manifest = self._read_manifest()
+        self._layouts = {}
+        self._snapshot = {}
+        posts = []
+        for key in self._shards:
+            layout = []
+            for record in self._read_shard(key):
+                post = Post.model_validate(record)
+                posts.append(post)
+                layout.append(post.id)
+                self._snapshot[post.id] = (key, post.model_dump_json())
+            self._layouts[key] = layout
+
+        history = self._read_history()
+        self._history_saved = len(history)
+        return PostsData(
+            config=Config.model_validate(manifest["config"]),
+            stats=Stats.model_validate(manifest["stats"]),
+            posts=posts,
+            history=history,
+        )
+
+    def replace_all(self, data: PostsData) -> None:
+        """Replace every shard, the history and the manifest with data."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        if self.exists():
+            self._read_manifest()
+            old_files = [self._shard_path(key) for key in self._shards]
+        else:
+            old_files = []
+
+        by_shard: dict[str, list[Post]] = {}
+        for post in data.posts:
+            by_shard.setdefault(self.shard_key(post), []).append(post)
+
+        self._shards = {}
+        self._layouts = {key: [] for key in by_shard}
+        tz = ZoneInfo(data.config.timezone)
+        for key, posts in sorted(by_shard.items()):
+            self._write_shard(key, posts, tz)
+
+        _atomic_write(
+            self.directory / HISTORY_NAME,
+            lambda f: f.write("".join(entry.model_dump_json() + "\n" for entry in data.history))
+        )
+        self._write_manifest(data)
+        self._obsolete = old_files
+        self._remove_obsolete()
+        self._snapshot = {post.id: (self.shard_key(post), post.model_dump_json()) for post in data.posts}
+        self._history_saved = len(data.history)
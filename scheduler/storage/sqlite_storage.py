@@ -0,0 +1,166 @@
+"""SQLite storage backend."""
+import sqlite3
+from pathlib import Path
+
+from ..models import Config, HistoryEntry, Post, PostsData, PostStatus, Stats
+from .base import ACTIVE_STATUSES, StorageBackend
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS posts (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT NOT NULL UNIQUE,
+    status TEXT NOT NULL,
+    scheduled_at TEXT NOT NULL,
+    body TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS posts_status_scheduled ON posts (status, scheduled_at);
+CREATE TABLE IF NOT EXISTS history (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT NOT NULL UNIQUE,
+    post_id TEXT NOT NULL,
+    executed_at TEXT NOT NULL,
+    body TEXT NOT NULL
+);
+"""
+
+
+class SqliteStorage(StorageBackend):
+    """Row-per-record storage in a SQLite database.
+
+    load() returns only PENDING/POSTING posts and no history, and save()
+    writes only the posts and history entries that changed since load().
+    """
+
+    inline_history = False
+
+    def __init__(self, path: str | Path):
+        super().__init__(path)
+        self._snapshot: dict[str, str] = {}
+        self._meta_snapshot: dict[str, str] = {}
+        self._history_loaded = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path)
+        conn.executescript(SCHEMA)
+        return conn
+
+    @staticmethod
+    def _read_meta(conn: sqlite3.Connection) -> dict[str, str]:
+        return dict(conn.execute("SELECT key, value FROM meta"))
+
+    def load(self) -> PostsData:
+        """Load config, stats and active posts."""
+        with self._connect() as conn:
+            meta = self._read_meta(conn)
+            placeholders = ",".join("?" * len(ACTIVE_STATUSES))
+            # Also repeat posts the user cancelled, until their series is stopped (see loads_record)
+            rows = conn.execute(
+                f"SELECT id, body FROM posts WHERE status IN ({placeholders}) OR (status = ?"
+                " AND json_extract(body, '$.repeat') IS NOT NULL"
+                " AND json_extract(body, '$.error_message') IS NULL) ORDER BY seq",
+                (*ACTIVE_STATUSES, PostStatus.CANCELLED.value)
+            ).fetchall()
+        conn.close()
+
+        data = PostsData(
+            config=Config.model_validate_json(meta["config"]),
+            stats=Stats.model_validate_json(meta["stats"]),
+            posts=[Post.model_validate_json(body) for _, body in rows],
+        )
+        self._snapshot = dict(rows)
+        self._meta_snapshot = {k: meta[k] for k in ("config", "stats")}
+        self._history_loaded = 0
+        return data
+
+    def save(self, data: PostsData) -> None:
+        """Write changed posts, new history entries and changed config/stats."""
+        changed_posts = []
+        for post in data.posts:
+            body = post.model_dump_json()
+            if self._snapshot.get(post.id) != body:
+                changed_posts.append((post, body))
+
+        new_history = data.history[self._history_loaded:]
+        meta = {
+            "config": data.config.model_dump_json(),
+            "stats": data.stats.model_dump_json(),
+        }
+        changed_meta = {k: v for k, v in meta.items() if self._meta_snapshot.get(k) != v}
+
+        with self._connect() as conn:
+            self._upsert_posts(conn, changed_posts)
+            self._insert_history(conn, new_history)
+            conn.executemany(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                changed_meta.items()
+            )
+        conn.close()
+
+        for post, body in changed_posts:
+            self._snapshot[post.id] = body
+        self._meta_snapshot.update(changed_meta)
+        self._history_loaded = len(data.history)
+
+    def load_all(self) -> PostsData:
+        """Load every post and history entry in insertion order."""
+        with self._connect() as conn:
+            meta = self._read_meta(conn)
+            posts = conn.execute("SELECT body FROM posts ORDER BY seq").fetchall()
+            history = conn.execute("SELECT body FROM history ORDER BY seq").fetchall()
+        conn.close()
+
+        return PostsData(
+            config=Config.model_validate_json(meta["config"]),
+            stats=Stats.model_validate_json(meta["stats"]),
+            posts=[Post.model_validate_json(body) for (body,) in posts],
+            history=[HistoryEntry.model_validate_json(body) for (body,) in history],
+        )
+
+    def replace_all(self, data: PostsData) -> None:
+        """Replace the database contents with data."""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM posts")
+            conn.execute("DELETE FROM history")
+            self._upsert_posts(conn, [(post, post.model_dump_json()) for post in data.posts])
+            self._insert_history(conn, data.history)
+            conn.executemany(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                [
+                    ("config", data.config.model_dump_json()),
+                    ("stats", data.stats.model_dump_json()),
+                ]
+            )
+        conn.close()
+        self._snapshot = {}
+        self._meta_snapshot = {}
+        self._history_loaded = 0
+
+    @staticmethod
+    def _upsert_posts(conn: sqlite3.Connection, posts: list[tuple[Post, str]]) -> None:
+        conn.executemany(
+            """
+            INSERT INTO posts (id, status, scheduled_at, body) VALUES (?, ?, ?, ?)
+            ON CONFLICT (id) DO UPDATE SET
+                status = excluded.status,
+                scheduled_at = excluded.scheduled_at,
+                body = excluded.body
+            """,
+            [
+                (post.id, post.status.value, post.scheduled_at.isoformat(), body)
+                for post, body in posts
+            ]
+        )
+
+    @staticmethod
+    def _insert_history(conn: sqlite3.Connection, entries: list[HistoryEntry]) -> None:
+        conn.executemany(
+            "INSERT OR IGNORE INTO history (id, post_id, executed_at, body) VALUES (?, ?, ?, ?)",
+            [
+                (entry.id, entry.post_id, entry.executed_at.isoformat(), entry.model_dump_json())
+                for entry in entries
+            ]
+        )
@@ -0,0 +1,115 @@
+"""Payload templates: post content stored once per distinct text, media and thread."""
+import hashlib
+import json
+from typing import Optional
+
+from ..models import Payload, Post
+
+TEMPLATE_FIELDS = frozenset({"text", "media", "thread"})
+
+
+def _strip_media_ids(payload: dict) -> list[Optional[str]]:
+    """Remove media IDs from a raw payload, returning them in posting order."""
+    media_ids = [item.pop("media_id", None) for item in payload.get("media") or []]
+    for item in payload.get("thread") or []:
+        media_ids.extend(media.pop("media_id", None) for media in item.get("media") or [])
+    return media_ids
+
+
+def template_key(payload: dict) -> str:
+    """Get the key of a raw payload: a hash of its canonical JSON."""
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode()).hexdigest()[:16]
+
+
+def expand(record: dict, templates: dict[str, dict]) -> dict:
+    """Get the full form of a stored post record that may refer to a template.
+
+    Raises:
+        ValueError: If the record refers to an unknown template
+    """
+    key = record.get("template")
+    if key is None:
+        return record
+    if key not in templates:
+        raise ValueError(f"Unknown payload template: {key}")
+
+    full = {field: value for field, value in record.items() if field not in ("template", "media_ids")}
+    full.update(json.loads(json.dumps(templates[key])))
+    media_ids = iter(record.get("media_ids") or [])
+    for item in full.get("media") or []:
+        item["media_id"] = next(media_ids, None)
+    for item in full.get("thread") or []:
+        for media in item.get("media") or []:
+            media["media_id"] = next(media_ids, None)
+    return full
+
+
+class TemplateWriter:
+    """Turns the posts of one save into template references.
+
+    Collects every template the saved records refer to, so templates no
+    post uses any more are dropped. Media IDs are kept out of templates,
+    since each post uploads its media again, and stored on the record.
+    Fields left at None are not written, as loading restores them.
+    """
+
+    def __init__(self, templates: Optional[dict[str, dict]] = None):
+        """Initialize a writer.
+
+        Args:
+            templates: Raw templates read with the data, for the records
+                that still refer to them
+        """
+        self._read = templates or {}
+        self.templates: dict[str, dict] = {}
+        # Keys by the identity of payloads shared between posts
+        self._keys: dict[tuple, str] = {}
+
+    def _add(self, payload: dict) -> str:
+        key = template_key(payload)
+        self.templates.setdefault(key, payload)
+        return key
+
+    def _payload_key(self, post: Post) -> str:
+        shared = (post.text, id(post.media), id(post.thread))
+        key = self._keys.get(shared)
+        if key is None:
+            payload = post.model_dump(mode="json", include=TEMPLATE_FIELDS)
+            _strip_media_ids(payload)
+            key = self._keys[shared] = self._add(payload)
+        return key
+
+    def post(self, post: Post) -> dict:
+        """Get the raw record of a post, referring to its template."""
+        record = post.model_dump(mode="json", exclude=TEMPLATE_FIELDS, exclude_none=True)
+        record["template"] = self._payload_key(post)
+        media_ids = [item.media_id for item in post.media_items()]
+        if any(media_ids):
+            record["media_ids"] = media_ids
+        return record
+
+    def raw(self, record: dict) -> dict:
+        """Get a raw record kept from the file in template form.
+
+        Raises:
+            ValueError: If the record refers to an unknown template
+        """
+        key = record.get("template")
+        if key is not None:
+            if key not in self.templates:
+                if key not in self._read:
+                    raise ValueError(f"Unknown payload template: {key}")
+                self.templates[key] = self._read[key]
+            return record
+
+        # Validate the payload so equal content gets the same key
+        payload = Payload.model_validate(record).model_dump(mode="json")
+        media_ids = _strip_media_ids(payload)
+        converted = {
+            field: value for field, value in record.items() if field not in TEMPLATE_FIELDS and value is not None
+        }
+        converted["template"] = self._add(payload)
+        if any(media_ids):
+            converted["media_ids"] = media_ids
+        return converted
@@ -0,0 +1,95 @@
+"""Tests for scheduling posts of several accounts."""
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from pydantic import ValidationError
+
+from scheduler.config import SchedulerConfig
+from scheduler.main import ApiPool, ApiServices, run_tick
+from scheduler.models import Post, PostStatus, PostType, RateLimit
+from scheduler.services.media_cache import MediaCache
+from scheduler.services.rate_limits import TWEET_ENDPOINT, RateLimitTracker
+
+
+class RecordingClient:
+    """X client stub that records posted texts."""
+
+    def __init__(self):
+        self.posted = []
+
+    def post_tweet(self, text, media_ids=None, reply_to=None):
+        self.posted.append(text)
+        return f"tweet-{len(self.posted)}"
+
+
+def _services(client, rate_limits=None):
+    return ApiServices(x_client=client, media_service=None, media_cache=MediaCache(), rate_limits=rate_limits)
+
+
+def test_env_credentials_per_account(tmp_path, monkeypatch):
+    """Test that accounts read suffixed variables and share the app key."""
+    monkeypatch.setenv("X_API_KEY", "app-key")
+    monkeypatch.setenv("X_API_KEY_SECRET", "app-secret")
+    monkeypatch.setenv("X_ACCESS_TOKEN", "default-token")
+    monkeypatch.setenv("X_ACCESS_TOKEN_BRAND_A", "brand-token")
+    config = SchedulerConfig(str(tmp_path / "posts.json"))
+
+    assert config.get_env_credentials()["access_token"] == "default-token"
+    creds = config.get_env_credentials("brand-a")
+    assert creds["consumer_key"] == "app-key"
+    assert creds["access_token"] == "brand-token"
+    assert creds["access_token_secret"] == ""
+    assert config.account_path(config.media_cache_path, "brand-a").name == "media_cache.brand-a.json"
+
+
+def test_account_keys_cannot_share_credentials():
+    """Test that keys that would map to the same variables as "brand-a" are rejected."""
+    now = datetime.now(timezone.utc)
+    for account in ["brand_a", "Brand-A"]:
+        with pytest.raises(ValidationError):
+            Post(type=PostType.TWEET, text="t", scheduled_at=now, account=account)
+
+
+def test_accounts_have_separate_quotas_and_rate_limits(tmp_path):
+    """Test that one account's exhausted endpoint and quota do not hold back another."""
+    now = datetime.now(timezone.utc)
+    data_path = tmp_path / "posts.json"
+    data_path.write_text(json.dumps({
+        "config": {"timezone": "UTC", "daily_limit": 1},
+        "posts": [
+            {"id": "d1", "type": "tweet", "text": "d1", "scheduled_at": (now - timedelta(minutes=2)).isoformat()},
+            {"id": "d2", "type": "tweet", "text": "d2", "scheduled_at": (now - timedelta(minutes=1)).isoformat()},
+            {"id": "a1", "type": "tweet", "text": "a1", "account": "brand-a",
+             "scheduled_at": (now - timedelta(minutes=1)).isoformat()},
+            {"id": "b1", "type": "tweet", "text": "b1", "account": "brand-b",
+             "scheduled_at": (now - timedelta(minutes=1)).isoformat()},
+        ],
+        "stats": {"daily_reset_at": now.isoformat(), "monthly_reset_at": now.isoformat()},
+    }), encoding="utf-8")
+    config = SchedulerConfig(str(data_path))
+    config.load()
+
+    reset_at = now + timedelta(minutes=15)
+    exhausted = RateLimitTracker({TWEET_ENDPOINT: RateLimit(limit=300, remaining=0, reset_at=reset_at)})
+    clients = {None: RecordingClient(), "brand-a": RecordingClient(), "brand-b": RecordingClient()}
+    pool = ApiPool(config, {
+        None: _services(clients[None]),
+        "brand-a": _services(clients["brand-a"], exhausted),
+        "brand-b": _services(clients["brand-b"]),
+    })
+
+    run_tick(config, pool)
+
+    assert clients[None].posted == ["d1"]
+    assert clients["brand-a"].posted == []
+    assert clients["brand-b"].posted == ["b1"]
+
+    data = config.data
+    assert data.get_post("d2").deferred_until is not None
+    assert data.get_post("a1").status == PostStatus.PENDING
+    assert data.get_post("a1").deferred_until == reset_at
+    assert data.stats.daily_count == 1
+    assert data.stats.accounts["brand-b"].daily_count == 1
+    assert data.stats.accounts["brand-a"].rate_limits[TWEET_ENDPOINT].remaining == 0
+    assert SchedulerConfig(str(data_path)).load().stats.accounts["brand-b"].daily_count == 1
@@ -0,0 +1,125 @@
+"""Tests for the async X API client against a local fake server."""
+import asyncio
+import time
+
+import pytest
+
+aiohttp = pytest.importorskip("aiohttp")
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from scheduler.services.async_x_api_client import AsyncXApiClient
+from scheduler.services.rate_limits import REPOST_ENDPOINT, TWEET_ENDPOINT, RateLimitTracker
+from scheduler.services.x_api_client import RateLimitError, XApiError, XCredentials
+
+CREDENTIALS = XCredentials("key", "secret", "token", "token-secret")
+
+
+def _fake_app(calls, fail_at=None):
+    """Build a fake X API app recording the requests it receives."""
+    async def create_tweet(request):
+        assert request.headers["Authorization"].startswith("OAuth ")
+        body = await request.json()
+        calls.append(("create", body))
+        if body["text"] == fail_at:
+            return web.json_response({"title": "Forbidden"}, status=403)
+        return web.json_response({"data": {"id": str(len(calls))}}, status=201)
+
+    async def delete_tweet(request):
+        calls.append(("delete", request.match_info["id"]))
+        return web.json_response({"data": {"deleted": True}})
+
+    async def get_me(request):
+        calls.append(("me", None))
+        return web.json_response({"data": {"id": "42"}})
+
+    async def retweet(request):
+        calls.append(("retweet", (request.match_info["id"], (await request.json())["tweet_id"])))
+        return web.json_response({"data": {"retweeted": True}})
+
+    async def upload(request):
+        form = await request.post()
+        calls.append(("upload", form["media"].filename))
+        return web.json_response({"media_id_string": "900"})
+
+    app = web.Application()
+    app.router.add_post("/2/tweets", create_tweet)
+    app.router.add_delete("/2/tweets/{id}", delete_tweet)
+    app.router.add_get("/2/users/me", get_me)
+    app.router.add_post("/2/users/{id}/retweets", retweet)
+    app.router.add_post("/1.1/media/upload.json", upload)
+    return app
+
+
+async def _with_client(app, func, **kwargs):
+    async with TestServer(app) as server:
+        base_url = str(server.make_url("")).rstrip("/")
+        async with AsyncXApiClient(CREDENTIALS, api_base_url=base_url, upload_base_url=base_url, **kwargs) as client:
+            return await func(client)
+
+
+def test_post_tweet_and_reposts_share_identity_lookup(tmp_path):
+    """Test tweets, uploads and reposts, with one user lookup for many reposts."""
+    calls = []
+    image = tmp_path / "image.png"
+    image.write_bytes(b"png")
+
+    async def run(client):
+        media_id = await client.upload_media(str(image))
+        tweet_id = await client.post_tweet("hello", media_ids=[media_id])
+        await asyncio.gather(*(client.repost(str(i)) for i in range(5)))
+        return media_id, tweet_id
+
+    media_id, tweet_id = asyncio.run(_with_client(_fake_app(calls), run))
+
+    assert media_id == "900"
+    assert ("create", {"text": "hello", "media": {"media_ids": ["900"]}}) in calls
+    assert [name for name, _ in calls].count("me") == 1
+    assert sorted(arg for name, arg in calls if name == "retweet") == [("42", str(i)) for i in range(5)]
+
+
+def test_post_thread_rolls_back_on_failure():
+    """Test that a failed thread deletes the tweets already posted."""
+    calls = []
+
+    async def run(client):
+        with pytest.raises(XApiError):
+            await client.post_thread([{"text": "one"}, {"text": "two"}, {"text": "three"}])
+
+    asyncio.run(_with_client(_fake_app(calls, fail_at="three"), run))
+
+    assert calls[1] == ("create", {"text": "two", "reply": {"in_reply_to_tweet_id": "1"}})
+    assert sorted(arg for name, arg in calls if name == "delete") == ["1", "2"]
+
+
+def test_rate_limit_headers_are_tracked_per_endpoint():
+    """Test that responses update the tracker and a 429 raises RateLimitError."""
+    reset = int(time.time()) + 900
+
+    async def create_tweet(request):
+        headers = {"x-rate-limit-limit": "100", "x-rate-limit-remaining": "0", "x-rate-limit-reset": str(reset)}
+        return web.json_response({"title": "Too Many Requests"}, status=429, headers=headers)
+
+    async def get_me(request):
+        return web.json_response({"data": {"id": "42"}})
+
+    async def retweet(request):
+        headers = {"x-rate-limit-limit": "50", "x-rate-limit-remaining": "49", "x-rate-limit-reset": str(reset)}
+        return web.json_response({"data": {"retweeted": True}}, headers=headers)
+
+    app = web.Application()
+    app.router.add_post("/2/tweets", create_tweet)
+    app.router.add_get("/2/users/me", get_me)
+    app.router.add_post("/2/users/{id}/retweets", retweet)
+    tracker = RateLimitTracker()
+
+    async def run(client):
+        await client.repost("7")
+        with pytest.raises(RateLimitError):
+            await client.post_tweet("hello")
+
+    asyncio.run(_with_client(app, run, rate_limits=tracker))
+
+    assert tracker.get(REPOST_ENDPOINT).remaining == 49
+    assert tracker.blocked_until([TWEET_ENDPOINT]).timestamp() == reset
+    assert tracker.blocked_until([REPOST_ENDPOINT]) is None
@@ -17,3 +17,13 @@ def test_import_models():
     """Test that models module can be imported."""
     from scheduler import models
     assert models is not None
+
+
+def test_main_import_is_lightweight():
+    """Test that importing the entry point does not load tweepy or pydantic."""
+    import subprocess
+    import sys
+
+    code = "import sys, scheduler.main; print(','.join(m for m in ('tweepy', 'pydantic', 'aiohttp') if m in sys.modules))"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == ""
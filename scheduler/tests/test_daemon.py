@@ -0,0 +1,70 @@
+"""Tests for the scheduler daemon."""
+import json
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from scheduler.config import SchedulerConfig
+from scheduler.daemon import SchedulerDaemon
+from scheduler.main import ApiServices
+from scheduler.models import PostStatus
+from scheduler.services.media_cache import MediaCache
+
+
+class RecordingClient:
+    """X client stub that records when tweets are posted."""
+
+    def __init__(self):
+        self.posted = {}
+
+    def post_tweet(self, text, media_ids=None, reply_to=None):
+        self.posted[text] = datetime.now(timezone.utc)
+        return f"tweet-{text}"
+
+
+def _post(post_id, scheduled_at):
+    return {"id": post_id, "type": "tweet", "text": post_id, "scheduled_at": scheduled_at.isoformat()}
+
+
+def _write(path, posts):
+    now = datetime.now(timezone.utc).isoformat()
+    path.write_text(json.dumps({
+        "config": {"timezone": "UTC"},
+        "posts": posts,
+        "stats": {"daily_reset_at": now, "monthly_reset_at": now},
+    }), encoding="utf-8")
+
+
+def test_daemon_posts_on_time_and_picks_up_new_posts(tmp_path):
+    """Test that the daemon wakes at the due time and sees posts added to the file."""
+    data_path = tmp_path / "posts.json"
+    first_due = datetime.now(timezone.utc) + timedelta(seconds=0.5)
+    _write(data_path, [_post("first", first_due)])
+
+    client = RecordingClient()
+    config = SchedulerConfig(str(data_path))
+    api = ApiServices(x_client=client, media_service=None, media_cache=MediaCache())
+    daemon = SchedulerDaemon(config, poll_seconds=0.05, api=api)
+    thread = threading.Thread(target=daemon.run)
+    thread.start()
+
+    try:
+        deadline = time.time() + 5
+        while "first" not in client.posted and time.time() < deadline:
+            time.sleep(0.02)
+
+        # Add a post the way another process would
+        raw = json.loads(data_path.read_text(encoding="utf-8"))
+        raw["posts"].append(_post("second", datetime.now(timezone.utc)))
+        time.sleep(0.01)
+        data_path.write_text(json.dumps(raw), encoding="utf-8")
+
+        while "second" not in client.posted and time.time() < deadline:
+            time.sleep(0.02)
+    finally:
+        daemon.stop()
+        thread.join(timeout=5)
+
+    assert first_due <= client.posted["first"] < first_due + timedelta(seconds=1)
+    assert "second" in client.posted
+    assert config.data.get_post("second").status == PostStatus.POSTED
@@ -0,0 +1,49 @@
+"""Tests for the due-post index."""
+from datetime import datetime, timedelta, timezone
+
+from scheduler.models import Post, PostStatus, PostType
+from scheduler.precheck import peek
+from scheduler.storage.due_index import DueIndex
+
+
+def _post(post_id, minutes, status=PostStatus.PENDING):
+    return Post(
+        id=post_id,
+        type=PostType.TWEET,
+        status=status,
+        text=post_id,
+        scheduled_at=datetime.now(timezone.utc) + timedelta(minutes=minutes),
+    )
+
+
+def test_due_returns_pending_posts_in_time_order():
+    """Test that only due pending posts are returned, oldest first."""
+    posts = [_post("b", -5), _post("a", -10), _post("c", 10), _post("d", -20, PostStatus.POSTED)]
+    index = DueIndex.build(posts, "UTC")
+
+    assert [post.id for post in index.due(datetime.now(timezone.utc))] == ["a", "b"]
+    assert len(index) == 3
+
+
+def test_add_updates_index_on_status_change():
+    """Test that re-adding a finished post removes it and new posts are indexed."""
+    posts = [_post("a", -10), _post("b", -5)]
+    index = DueIndex.build(posts, "UTC")
+
+    posts[0].status = PostStatus.POSTED
+    index.add(posts[0])
+    index.add(_post("c", -1))
+
+    assert [post.id for post in index.due(datetime.now(timezone.utc))] == ["b", "c"]
+    assert "a" not in index
+
+
+def test_peek_next_due_from_sidecar(tmp_path):
+    """Test that the pre-check reads the next due time back without the posts."""
+    data_path = tmp_path / "posts.json"
+    data_path.write_text("{}")
+    posts = [_post("a", 30), _post("b", 60)]
+    index = DueIndex.build(posts, "UTC")
+    index.save(data_path, config={"timezone": "UTC"})
+
+    assert peek(data_path).next_due == index.next_due()
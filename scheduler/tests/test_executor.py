@@ -0,0 +1,68 @@
+"""Tests for concurrent post execution."""
+import threading
+import time
+from datetime import datetime, timezone
+
+from scheduler.models import Post, PostType, Stats
+from scheduler.services.executor import PostExecutor
+from scheduler.services.limit_service import LimitService
+from scheduler.services.post_service import PostService
+
+
+class SlowClient:
+    """X client stub that records concurrent calls."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.active = 0
+        self.peak = 0
+        self.posted = []
+
+    def post_tweet(self, text, media_ids=None, reply_to=None):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(0.02)
+        with self.lock:
+            self.active -= 1
+            self.posted.append(text)
+        return f"tweet-{text}"
+
+
+def _service(client, daily_limit=100):
+    now = datetime.now(timezone.utc)
+    stats = Stats(daily_reset_at=now, monthly_reset_at=now)
+    limits = LimitService(stats, daily_limit=daily_limit, monthly_limit=1000, timezone="UTC")
+    return PostService(client, None, limits, timezone="UTC"), limits
+
+
+def _posts(count):
+    return [
+        Post(id=str(i), type=PostType.TWEET, text=str(i), scheduled_at=datetime.now())
+        for i in range(count)
+    ]
+
+
+def test_results_keep_input_order():
+    """Test that posts run in parallel but results follow the input order."""
+    client = SlowClient()
+    service, _ = _service(client)
+    posts = _posts(8)
+
+    results = PostExecutor(service, max_workers=4).run(posts)
+
+    assert [result.post_id for result in results] == [post.id for post in posts]
+    assert all(result.success for result in results)
+    assert 1 < client.peak <= 4
+
+
+def test_quota_is_not_overshot_under_concurrency():
+    """Test that concurrent posts never exceed the daily limit."""
+    client = SlowClient()
+    service, limits = _service(client, daily_limit=3)
+
+    results = PostExecutor(service, max_workers=8).run(_posts(10))
+
+    assert sum(result.success for result in results) == 3
+    assert len(client.posted) == 3
+    assert limits.stats.daily_count == 3
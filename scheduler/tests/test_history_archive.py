@@ -0,0 +1,40 @@
+"""Tests for history rollover archives."""
+from datetime import datetime, timezone
+
+from scheduler.models import HistoryEntry
+from scheduler.storage.history_archive import HistoryArchive
+
+
+def _entry(post_id, month, day=1):
+    return HistoryEntry(
+        post_id=post_id,
+        action="posted",
+        executed_at=datetime(2026, month, day, 12, tzinfo=timezone.utc),
+    )
+
+
+def test_roll_keeps_recent_entries_and_partitions_the_rest(tmp_path):
+    """Test that old entries land in monthly files and recent ones stay inline."""
+    archive = HistoryArchive(tmp_path / "history", "UTC")
+    history = [_entry("a", 8), _entry("b", 9), _entry("c", 9, 2), _entry("d", 10)]
+
+    kept = archive.roll(history, keep=1)
+    kept = archive.roll(kept + [_entry("e", 10, 2)], keep=1)
+
+    assert [entry.post_id for entry in kept] == ["e"]
+    assert archive.partitions() == ["2026-08", "2026-09", "2026-10"]
+    assert [entry.post_id for entry in archive.read()] == ["a", "b", "c", "d"]
+
+
+def test_read_filters_by_range_and_post(tmp_path):
+    """Test range and post filters on archived history."""
+    archive = HistoryArchive(tmp_path / "history", "UTC")
+    archive.append([_entry("a", 8), _entry("b", 9), _entry("a", 9, 15), _entry("a", 10)])
+
+    september = archive.read(
+        start=datetime(2026, 9, 1, tzinfo=timezone.utc),
+        end=datetime(2026, 10, 1, tzinfo=timezone.utc),
+        post_id="a",
+    )
+
+    assert [entry.executed_at.day for entry in september] == [15]
@@ -0,0 +1,92 @@
+"""Tests for the write-ahead journal."""
+import json
+import shutil
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from scheduler.config import SchedulerConfig
+from scheduler.models import PostStatus
+from scheduler.services.limit_service import LimitService
+from scheduler.services.post_service import PostService
+
+
+class FakeClient:
+    def __init__(self, fail_with=None):
+        self.fail_with = fail_with
+        self.posted = []
+
+    def post_tweet(self, text, media_ids=None):
+        if self.fail_with:
+            raise self.fail_with
+        self.posted.append(text)
+        return str(len(self.posted))
+
+
+def _config(tmp_path):
+    now = datetime.now(timezone.utc)
+    data_path = tmp_path / "posts.json"
+    data_path.write_text(json.dumps({
+        "config": {"timezone": "UTC"},
+        "posts": [
+            {"id": post_id, "type": "tweet", "text": post_id, "scheduled_at": (now - timedelta(minutes=1)).isoformat()}
+            for post_id in ("a", "b")
+        ],
+        "stats": {"daily_reset_at": now.isoformat(), "monthly_reset_at": now.isoformat()},
+    }), encoding="utf-8")
+    config = SchedulerConfig(str(data_path))
+    config.load()
+    return config
+
+
+def _service(config, client):
+    limits = LimitService(config.data.stats, timezone="UTC")
+    return PostService(client, None, limits, timezone="UTC", due_index=config.due_index, journal=config.journal)
+
+
+def test_replay_after_crash_before_save(tmp_path):
+    """Test that results journaled by a killed run are restored on the next load."""
+    config = _config(tmp_path)
+    service = _service(config, FakeClient())
+    post = config.data.get_post("a")
+    service.apply_results(config.data, [service.execute_post(post)])
+    # Killed here, before config.save()
+
+    restarted = SchedulerConfig(str(config.data_path))
+    data = restarted.load()
+    assert data.get_post("a").status == PostStatus.POSTED
+    assert data.get_post("a").posted_tweet_id == "1"
+    assert data.stats.daily_count == 1
+    assert [entry.post_id for entry in data.history] == ["a"]
+    assert [p.id for p in restarted.due_index.due(datetime.now(timezone.utc))] == ["b"]
+
+
+def test_post_interrupted_mid_request_is_not_retried(tmp_path):
+    """Test that a post killed while being sent stays POSTING instead of being due again."""
+    config = _config(tmp_path)
+    service = _service(config, FakeClient(fail_with=KeyboardInterrupt()))
+    with pytest.raises(KeyboardInterrupt):
+        service.execute_post(config.data.get_post("a"))
+
+    restarted = SchedulerConfig(str(config.data_path))
+    data = restarted.load()
+    assert data.get_post("a").status == PostStatus.POSTING
+    assert data.get_post("a").claimed_at is not None
+    assert data.get_post("a").attempt_id
+    assert [p.id for p in restarted.due_index.due(datetime.now(timezone.utc))] == ["b"]
+
+
+def test_saved_records_are_not_replayed_twice(tmp_path):
+    """Test that a journal left behind after a successful save is skipped."""
+    config = _config(tmp_path)
+    service = _service(config, FakeClient())
+    service.apply_results(config.data, [service.execute_post(config.data.get_post("a"))])
+    shutil.copy(config.journal.path, tmp_path / "leftover")
+    config.save()
+    assert config.journal.path.stat().st_size == 0
+
+    # Killed after saving but before the journal was truncated
+    shutil.copy(tmp_path / "leftover", config.journal.path)
+    data = SchedulerConfig(str(config.data_path)).load()
+    assert len(data.history) == 1
+    assert data.stats.daily_count == 1
@@ -0,0 +1,99 @@
+"""Tests for the media ID cache."""
+import time
+
+from scheduler.models import MediaItem
+from scheduler.services.media_cache import DEFAULT_TTL_SECONDS, EXPIRY_MARGIN_SECONDS, MediaCache, MediaId
+from scheduler.services.media_service import MediaService
+
+
+class CountingClient:
+    """X client stub that counts uploads."""
+
+    def __init__(self):
+        self.uploads = 0
+
+    def upload_media(self, file_path):
+        self.uploads += 1
+        return f"media-{self.uploads}"
+
+
+def test_identical_content_is_uploaded_once(tmp_path):
+    """Test that files with the same content reuse the media ID."""
+    (tmp_path / "a.png").write_bytes(b"same")
+    (tmp_path / "b.png").write_bytes(b"same")
+    client = CountingClient()
+    cache = MediaCache()
+    service = MediaService(client, base_path=str(tmp_path), cache=cache)
+    media = [MediaItem(type="image", path="a.png"), MediaItem(type="image", path="b.png")]
+
+    assert service.upload(media[0]) == service.upload(media[1]) == "media-1"
+    assert media[1].media_id == "media-1"
+    assert client.uploads == 1
+    assert cache.hit_rate == 0.5
+
+
+def test_expired_and_evicted_entries_are_uploaded_again(tmp_path):
+    """Test expiry and LRU eviction."""
+    for name in ("a", "b", "c"):
+        (tmp_path / f"{name}.png").write_bytes(name.encode())
+
+    expired = MediaCache(ttl_seconds=0)
+    expired.put(tmp_path / "a.png", "1")
+    assert expired.get(tmp_path / "a.png") is None
+
+    cache = MediaCache(max_entries=2)
+    cache.put(tmp_path / "a.png", "1")
+    cache.put(tmp_path / "b.png", "2")
+    cache.get(tmp_path / "a.png")
+    cache.put(tmp_path / "c.png", "3")
+
+    assert cache.get(tmp_path / "b.png") is None
+    assert cache.get(tmp_path / "a.png") == "1"
+
+
+def test_cache_persists_and_detects_changed_files(tmp_path):
+    """Test that the cache survives a reload and rehashes modified files."""
+    image = tmp_path / "a.png"
+    image.write_bytes(b"one")
+    cache = MediaCache(tmp_path / "cache.json")
+    cache.put(image, "1")
+    cache.save()
+
+    reloaded = MediaCache(tmp_path / "cache.json")
+    reloaded.load()
+    assert reloaded.get(image) == "1"
+
+    image.write_bytes(b"two!")
+    assert reloaded.get(image) is None
+
+
+def test_server_reported_expiry_limits_reuse(tmp_path):
+    """Test that IDs are kept only until shortly before the expiry X reported."""
+    for name in ("a", "b", "c"):
+        (tmp_path / f"{name}.png").write_bytes(name.encode())
+    cache = MediaCache()
+
+    cache.put(tmp_path / "a.png", MediaId("1", expires_after_secs=2 * 60 * 60))
+    cache.put(tmp_path / "b.png", "2", expires_after_secs=EXPIRY_MARGIN_SECONDS)
+    cache.put(tmp_path / "c.png", "3", expires_after_secs=7 * 24 * 60 * 60)
+
+    entries = {entry["media_id"]: entry["expires_at"] - time.time() for entry in cache._entries.values()}
+    assert set(entries) == {"1", "3"}
+    assert entries["1"] <= 60 * 60
+    assert entries["3"] <= DEFAULT_TTL_SECONDS
+
+
+def test_media_service_passes_the_upload_expiry_to_the_cache(tmp_path):
+    """Test that an upload expiring within the safety margin is not reused."""
+    (tmp_path / "a.png").write_bytes(b"a")
+
+    class ExpiringClient(CountingClient):
+        def upload_media(self, file_path):
+            return MediaId(super().upload_media(file_path), expires_after_secs=60)
+
+    client = ExpiringClient()
+    service = MediaService(client, base_path=str(tmp_path), cache=MediaCache())
+    media = [MediaItem(type="image", path="a.png"), MediaItem(type="image", path="a.png")]
+
+    assert [service.upload(item) for item in media] == ["media-1", "media-2"]
+    assert type(media[0].media_id) is str
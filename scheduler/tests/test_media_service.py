@@ -0,0 +1,89 @@
+"""Tests for media uploads."""
+import threading
+import time
+from datetime import datetime
+
+import pytest
+
+from scheduler.models import MediaItem, Post, PostType, ThreadItem
+from scheduler.services.media_service import MediaService
+from scheduler.services.post_service import PostService
+from scheduler.services.x_api_client import XApiClient, XApiError, XCredentials
+
+
+class FakeClient(XApiClient):
+    """XApiClient with network calls replaced by local fakes."""
+
+    def __init__(self, fail_path=None):
+        super().__init__(XCredentials("k", "s", "t", "ts"))
+        self.fail_path = fail_path
+        self.lock = threading.Lock()
+        self.active = 0
+        self.peak = 0
+        self.events = []
+
+    def upload_media(self, file_path):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(0.02)
+        with self.lock:
+            self.active -= 1
+            self.events.append(("upload", file_path.rsplit("/", 1)[-1]))
+        if file_path == self.fail_path:
+            raise XApiError("upload failed")
+        return f"m-{file_path.rsplit('/', 1)[-1]}"
+
+    def post_tweet(self, text, media_ids=None, reply_to=None):
+        with self.lock:
+            self.events.append(("tweet", text))
+        return f"t-{text}"
+
+    def delete_tweet(self, tweet_id):
+        with self.lock:
+            self.events.append(("delete", tweet_id))
+        return True
+
+
+def _media(tmp_path, count):
+    items = []
+    for i in range(count):
+        (tmp_path / f"{i}.png").write_bytes(b"png")
+        items.append(MediaItem(type="image", path=f"{i}.png"))
+    return items
+
+
+def test_upload_all_runs_in_parallel_and_keeps_order(tmp_path):
+    """Test that uploads overlap up to the cap and IDs keep their order."""
+    client = FakeClient()
+    service = MediaService(client, base_path=str(tmp_path), max_parallel_uploads=2)
+
+    media_ids = service.upload_all(_media(tmp_path, 4))
+
+    assert media_ids == ["m-0.png", "m-1.png", "m-2.png", "m-3.png"]
+    assert client.peak == 2
+
+
+def test_upload_all_raises_on_failure(tmp_path):
+    """Test that a failed upload still fails the whole call."""
+    client = FakeClient(fail_path=str(tmp_path / "1.png"))
+    service = MediaService(client, base_path=str(tmp_path))
+
+    with pytest.raises(XApiError):
+        service.upload_all(_media(tmp_path, 3))
+
+
+def test_thread_posts_first_tweet_before_later_uploads_finish(tmp_path):
+    """Test that thread tweets are posted while later media still uploads."""
+    client = FakeClient()
+    media = _media(tmp_path, 4)
+    service = PostService(client, MediaService(client, base_path=str(tmp_path), max_parallel_uploads=1), None)
+    post = Post(
+        type=PostType.THREAD,
+        scheduled_at=datetime.now(),
+        thread=[ThreadItem(text=str(i), media=[item]) for i, item in enumerate(media)],
+    )
+
+    assert service._execute_thread(post) == "t-0"
+    assert client.events.index(("tweet", "0")) < client.events.index(("upload", "3.png"))
+    assert [event for event in client.events if event[0] == "tweet"] == [("tweet", str(i)) for i in range(4)]
@@ -0,0 +1,82 @@
+"""Tests for the backlog planner."""
+from datetime import datetime, timedelta, timezone
+
+from scheduler.models import Config, Post, PostsData, PostStatus, PostType, RateLimit, Stats, ThreadItem
+from scheduler.services.limit_service import LimitService
+from scheduler.services.planner import BacklogPlanner
+from scheduler.services.post_service import PostService
+from scheduler.services.rate_limits import TWEET_ENDPOINT, RateLimitTracker
+from scheduler.storage.due_index import DueIndex
+
+# LimitService expires post times against the real clock
+NOW = datetime.now(timezone.utc).replace(microsecond=0)
+
+
+def make_stats(**kwargs) -> Stats:
+    return Stats(daily_reset_at=NOW, monthly_reset_at=NOW, **kwargs)
+
+
+def make_posts(count: int) -> list[Post]:
+    return [
+        Post(id=f"p{i}", type=PostType.TWEET, text=f"post {i}", scheduled_at=NOW - timedelta(minutes=count - i))
+        for i in range(count)
+    ]
+
+
+def test_backlog_beyond_quota_is_deferred_to_free_slots():
+    """Test that posts past the quota get the times slots free up, in priority order."""
+    posted = [NOW - timedelta(hours=23), NOW - timedelta(hours=22)]
+    limits = LimitService(make_stats(post_times=posted), daily_limit=3, monthly_limit=100, timezone="UTC")
+    posts = make_posts(4)
+    posts[3].priority = 1
+
+    plan = BacklogPlanner(limits, timezone="UTC").plan(posts, now=NOW)
+
+    assert [post.id for post in plan.ready] == ["p3"]
+    assert [(post.id, until) for post, until in plan.deferred] == [
+        ("p0", NOW + timedelta(hours=1)),
+        ("p1", NOW + timedelta(hours=2)),
+        ("p2", NOW + timedelta(hours=24)),
+    ]
+    # Planning does not use up the real quota
+    assert limits.get_remaining()["daily"] == 1
+
+
+def test_rate_limited_endpoint_defers_only_what_does_not_fit():
+    """Test that endpoint budgets are shared between posts and threads need one call per tweet."""
+    tracker = RateLimitTracker({
+        TWEET_ENDPOINT: RateLimit(limit=300, remaining=2, reset_at=NOW + timedelta(minutes=10)),
+    })
+    limits = LimitService(make_stats(), daily_limit=100, monthly_limit=100, timezone="UTC")
+    thread = Post(
+        id="thread", type=PostType.THREAD, scheduled_at=NOW - timedelta(hours=1),
+        thread=[ThreadItem(text="one"), ThreadItem(text="two")]
+    )
+    repost = Post(id="repost", type=PostType.REPOST, target_tweet_id="1", scheduled_at=NOW)
+    posts = [thread] + make_posts(2) + [repost]
+
+    plan = BacklogPlanner(limits, tracker, timezone="UTC").plan(posts, now=NOW)
+
+    assert [post.id for post in plan.ready] == ["thread", "repost"]
+    assert [(post.id, until) for post, until in plan.deferred] == [
+        ("p0", NOW + timedelta(minutes=10)),
+        ("p1", NOW + timedelta(minutes=10)),
+    ]
+
+
+def test_deferred_posts_leave_the_due_index_without_a_retry():
+    """Test that deferral re-indexes posts at their deferral time and keeps retries."""
+    posts = make_posts(2)
+    data = PostsData(config=Config(timezone="UTC"), posts=posts, stats=make_stats())
+    index = DueIndex.build(posts, timezone="UTC")
+    limits = LimitService(data.stats, daily_limit=1, monthly_limit=100, timezone="UTC")
+    service = PostService(x_client=None, media_service=None, limit_service=limits, timezone="UTC", due_index=index)
+
+    plan = BacklogPlanner(limits, timezone="UTC").plan(index.due(NOW), now=NOW)
+    service.defer(plan.deferred)
+
+    assert [post.id for post in index.due(NOW)] == ["p0"]
+    # p1 waits for the slot p0 is about to use
+    assert posts[1].deferred_until == NOW + timedelta(hours=24)
+    assert index.next_due(after=NOW) == NOW + timedelta(hours=24)
+    assert posts[1].status == PostStatus.PENDING and posts[1].retry_count == 0
@@ -0,0 +1,128 @@
+"""Tests for post status handling."""
+from datetime import datetime, timezone
+
+from scheduler.models import Post, PostsData, PostStatus, PostType, Config, Stats
+from scheduler.services.post_service import PostResult, PostService
+
+
+def _data(*post_ids):
+    now = datetime.now(timezone.utc)
+    return PostsData(
+        config=Config(timezone="UTC"),
+        stats=Stats(daily_reset_at=now, monthly_reset_at=now),
+        posts=[
+            Post(id=post_id, type=PostType.TWEET, text=post_id, scheduled_at=now)
+            for post_id in post_ids
+        ],
+    )
+
+
+def test_get_post_tracks_appends():
+    """Test that posts added either way can be looked up by ID."""
+    data = _data("a", "b")
+    data.add_post(Post(id="c", type=PostType.TWEET, text="c", scheduled_at=datetime.now()))
+    data.posts.append(Post(id="d", type=PostType.TWEET, text="d", scheduled_at=datetime.now()))
+
+    assert data.get_post("c").id == "c"
+    assert data.get_post("d").id == "d"
+    assert data.get_post("missing") is None
+
+
+def test_apply_results_updates_statuses_and_history():
+    """Test that a batch of results is applied to the matching posts."""
+    data = _data("a", "b", "c")
+    service = PostService(None, None, None, timezone="UTC")
+
+    service.apply_results(data, [
+        PostResult(post_id="c", success=True, tweet_id="100"),
+        PostResult(post_id="a", success=False, error="boom"),
+    ], retry_max=1)
+
+    assert data.get_post("c").status == PostStatus.POSTED
+    assert data.get_post("c").posted_tweet_id == "100"
+    assert data.get_post("a").status == PostStatus.FAILED
+    assert data.get_post("b").status == PostStatus.PENDING
+    assert [(entry.post_id, entry.action) for entry in data.history] == [("c", "posted"), ("a", "failed")]
+
+
+class TimelineClient:
+    def __init__(self, tweets):
+        self.tweets = tweets
+        self.since = None
+
+    def get_recent_tweets(self, start_time):
+        self.since = start_time
+        return list(self.tweets)
+
+
+def test_reconcile_stranded_posts():
+    """Test that stranded POSTING posts are matched against recent tweets."""
+    from datetime import timedelta
+    from scheduler.services.limit_service import LimitService
+
+    now = datetime.now(timezone.utc)
+    data = _data("published", "lost", "repost", "fresh")
+    data.get_post("published").text = "Tom & Jerry https://example.com"
+    repost = data.get_post("repost")
+    repost.type, repost.text, repost.target_tweet_id = PostType.REPOST, None, "555"
+    for post in data.posts:
+        post.status = PostStatus.POSTING
+        post.claimed_at = now - timedelta(minutes=10)
+    data.get_post("fresh").claimed_at = now
+
+    client = TimelineClient([
+        {"id": "900", "text": "Tom &amp; Jerry https://t.co/abc https://t.co/media", "reposted_id": None},
+        {"id": "901", "text": "RT @someone: hi", "reposted_id": "555"},
+    ])
+    limits = LimitService(data.stats, timezone="UTC")
+    service = PostService(client, None, limits, timezone="UTC")
+
+    assert service.reconcile_stranded(data, now=now) == 3
+    assert client.since == now - timedelta(minutes=11)
+    assert (data.get_post("published").status, data.get_post("published").posted_tweet_id) == (PostStatus.POSTED, "900")
+    assert (data.get_post("repost").status, data.get_post("repost").posted_tweet_id) == (PostStatus.POSTED, "555")
+    assert data.get_post("lost").status == PostStatus.PENDING
+    assert data.get_post("lost").retry_count == 0
+    assert data.get_post("fresh").status == PostStatus.POSTING
+    assert data.stats.daily_count == 2
+
+
+class TimingOutTweepyClient:
+    """Stand-in for tweepy.Client whose response times out after X created the tweet."""
+
+    def __init__(self):
+        self.tweets = []
+
+    def create_tweet(self, text, **kwargs):
+        import requests
+
+        self.tweets.append({"id": str(700 + len(self.tweets)), "text": text, "reposted_id": None})
+        raise requests.ReadTimeout("Read timed out")
+
+
+def test_timeout_leaves_post_for_reconciliation():
+    """Test that a post whose request timed out is not retried before X is checked."""
+    from datetime import timedelta
+    from scheduler.services.limit_service import LimitService
+    from scheduler.services.x_api_client import XApiClient, XCredentials
+
+    now = datetime.now(timezone.utc)
+    data = _data("a")
+    client = XApiClient(XCredentials("key", "secret", "token-timeout", "token-secret"))
+    client._client = TimingOutTweepyClient()
+    limits = LimitService(data.stats, timezone="UTC")
+    service = PostService(client, None, limits, timezone="UTC")
+
+    result = service.execute_post(data.get_post("a"))
+    service.apply_results(data, [result])
+
+    post = data.get_post("a")
+    assert result.outcome_unknown
+    assert (post.status, post.retry_count) == (PostStatus.POSTING, 0)
+    assert data.history == [] and data.stats.daily_count == 0
+
+    post.claimed_at = now - timedelta(minutes=10)
+    reconciler = PostService(TimelineClient(client._client.tweets), None, limits, timezone="UTC")
+    assert reconciler.reconcile_stranded(data, now=now) == 1
+    assert (post.status, post.posted_tweet_id) == (PostStatus.POSTED, "700")
+    assert data.stats.daily_count == 1
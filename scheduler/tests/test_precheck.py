@@ -0,0 +1,41 @@
+"""Tests for the data file pre-check."""
+import json
+from datetime import datetime, timedelta, timezone
+
+from scheduler.config import SchedulerConfig
+from scheduler.precheck import peek
+
+
+def _write(path, posts):
+    now = datetime.now(timezone.utc).isoformat()
+    path.write_text(json.dumps({
+        "config": {"timezone": "UTC", "interval_minutes": 30},
+        "posts": posts,
+        "stats": {"daily_reset_at": now, "monthly_reset_at": now},
+    }), encoding="utf-8")
+
+
+def test_peek_reads_raw_file_and_sidecar(tmp_path):
+    """Test that both the raw file and the saved due index give the next due time."""
+    data_path = tmp_path / "posts.json"
+    soon = datetime.now(timezone.utc) + timedelta(hours=1)
+    _write(data_path, [
+        {"id": "a", "type": "tweet", "text": "a", "status": "posted", "scheduled_at": "2020-01-01T00:00:00"},
+        {"id": "b", "type": "tweet", "text": "b", "scheduled_at": soon.isoformat()},
+        # Held back past its scheduled time by the backlog planner
+        {"id": "c", "type": "tweet", "text": "c", "scheduled_at": "2020-01-01T00:00:00",
+         "deferred_until": (soon + timedelta(minutes=5)).isoformat()},
+    ])
+
+    raw = peek(data_path)
+    assert raw.interval_minutes == 30
+    assert raw.next_due == soon
+    assert not raw.has_due_posts()
+
+    config = SchedulerConfig(str(data_path))
+    config.load()
+    config.save()
+
+    from_sidecar = peek(data_path)
+    assert from_sidecar.next_due.timestamp() == soon.timestamp()
+    assert from_sidecar.interval_minutes == 30
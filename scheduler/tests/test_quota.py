@@ -0,0 +1,72 @@
+"""Tests for rolling post quotas."""
+from datetime import datetime, timedelta, timezone
+
+from scheduler.models import Config, Post, PostsData, PostStatus, PostType, Stats
+from scheduler.services.limit_service import LimitService
+from scheduler.services.post_service import PostService
+from scheduler.services.quota import QuotaEngine, SlidingWindow, TokenBucket
+
+NOW = datetime(2026, 3, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def test_sliding_window_frees_slots_one_window_after_each_post():
+    """Test that slots free up on a rolling basis and in-flight posts count."""
+    window = SlidingWindow(2, timedelta(hours=24), [NOW - timedelta(hours=20), NOW - timedelta(hours=1)])
+    engine = QuotaEngine({"daily": window})
+
+    assert engine.reserve(NOW) == "daily"
+    assert engine.next_available(NOW) == NOW + timedelta(hours=4)
+
+    later = NOW + timedelta(hours=5)
+    assert engine.reserve(later) is None
+    # If the in-flight post goes out, the next slot frees when the older one expires
+    assert engine.next_available(later) == NOW + timedelta(hours=23)
+    engine.release()
+    assert engine.next_available(later) == later
+
+    full = QuotaEngine({"daily": SlidingWindow(1, timedelta(hours=24))})
+    assert full.reserve(NOW) is None
+    assert full.next_available(NOW) is None  # Depends only on the in-flight post
+
+
+def test_token_bucket_limits_bursts():
+    """Test that a bucket admits a burst and then refills at its rate."""
+    bucket = TokenBucket(2, timedelta(hours=1))
+    engine = QuotaEngine({"burst": bucket})
+    for _ in range(2):
+        assert engine.reserve(NOW) is None
+        engine.commit(NOW)
+
+    assert engine.reserve(NOW) == "burst"
+    assert engine.next_available(NOW) == NOW + timedelta(hours=1)
+    assert engine.reserve(NOW + timedelta(hours=1)) is None
+
+
+def test_calendar_counters_are_converted():
+    """Test that counters from calendar limits still block until their old reset."""
+    reset_at = datetime.now(timezone.utc) + timedelta(hours=3)
+    stats = Stats(daily_count=2, daily_reset_at=reset_at, monthly_count=5, monthly_reset_at=reset_at)
+    limits = LimitService(stats, daily_limit=2, monthly_limit=100, timezone="UTC")
+
+    assert not limits.can_post()
+    assert limits.next_available() == reset_at
+    assert (stats.daily_count, stats.monthly_count, len(stats.post_times)) == (2, 5, 5)
+
+
+def test_full_quota_defers_without_using_retries():
+    """Test that a post over quota stays pending with its retry count unchanged."""
+    now = datetime.now(timezone.utc)
+    stats = Stats(daily_reset_at=now, monthly_reset_at=now, post_times=[now - timedelta(hours=1)])
+    data = PostsData(
+        config=Config(timezone="UTC"),
+        stats=stats,
+        posts=[Post(id="a", type=PostType.TWEET, text="a", scheduled_at=now)],
+    )
+    service = PostService(None, None, LimitService(stats, daily_limit=1, timezone="UTC"), timezone="UTC")
+
+    result = service.execute_post(data.posts[0])
+    service.apply_results(data, [result], retry_max=1)
+
+    assert result.deferred
+    assert (data.posts[0].status, data.posts[0].retry_count) == (PostStatus.PENDING, 0)
+    assert data.history == []
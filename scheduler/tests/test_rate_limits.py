@@ -0,0 +1,86 @@
+"""Tests for per-endpoint rate limit handling."""
+from datetime import datetime, timedelta, timezone
+
+from scheduler.benchmarks.fake_x_api import FakeXApi
+from scheduler.models import Config, MediaItem, Post, PostsData, PostStatus, PostType, Stats
+from scheduler.services.limit_service import LimitService
+from scheduler.services.post_service import PostService
+from scheduler.services.rate_limits import (
+    MEDIA_UPLOAD_ENDPOINT, REPOST_ENDPOINT, TWEET_ENDPOINT, RateLimitTracker, endpoint_key, parse_headers,
+    post_calls
+)
+from scheduler.services.x_api_client import XApiClient, XCredentials
+
+
+def test_parse_headers_picks_most_restrictive():
+    """Test that an exhausted 24-hour cap wins over the 15-minute window."""
+    now = int(datetime.now(timezone.utc).timestamp())
+    limit = parse_headers({
+        "x-rate-limit-limit": "100",
+        "x-rate-limit-remaining": "99",
+        "x-rate-limit-reset": str(now + 900),
+        "x-user-limit-24hour-limit": "17",
+        "x-user-limit-24hour-remaining": "0",
+        "x-user-limit-24hour-reset": str(now + 3600),
+    })
+
+    assert (limit.limit, limit.remaining) == (17, 0)
+    assert limit.reset_at.timestamp() == now + 3600
+    assert parse_headers({}) is None
+    assert endpoint_key("POST", "https://api.twitter.com/2/users/123/retweets") == REPOST_ENDPOINT
+
+
+def test_post_calls_count_media_uploaded_by_an_earlier_attempt():
+    """Test that a retried post still needs upload budget for media it uploaded before."""
+    post = Post(
+        type=PostType.TWEET,
+        text="retry",
+        scheduled_at=datetime.now(timezone.utc),
+        media=[MediaItem(type="image", path="a.png", media_id="1"), MediaItem(type="image", path="b.png")],
+    )
+
+    assert post_calls(post) == {TWEET_ENDPOINT: 1, MEDIA_UPLOAD_ENDPOINT: 2}
+
+
+def test_exhausted_endpoint_defers_only_its_posts():
+    """Test that a 429 on tweets defers tweets but reposts keep going."""
+    now = datetime.now(timezone.utc)
+    data = PostsData(
+        config=Config(timezone="UTC"),
+        stats=Stats(daily_reset_at=now, monthly_reset_at=now),
+        posts=[
+            Post(id="a", type=PostType.TWEET, text="a", scheduled_at=now),
+            Post(id="b", type=PostType.REPOST, target_tweet_id="7", scheduled_at=now),
+            Post(id="c", type=PostType.TWEET, text="c", scheduled_at=now),
+        ],
+    )
+    tracker = RateLimitTracker()
+
+    with FakeXApi() as server:
+        server.exhausted.add(TWEET_ENDPOINT)
+        client = XApiClient(
+            XCredentials("key", "secret", "42-token-limits", "token-secret"),
+            api_base_url=server.base_url,
+            rate_limits=tracker
+        )
+        service = PostService(
+            client, None, LimitService(data.stats, timezone="UTC"), timezone="UTC", rate_limits=tracker
+        )
+        results = [service.execute_post(post) for post in data.posts]
+
+    assert [(r.success, r.deferred) for r in results] == [(False, True), (True, False), (False, True)]
+    assert server.requests[TWEET_ENDPOINT] == 1
+    assert tracker.blocked_until([TWEET_ENDPOINT]) > now
+    assert tracker.blocked_until([REPOST_ENDPOINT]) is None
+
+    service.apply_results(data, results, retry_max=1)
+    assert [(p.status, p.retry_count) for p in data.posts] == [
+        (PostStatus.PENDING, 0), (PostStatus.POSTED, 0), (PostStatus.PENDING, 0)
+    ]
+    assert [entry.post_id for entry in data.history] == ["b"]
+    assert data.stats.daily_count == 1
+
+    data.stats.rate_limits = tracker.snapshot()
+    restored = RateLimitTracker(Stats.model_validate_json(data.stats.model_dump_json()).rate_limits)
+    assert restored.blocked_until([TWEET_ENDPOINT]) == tracker.blocked_until([TWEET_ENDPOINT])
+    assert timedelta(minutes=14) < restored.blocked_until([TWEET_ENDPOINT]) - now <= timedelta(minutes=15)
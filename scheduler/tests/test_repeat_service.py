@@ -0,0 +1,256 @@
+"""Tests for repeat post scheduling."""
+import json
+from datetime import datetime, timedelta, timezone
+from itertools import islice
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from scheduler.models import (
+    MediaItem, Post, PostStatus, PostType, RepeatConfig, RepeatType, ThreadItem
+)
+from scheduler.config import SchedulerConfig
+from scheduler.main import ApiServices, run_tick
+from scheduler.services.media_cache import MediaCache
+from scheduler.services.repeat_service import (
+    SERIES_CANCELLED_REASON, SERIES_STOPPED_REASON, SKIPPED_REASON, RepeatService
+)
+from scheduler.storage import convert, create_storage
+from scheduler.tests.test_accounts import RecordingClient
+
+TZ = ZoneInfo("Asia/Tokyo")
+
+
+def test_weekly_occurrences_follow_the_weekday_mask():
+    """Test that weekly occurrences jump straight to the next selected weekday."""
+    service = RepeatService("Asia/Tokyo")
+    repeat = RepeatConfig(type=RepeatType.WEEKLY, days=["Monday", "friday"], time="09:30")
+    friday = datetime(2026, 3, 6, 9, 30, tzinfo=TZ)
+
+    assert list(islice(service.occurrences(repeat, friday), 3)) == [
+        datetime(2026, 3, 9, 9, 30, tzinfo=TZ),
+        datetime(2026, 3, 13, 9, 30, tzinfo=TZ),
+        datetime(2026, 3, 16, 9, 30, tzinfo=TZ),
+    ]
+    # Earlier the same day, the occurrence that day is next
+    assert service.calculate_next(repeat, friday.replace(hour=8)) == friday
+
+
+def test_monthly_uses_last_day_of_short_months():
+    """Test that a day of month past the month's end falls on its last day."""
+    service = RepeatService("Asia/Tokyo")
+    repeat = RepeatConfig(type=RepeatType.MONTHLY, day_of_month=31, time="12:00")
+    start = datetime(2026, 1, 31, 12, 0, tzinfo=TZ)
+
+    assert [when.date().isoformat() for when in islice(service.occurrences(repeat, start), 3)] == [
+        "2026-02-28", "2026-03-31", "2026-04-30",
+    ]
+
+
+def test_end_date_and_end_count():
+    """Test that a series ends after end_date's occurrence or end_count posts."""
+    service = RepeatService("Asia/Tokyo")
+    start = datetime(2026, 3, 29, 9, 0, tzinfo=TZ)
+
+    until = RepeatConfig(type=RepeatType.DAILY, time="09:00", end_date="2026-03-31")
+    assert [when.day for when in service.occurrences(until, start)] == [30, 31]
+    assert service.calculate_next(until, datetime(2026, 3, 31, 9, 0, tzinfo=TZ)) is None
+
+    counted = RepeatConfig(type=RepeatType.DAILY, time="09:00", end_count=5, executed_count=3)
+    assert len(list(service.occurrences(counted, start))) == 2
+
+
+def test_missed_occurrences_are_skipped_in_one_step():
+    """Test that a series that was down for days resumes at the next future occurrence."""
+    service = RepeatService("Asia/Tokyo")
+    post = Post(
+        type=PostType.TWEET,
+        text="daily",
+        scheduled_at=datetime(2026, 3, 1, 9, 0, tzinfo=TZ),
+        repeat=RepeatConfig(type=RepeatType.DAILY, time="09:00"),
+    )
+    now = datetime(2026, 3, 10, 12, 0, tzinfo=TZ)
+
+    next_post = service.generate_next_post(post, now=now)
+
+    assert next_post.scheduled_at == datetime(2026, 3, 11, 9, 0, tzinfo=TZ)
+    assert next_post.repeat.executed_count == 1
+    assert service.generate_next_post(post).scheduled_at == post.scheduled_at + timedelta(days=1)
+
+
+def _daily_post(**kwargs) -> Post:
+    return Post(
+        type=PostType.THREAD,
+        thread=[ThreadItem(text="one", media=[MediaItem(type="image", path="a.png")])],
+        scheduled_at=datetime(2026, 3, 1, 9, 0, tzinfo=TZ),
+        repeat=RepeatConfig(type=RepeatType.DAILY, time="09:00"),
+        **kwargs
+    )
+
+
+def test_materialize_keeps_upcoming_posts_per_series():
+    """Test that a series is topped up to the window and its posts share the payload."""
+    service = RepeatService("Asia/Tokyo")
+    first = _daily_post()
+    now = datetime(2026, 3, 1, 8, 0, tzinfo=TZ)
+
+    created = service.materialize([first], now, ahead=3)
+
+    # The pending post without a series_id counts as the first of its series
+    assert [post.scheduled_at.day for post in created] == [2, 3]
+    assert {post.series_id for post in created} == {first.id}
+    assert [post.repeat.executed_count for post in created] == [1, 2]
+    assert created[0].thread is first.thread
+    assert service.materialize([first, *created], now, ahead=3) == []
+
+    # A failed post does not end the series; it is extended past today
+    first.status = PostStatus.FAILED
+    later = datetime(2026, 3, 3, 12, 0, tzinfo=TZ)
+    topped_up = service.materialize([first, *created], later, ahead=2)
+    assert [post.scheduled_at.day for post in topped_up] == [4, 5]
+
+
+def test_materialize_respects_cancellation_and_horizon():
+    """Test that a cancelled latest post stops a series and the horizon caps it."""
+    service = RepeatService("Asia/Tokyo")
+    now = datetime(2026, 3, 1, 8, 0, tzinfo=TZ)
+
+    cancelled = _daily_post(series_id="s", status=PostStatus.CANCELLED)
+    assert service.materialize([cancelled], now, ahead=5) == []
+
+    created = service.materialize([_daily_post()], now, ahead=10, horizon=timedelta(days=3))
+    assert [post.scheduled_at.day for post in created] == [2, 3]
+
+
+def test_own_payload_unshares_items_before_posting():
+    """Test that a claimed post gets its own media items."""
+    service = RepeatService("Asia/Tokyo")
+    first = _daily_post()
+    shared = service.materialize([first], datetime(2026, 3, 1, 8, 0, tzinfo=TZ), ahead=2)[0]
+
+    shared.own_payload()
+    shared.thread[0].media[0].media_id = "uploaded"
+
+    assert first.thread[0].media[0].media_id is None
+
+
+def test_outage_posts_only_the_latest_overdue_occurrence(tmp_path):
+    """Test that a series catches up with one post after the scheduler was down."""
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    data_path = tmp_path / "posts.json"
+    data_path.write_text(json.dumps({
+        "config": {"timezone": "UTC"},
+        "posts": [{
+            "id": "daily", "type": "tweet", "text": "same text",
+            "scheduled_at": (now - timedelta(days=4)).isoformat(),
+            "repeat": {"type": "daily", "time": (now - timedelta(minutes=1)).strftime("%H:%M")},
+        }],
+        "stats": {"daily_reset_at": now.isoformat(), "monthly_reset_at": now.isoformat()},
+    }), encoding="utf-8")
+    config = SchedulerConfig(str(data_path))
+    config.load()
+    # Posts materialized before the outage
+    config.add_posts(RepeatService("UTC").materialize(config.data.posts, now - timedelta(days=4), ahead=3))
+
+    client = RecordingClient()
+    run_tick(config, ApiServices(x_client=client, media_service=None, media_cache=MediaCache(), rate_limits=None))
+
+    assert client.posted == ["same text"]
+    statuses = sorted((post.scheduled_at, post.status) for post in config.data.posts)
+    assert [status for _, status in statuses[:4]] == [PostStatus.CANCELLED] * 3 + [PostStatus.POSTED]
+    assert all(status == PostStatus.PENDING for _, status in statuses[4:]) and statuses[4][0] > now
+    assert [entry.error for entry in config.data.history if entry.action == "cancelled"] == [SKIPPED_REASON] * 3
+
+
+def test_cancelling_a_series_post_cancels_the_ones_after_it():
+    """Test that cancelling one post stops the series, while skipped posts do not."""
+    service = RepeatService("Asia/Tokyo")
+    first = _daily_post()
+    now = datetime(2026, 3, 1, 8, 0, tzinfo=TZ)
+    posts = [first, *service.materialize([first], now, ahead=4)]
+    posts[0].status = PostStatus.CANCELLED
+    posts[0].error_message = SKIPPED_REASON
+    posts[2].status = PostStatus.CANCELLED
+
+    stopped = {}
+    assert service.stop_cancelled(posts, stopped) == [posts[2]]
+    assert stopped == {first.id: posts[2].scheduled_at}
+    assert posts[2].error_message == SERIES_STOPPED_REASON
+    assert service.prune(posts, now, stopped) == [(posts[3], SERIES_CANCELLED_REASON)]
+    posts[3].status = PostStatus.CANCELLED
+    # The series stays stopped once its cancelled posts are no longer loaded
+    assert service.materialize(posts[:2], now, ahead=4, stopped=stopped) == []
+    assert service.stop_cancelled(posts[:2], stopped) == [] and first.id in stopped
+    assert service.stop_cancelled([], stopped) == [] and stopped == {}
+
+
+@pytest.mark.parametrize("data_file", ["posts.json", "posts.db", "posts/manifest.json"])
+@pytest.mark.parametrize("cascade", [False, True])
+def test_cancelled_series_stays_stopped_with_active_only_loads(tmp_path, monkeypatch, data_file, cascade):
+    """Test that a post the user cancelled stops its series when finished posts are not loaded."""
+    monkeypatch.setenv("LAZY_LOAD", "true")
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    repeat = {"type": "daily", "time": now.strftime("%H:%M")}
+    posts = [
+        {"id": "p1", "status": "pending", "days": 1},
+        {"id": "p2", "status": "cancelled", "days": 2},
+        {"id": "p3", "status": "pending", "days": 3},
+    ][:3 if cascade else 2]
+    source = tmp_path / "source.json"
+    source.write_text(json.dumps({
+        "config": {"timezone": "UTC"},
+        "posts": [
+            {
+                "id": post["id"], "type": "tweet", "text": "daily", "status": post["status"],
+                "scheduled_at": (now + timedelta(days=post["days"])).isoformat(),
+                "repeat": repeat, "series_id": "s",
+            }
+            for post in posts
+        ],
+        "stats": {"daily_reset_at": now.isoformat(), "monthly_reset_at": now.isoformat()},
+    }), encoding="utf-8")
+    data_path = tmp_path / data_file
+    convert(source, data_path)
+
+    for _ in range(2):
+        config = SchedulerConfig(str(data_path))
+        config.load()
+        run_tick(
+            config,
+            ApiServices(x_client=RecordingClient(), media_service=None, media_cache=MediaCache(), rate_limits=None),
+            dry_run=True
+        )
+
+    everything = create_storage(data_path).load_all()
+    assert {post.id: post.status for post in everything.posts} == {
+        "p1": PostStatus.PENDING, "p2": PostStatus.CANCELLED, **({"p3": PostStatus.CANCELLED} if cascade else {})
+    }
+    assert everything.stats.stopped_series == {"s": now + timedelta(days=2)}
+    assert [post.id for post in SchedulerConfig(str(data_path)).load().posts] == ["p1"]
+
+
+def test_horizon_shorter_than_the_period_keeps_the_next_occurrence():
+    """Test that a weekly series with a one-day horizon does not end after its first post."""
+    service = RepeatService("Asia/Tokyo")
+    weekly = Post(
+        type=PostType.TWEET,
+        text="weekly",
+        scheduled_at=datetime(2026, 3, 2, 9, 0, tzinfo=TZ),
+        repeat=RepeatConfig(type=RepeatType.WEEKLY, days=["monday"], time="09:00"),
+    )
+    now = datetime(2026, 3, 1, 8, 0, tzinfo=TZ)
+
+    assert service.materialize([weekly], now, ahead=3, horizon=timedelta(days=1)) == []
+    assert weekly.series_id == weekly.id
+
+    # Once the original is due, its next occurrence is created despite the horizon
+    due = datetime(2026, 3, 2, 9, 0, tzinfo=TZ)
+    created = service.materialize([weekly], due, ahead=3, horizon=timedelta(days=1))
+    assert [post.scheduled_at.day for post in created] == [9]
+    assert service.materialize([weekly, *created], due, ahead=3, horizon=timedelta(days=1)) == []
+
+    # Once posted, the original still anchors the series
+    weekly.status = PostStatus.POSTED
+    before_next = datetime(2026, 3, 8, 9, 0, tzinfo=TZ)
+    created = service.materialize([weekly], before_next, ahead=3, horizon=timedelta(days=1))
+    assert [post.scheduled_at.day for post in created] == [9]
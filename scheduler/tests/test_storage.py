@@ -0,0 +1,271 @@
+"""Tests for storage backends."""
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from scheduler.config import SchedulerConfig
+from scheduler.models import HistoryEntry, Post, PostStatus, PostType
+from scheduler.precheck import peek
+from scheduler.storage import JsonStorage, ShardedStorage, SqliteStorage, convert, create_storage
+
+
+def _write_posts_json(path, posts):
+    path.write_text(json.dumps({
+        "config": {"timezone": "UTC"},
+        "posts": posts,
+        "history": [],
+        "stats": {
+            "daily_reset_at": "2026-02-01T00:00:00+00:00",
+            "monthly_reset_at": "2026-02-01T00:00:00+00:00",
+        },
+    }), encoding="utf-8")
+
+
+def _post(post_id, status="pending", scheduled_at="2026-01-01T00:00:00+00:00"):
+    return {
+        "id": post_id,
+        "type": "tweet",
+        "status": status,
+        "scheduled_at": scheduled_at,
+        "text": f"post {post_id}",
+    }
+
+
+def _shard_files(manifest_path):
+    manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+    return {key: summary["file"] for key, summary in manifest["shards"].items()}
+
+
+def test_create_storage_by_suffix(tmp_path):
+    """Test that the backend is chosen from the file suffix."""
+    assert isinstance(create_storage(tmp_path / "posts.json"), JsonStorage)
+    assert isinstance(create_storage(tmp_path / "posts.db"), SqliteStorage)
+    assert isinstance(create_storage(tmp_path / "posts" / "manifest.json"), ShardedStorage)
+
+
+def test_sqlite_loads_only_active_posts(tmp_path):
+    """Test that the SQLite backend skips finished posts on load."""
+    json_path = tmp_path / "posts.json"
+    db_path = tmp_path / "posts.db"
+    _write_posts_json(json_path, [_post("a"), _post("b", "posted"), _post("c", "failed")])
+
+    convert(json_path, db_path)
+    data = SchedulerConfig(str(db_path)).load()
+
+    assert [post.id for post in data.posts] == ["a"]
+    assert data.history == []
+
+
+def test_sqlite_save_round_trip(tmp_path):
+    """Test that changed and appended rows survive an export to JSON."""
+    json_path = tmp_path / "posts.json"
+    db_path = tmp_path / "posts.db"
+    _write_posts_json(json_path, [_post("a"), _post("b", "posted")])
+    convert(json_path, db_path)
+
+    config = SchedulerConfig(str(db_path))
+    config.load()
+    config.data.posts[0].status = PostStatus.POSTED
+    config.data.posts.append(Post(
+        id="c",
+        type=PostType.TWEET,
+        text="next",
+        scheduled_at=datetime.now(timezone.utc) + timedelta(days=1),
+    ))
+    config.data.history.append(HistoryEntry(post_id="a", action="posted", tweet_id="1"))
+    config.save()
+
+    convert(db_path, json_path)
+    exported = SchedulerConfig(str(json_path)).load()
+
+    assert [(post.id, post.status) for post in exported.posts] == [
+        ("a", PostStatus.POSTED),
+        ("b", PostStatus.POSTED),
+        ("c", PostStatus.PENDING),
+    ]
+    assert [entry.post_id for entry in exported.history] == ["a"]
+
+
+def test_json_lazy_load_passes_finished_records_through(tmp_path):
+    """Test that lazy loading validates only active posts and keeps the rest as-is."""
+    json_path = tmp_path / "posts.json"
+    finished = {**_post("b", "posted"), "web_only_field": "kept"}
+    _write_posts_json(json_path, [_post("a"), finished, _post("c", "posting")])
+    raw = json.loads(json_path.read_text(encoding="utf-8"))
+    raw["history"] = [{"id": "h1", "post_id": "b", "action": "posted", "executed_at": "2026-01-01T00:00:00"}]
+    json_path.write_text(json.dumps(raw), encoding="utf-8")
+
+    config = SchedulerConfig(str(json_path), storage=JsonStorage(json_path, lazy=True))
+    data = config.load()
+    assert [post.id for post in data.posts] == ["a", "c"]
+    assert data.history == []
+
+    data.get_post("a").status = PostStatus.POSTED
+    config.add_posts([Post(id="d", type=PostType.TWEET, text="d", scheduled_at=datetime.now(timezone.utc))])
+    data.history.append(HistoryEntry(id="h2", post_id="a", action="posted", tweet_id="1"))
+    config.save()
+
+    saved = json.loads(json_path.read_text(encoding="utf-8"))
+    assert [post["id"] for post in saved["posts"]] == ["a", "b", "c", "d"]
+    assert saved["posts"][0]["status"] == "posted"
+    assert saved["posts"][1] == finished
+    assert [entry["id"] for entry in saved["history"]] == ["h1", "h2"]
+
+
+def test_json_lazy_roll_history(tmp_path):
+    """Test that lazy mode archives raw history beyond the retention limit."""
+    json_path = tmp_path / "posts.json"
+    _write_posts_json(json_path, [])
+    raw = json.loads(json_path.read_text(encoding="utf-8"))
+    raw["config"]["history_retention"] = 2
+    raw["history"] = [
+        {"id": f"h{i}", "post_id": "a", "action": "posted", "executed_at": f"2026-01-0{i}T00:00:00"}
+        for i in range(1, 4)
+    ]
+    json_path.write_text(json.dumps(raw), encoding="utf-8")
+
+    config = SchedulerConfig(str(json_path), storage=JsonStorage(json_path, lazy=True))
+    config.load()
+    config.data.history.append(HistoryEntry(id="h4", post_id="a", action="posted"))
+    config.save()
+
+    saved = json.loads(json_path.read_text(encoding="utf-8"))
+    assert [entry["id"] for entry in saved["history"]] == ["h3", "h4"]
+    assert [entry.id for entry in config.history_archive.read()] == ["h1", "h2"]
+
+
+def test_json_save_matches_previous_format_and_compact(tmp_path):
+    """Test that streamed output matches json.dump and compact output round-trips."""
+    json_path = tmp_path / "posts.json"
+    _write_posts_json(json_path, [_post("a"), _post("b", "posted")])
+    storage = JsonStorage(json_path)
+    data = storage.load()
+    data.posts[0].text = "改行\nと \"引用\""
+    expected = json.dumps(data.model_dump(mode="json"), indent=2, ensure_ascii=False, default=str)
+
+    storage.save(data)
+    assert json_path.read_text(encoding="utf-8") == expected
+    assert not (tmp_path / "posts.json.tmp").exists()
+
+    JsonStorage(json_path, compact=True).save(data)
+    compact = json_path.read_text(encoding="utf-8")
+    assert "\n" not in compact
+    assert json.loads(compact) == json.loads(expected)
+
+
+def test_sharded_storage_touches_only_active_and_changed_shards(tmp_path):
+    """Test that shards without active posts are neither loaded nor rewritten."""
+    json_path = tmp_path / "posts.json"
+    manifest_path = tmp_path / "posts" / "manifest.json"
+    _write_posts_json(json_path, [
+        _post("old", "posted", "2025-11-03T09:00:00+00:00"),
+        _post("jan", "pending", "2026-01-05T09:00:00+00:00"),
+        _post("jan-done", "posted", "2026-01-02T09:00:00+00:00"),
+        _post("feb", "pending", "2026-02-10T09:00:00+00:00"),
+    ])
+    convert(json_path, manifest_path)
+    shards = _shard_files(manifest_path)
+    assert sorted(shards) == ["2025-11", "2026-01", "2026-02"]
+    old_files = {path.name: path.stat().st_mtime_ns for path in manifest_path.parent.glob("20*.json")}
+    assert sorted(old_files) == sorted(shards.values())
+    assert peek(manifest_path).next_due == datetime(2026, 1, 5, 9, tzinfo=timezone.utc)
+
+    config = SchedulerConfig(str(manifest_path))
+    data = config.load()
+    assert sorted(post.id for post in data.posts) == ["feb", "jan"]
+
+    data.get_post("jan").status = PostStatus.POSTED
+    data.history.append(HistoryEntry(post_id="jan", action="posted", tweet_id="1"))
+    # Moves the post from the February shard to March
+    data.get_post("feb").scheduled_at = datetime(2026, 3, 1, tzinfo=timezone.utc)
+    config.save()
+
+    after = _shard_files(manifest_path)
+    assert sorted(after) == ["2025-11", "2026-01", "2026-03"]
+    # Only the untouched shard keeps its file; replaced files are gone
+    assert after["2025-11"] == shards["2025-11"]
+    assert (manifest_path.parent / after["2025-11"]).stat().st_mtime_ns == old_files[shards["2025-11"]]
+    assert sorted(path.name for path in manifest_path.parent.glob("20*.json")) == sorted(after.values())
+    manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+    assert manifest["shards"]["2026-01"]["active"] == 0
+    assert manifest["shards"]["2026-03"]["first_due"] == "2026-03-01T00:00:00+00:00"
+
+    everything = create_storage(manifest_path).load_all()
+    assert sorted(post.id for post in everything.posts) == ["feb", "jan", "jan-done", "old"]
+    assert [entry.post_id for entry in everything.history] == ["jan"]
+    assert [post.id for post in SchedulerConfig(str(manifest_path)).load().posts] == ["feb"]
+
+
+def test_json_dedup_stores_each_payload_once(tmp_path):
+    """Test that identical payloads share one template and media IDs stay per post."""
+    json_path = tmp_path / "posts.json"
+    thread = [{"text": "part one", "media": [{"type": "image", "path": "a.png"}]}, {"text": "part two"}]
+    posts = [
+        {**_post(f"p{i}", "posted" if i < 3 else "pending"), "type": "thread", "text": None, "thread": thread}
+        for i in range(5)
+    ]
+    posts[0]["thread"] = [{**thread[0], "media": [{"type": "image", "path": "a.png", "media_id": "m0"}]}, thread[1]]
+    _write_posts_json(json_path, posts)
+
+    storage = JsonStorage(json_path, lazy=True, dedup=True)
+    storage.save(storage.load())
+    saved = json.loads(json_path.read_text(encoding="utf-8"))
+    assert len(saved["templates"]) == 1
+    assert {post["template"] for post in saved["posts"]} == set(saved["templates"])
+    assert "thread" not in saved["posts"][0] and saved["posts"][0]["media_ids"] == ["m0"]
+
+    data = JsonStorage(json_path, dedup=True).load()
+    assert data.get_post("p0").thread[0].media[0].media_id == "m0"
+    assert data.get_post("p1").thread[0].media[0].media_id is None
+    assert data.get_post("p3").thread is data.get_post("p4").thread
+
+    # Saving without dedup writes the plain format back
+    JsonStorage(json_path).save(data)
+    plain = json.loads(json_path.read_text(encoding="utf-8"))
+    assert "templates" not in plain
+    assert plain["posts"][0]["thread"][0]["media"][0]["media_id"] == "m0"
+
+
+def test_json_dedup_drops_unused_templates(tmp_path):
+    """Test that a save keeps only the templates its posts still refer to."""
+    json_path = tmp_path / "posts.json"
+    _write_posts_json(json_path, [_post("a"), _post("b", "posted")])
+    JsonStorage(json_path, dedup=True).save(JsonStorage(json_path).load())
+
+    config = SchedulerConfig(str(json_path), storage=JsonStorage(json_path, lazy=True, dedup=True))
+    config.load().get_post("a").text = "edited"
+    config.save()
+
+    saved = json.loads(json_path.read_text(encoding="utf-8"))
+    assert sorted(template["text"] for template in saved["templates"].values()) == ["edited", "post b"]
+    assert [post.text for post in create_storage(json_path).load_all().posts] == ["edited", "post b"]
+
+
+def test_sharded_save_interrupted_before_the_manifest(tmp_path, monkeypatch):
+    """Test that shards written by a save that died before the manifest are not used."""
+    json_path = tmp_path / "posts.json"
+    manifest_path = tmp_path / "posts" / "manifest.json"
+    _write_posts_json(json_path, [_post("jan", "pending", "2026-01-05T09:00:00+00:00")])
+    convert(json_path, manifest_path)
+
+    config = SchedulerConfig(str(manifest_path))
+    post = config.load().get_post("jan")
+    post.scheduled_at = datetime(2026, 3, 1, tzinfo=timezone.utc)
+    config.journal.record(updated=[post])
+
+    def crash(self, data):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(ShardedStorage, "_write_manifest", crash)
+    with pytest.raises(OSError):
+        config.save()
+    monkeypatch.undo()
+
+    # The manifest still names the old shard and the journal replays the move
+    config = SchedulerConfig(str(manifest_path))
+    assert [post.scheduled_at.month for post in config.load().posts] == [3]
+    config.save()
+
+    everything = create_storage(manifest_path).load_all()
+    assert [(post.id, post.scheduled_at.month) for post in everything.posts] == [("jan", 3)]
@@ -0,0 +1,107 @@
+"""Tests for the X API client wrapper."""
+from types import SimpleNamespace
+
+from scheduler.services.x_api_client import XApiClient, XCredentials
+
+
+class FakeTweepyClient:
+    """Stand-in for tweepy.Client that counts calls."""
+
+    def __init__(self):
+        self.get_me_calls = 0
+        self.retweeted = []
+
+    def get_me(self):
+        self.get_me_calls += 1
+        return SimpleNamespace(data=SimpleNamespace(id=42))
+
+    def retweet(self, tweet_id, user_auth=True):
+        self.retweeted.append(tweet_id)
+
+
+def _client(token, **kwargs):
+    client = XApiClient(XCredentials("key", "secret", token, "token-secret"), **kwargs)
+    client._client = FakeTweepyClient()
+    return client
+
+
+def test_reposts_share_one_identity_lookup():
+    """Test that many reposts and clients with the same credentials call get_me once."""
+    first = _client("token-shared")
+    second = _client("token-shared")
+
+    assert all(first.repost(tweet_id) for tweet_id in ["1", "2", "3"])
+    second.repost("4")
+
+    assert first._client.get_me_calls == 1
+    assert second._client.get_me_calls == 0
+    assert first._client.retweeted == ["1", "2", "3"]
+
+
+def test_user_id_is_cached_on_disk(tmp_path):
+    """Test that a new process reuses the user ID from the disk cache."""
+    cache_path = str(tmp_path / "users.json")
+    assert _client("token-disk", user_cache_path=cache_path).get_user_id() == "42"
+
+    XApiClient._user_ids.clear()
+    restarted = _client("token-disk", user_cache_path=cache_path)
+
+    assert restarted.get_user_id() == "42"
+    assert restarted._client.get_me_calls == 0
+
+
+def test_slow_identity_lookup_holds_up_only_its_account():
+    """Test that one account's pending get_me does not block another account's lookup."""
+    import threading
+
+    started, release = threading.Event(), threading.Event()
+
+    class SlowTweepyClient(FakeTweepyClient):
+        def get_me(self):
+            started.set()
+            release.wait(5)
+            return super().get_me()
+
+    slow = _client("token-slow")
+    slow._client = SlowTweepyClient()
+    lookup = threading.Thread(target=slow.get_user_id)
+    lookup.start()
+    try:
+        assert started.wait(5)
+        assert _client("token-fast").get_user_id() == "42"
+        assert lookup.is_alive()
+    finally:
+        release.set()
+        lookup.join()
+
+
+def test_client_against_fake_server(tmp_path):
+    """Test the tweepy-backed calls end to end against the local fake X API."""
+    import pytest
+    from datetime import datetime, timedelta, timezone
+    from scheduler.benchmarks.fake_x_api import FakeXApi
+    from scheduler.services.x_api_client import XApiError
+
+    image = tmp_path / "image.png"
+    image.write_bytes(b"\x89PNG" + b"0" * 100)
+    video = tmp_path / "clip.mp4"
+    video.write_bytes(b"0" * 1000)
+
+    with FakeXApi() as server:
+        client = XApiClient(XCredentials("key", "secret", "42-token-fake", "token-secret"), api_base_url=server.base_url)
+        tweet_id = client.post_tweet("hello", media_ids=[client.upload_media(str(image))])
+        thread_ids = client.post_thread([{"text": "one"}, {"text": "two"}])
+        client.repost("123")
+        client.upload_media(str(video))
+        client.delete_tweet(thread_ids[1])
+        recent = client.get_recent_tweets(datetime.now(timezone.utc) - timedelta(minutes=1))
+
+        server.error_rate = 1.0
+        with pytest.raises(XApiError):
+            client.post_tweet("unlucky")
+
+    assert [t["text"] for t in recent] == ["RT: 123", "one", "hello"]
+    assert recent[0]["reposted_id"] == "123"
+    assert recent[2]["id"] == tweet_id
+    assert server.requests["POST /1.1/media/upload.json"] == 4  # simple, INIT, APPEND, FINALIZE
+    assert server.requests["GET /2/users/me"] == 1
@@ -225,6 +225,18 @@ export function EditPostContent() {
             </div>
           )}
 
+          {/* Repeat series notice */}
+          {(post?.series_id || post?.repeat) && (
+            <div className="bg-yellow-50 border border-yellow-200 rounded-lg p-4">
+              <div className="flex items-center gap-2">
+                <AlertCircle className="w-5 h-5 text-yellow-600" />
+                <p className="text-sm text-yellow-800">
+                  この投稿は繰り返しシリーズの一部です。編集はこの投稿にのみ反映され、作成済みの次回以降の投稿は変わりません。キャンセルすると以降の投稿もキャンセルされます。
+                </p>
+              </div>
+            </div>
+          )}
+
           {/* Post Type (read-only display) */}
           <div className="bg-white rounded-lg border border-gray-200 p-6">
             <label className="block text-sm font-medium text-gray-700 mb-2">
@@ -36,6 +36,7 @@ export interface Post {
   type: PostType;
   status: PostStatus;
   scheduled_at: string;
+  account?: string;
   created_at: string;
   updated_at: string;
   text?: string;
@@ -43,6 +44,7 @@ export interface Post {
   thread?: ThreadItem[];
   target_tweet_id?: string;
   repeat?: RepeatConfig;
+  series_id?: string;
   retry_count?: number;
   error_message?: string;
   posted_tweet_id?: string;